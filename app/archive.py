@@ -0,0 +1,350 @@
+"""
+Cold archive for correlation bundles
+
+Traces, spans and logs of error cards older than ARCHIVE_AFTER_DAYS are moved
+out of the database into append-only segment files on local disk. Each bundle
+is written as one self-contained compressed NDJSON frame (zstd when the
+`zstandard` package is installed, gzip otherwise), so a whole segment can still
+be inspected with `zstd -dc` / `zcat`. The `archived_bundles` table maps an
+error_metric_id to its segment, byte offset and length, and reads go through a
+memory map of the segment so only the requested frame is decompressed.
+"""
+import os
+import json
+import asyncio
+import mmap
+import zlib
+import gzip
+import heapq
+import datetime
+import threading
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import select, func, and_, or_
+
+from app.models import ErrorMetric, Trace, Span, Log, ArchivedBundle, ArchivedTrace
+
+load_dotenv()
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.getcwd(), "archive"))
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_SEGMENT_MAX_BYTES = int(os.getenv("ARCHIVE_SEGMENT_MAX_BYTES", str(256 * 1024 * 1024)))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "50"))
+ARCHIVE_CODEC = "zstd" if zstandard is not None else "gzip"
+
+_READ_CHUNK = 64 * 1024
+
+# Row kinds in the order they are written inside a bundle frame
+BUNDLE_KINDS = (("trace", Trace), ("span", Span), ("log", Log))
+
+# Columns the /api/errors/{id}/traces|spans|logs pages return for each kind
+PAGE_COLUMNS = {
+    "trace": ("id", "trace_id_hex", "trace_id_b64", "created_at"),
+    "span": ("id", "trace_id_hex", "span_id", "operation_name", "start_time", "duration", "tags", "created_at"),
+    "log": ("id", "trace_id_hex", "log_data", "created_at"),
+}
+
+# Time column the pages are ordered on, before id; rows without a time come last
+PAGE_ORDER = {"trace": "created_at", "span": "start_time", "log": "created_at"}
+
+
+def _serialise_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def row_to_dict(row) -> Dict[str, Any]:
+    """Serialise an ORM row into a plain dict (datetimes as ISO strings)"""
+    return {
+        column.name: _serialise_value(getattr(row, column.name))
+        for column in row.__table__.columns
+    }
+
+
+class SegmentWriter:
+    """Appends compressed bundle frames to segment files, rolling over by size"""
+
+    def __init__(self, archive_dir: str = ARCHIVE_DIR, max_bytes: int = ARCHIVE_SEGMENT_MAX_BYTES,
+                 codec: str = ARCHIVE_CODEC):
+        self.archive_dir = archive_dir
+        self.max_bytes = max_bytes
+        self.codec = codec
+        self.segment = None
+        self._file = None
+        os.makedirs(archive_dir, exist_ok=True)
+
+    def _open_segment(self):
+        stamp = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        suffix = "ndjson.zst" if self.codec == "zstd" else "ndjson.gz"
+        self.segment = f"segment-{stamp}.{suffix}"
+        self._file = open(os.path.join(self.archive_dir, self.segment), "ab")
+
+    def write_frame(self, lines: Iterator[bytes]) -> Tuple[str, int, int]:
+        """Write one compressed frame and return (segment, offset, length)"""
+        if self._file is None or self._file.tell() >= self.max_bytes:
+            self.close()
+            self._open_segment()
+
+        offset = self._file.tell()
+        if self.codec == "zstd":
+            compressor = zstandard.ZstdCompressor(level=10)
+            with compressor.stream_writer(self._file, closefd=False) as writer:
+                for line in lines:
+                    writer.write(line)
+        else:
+            with gzip.GzipFile(fileobj=self._file, mode="wb", compresslevel=6) as writer:
+                for line in lines:
+                    writer.write(line)
+        self._file.flush()
+        return self.segment, offset, self._file.tell() - offset
+
+    def sync(self):
+        """Make everything written so far durable before the index is committed"""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+
+def _bundle_lines(db, error_metric_id: str, counts: Dict[str, int], trace_ids: set) -> Iterator[bytes]:
+    """Yield the NDJSON lines making up one correlation bundle"""
+    yield json.dumps({"kind": "bundle", "error_metric_id": error_metric_id}).encode() + b"\n"
+    for kind, model in BUNDLE_KINDS:
+        rows = db.query(model).filter(model.error_metric_id == error_metric_id)
+        if model is Log:
+            # Grouped by trace, as the JSON export lists them
+            rows = rows.order_by(Log.trace_id_hex, Log.id)
+        rows = rows.yield_per(1000)
+        for row in rows:
+            counts[kind] += 1
+            if row.trace_id_hex:
+                trace_ids.add(row.trace_id_hex)
+            record = row_to_dict(row)
+            record["kind"] = kind
+            yield json.dumps(record).encode() + b"\n"
+
+
+def archive_old_bundles(db, days: int = ARCHIVE_AFTER_DAYS, limit: Optional[int] = None,
+                        archive_dir: str = ARCHIVE_DIR) -> int:
+    """Move traces, spans and logs of error cards older than `days` into segment files.
+
+    Frames are fsynced before their index rows are committed and the source
+    rows deleted, so a crash can at worst leave unreferenced bytes behind.
+    """
+    cutoff = datetime.datetime.now() - datetime.timedelta(days=days)
+    query = db.query(ErrorMetric.id).outerjoin(
+        ArchivedBundle, ArchivedBundle.error_metric_id == ErrorMetric.id
+    ).filter(
+        ErrorMetric.window_end < cutoff,
+        ArchivedBundle.error_metric_id.is_(None)
+    ).order_by(ErrorMetric.window_start)
+    if limit:
+        query = query.limit(limit)
+    error_ids = [row.id for row in query.all()]
+
+    if not error_ids:
+        print("No bundles to archive")
+        return 0
+
+    writer = SegmentWriter(archive_dir)
+    archived = 0
+    try:
+        for start in range(0, len(error_ids), ARCHIVE_BATCH_SIZE):
+            batch = error_ids[start:start + ARCHIVE_BATCH_SIZE]
+            for error_metric_id in batch:
+                counts = {kind: 0 for kind, _ in BUNDLE_KINDS}
+                trace_ids = set()
+                segment, offset, length = writer.write_frame(_bundle_lines(db, error_metric_id, counts, trace_ids))
+                db.add(ArchivedBundle(
+                    error_metric_id=error_metric_id,
+                    segment=segment,
+                    offset=offset,
+                    length=length,
+                    codec=writer.codec,
+                    trace_count=counts["trace"],
+                    span_count=counts["span"],
+                    log_count=counts["log"]
+                ))
+                db.add_all(ArchivedTrace(trace_id_hex=trace_id, error_metric_id=error_metric_id)
+                           for trace_id in trace_ids)
+            writer.sync()
+
+            for _, model in BUNDLE_KINDS:
+                db.query(model).filter(model.error_metric_id.in_(batch)).delete(synchronize_session=False)
+            db.commit()
+            archived += len(batch)
+            print(f"✓ Archived {archived}/{len(error_ids)} bundles into {writer.segment}")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        writer.close()
+
+    return archived
+
+
+def index_archived_traces(db) -> int:
+    """Record the trace ids of bundles archived before archived_traces existed"""
+    indexed = select(ArchivedTrace.error_metric_id).where(
+        ArchivedTrace.error_metric_id == ArchivedBundle.error_metric_id
+    ).exists()
+    entries = db.query(ArchivedBundle).filter(~indexed).all()
+    for entry in entries:
+        trace_ids = {row["trace_id_hex"] for _, row in iter_bundle_rows(entry) if row.get("trace_id_hex")}
+        db.add_all(ArchivedTrace(trace_id_hex=trace_id, error_metric_id=entry.error_metric_id)
+                   for trace_id in trace_ids)
+    db.commit()
+    return len(entries)
+
+
+class _SegmentCache:
+    """Keeps read-only memory maps of segment files open between requests"""
+
+    def __init__(self, archive_dir: str = ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._lock = threading.Lock()
+
+    def view(self, segment: str, offset: int, length: int) -> memoryview:
+        with self._lock:
+            mapped = self._maps.get(segment)
+            # The newest segment may have grown since it was mapped
+            if mapped is None or offset + length > len(mapped):
+                with open(os.path.join(self.archive_dir, segment), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = mapped
+        return memoryview(mapped)[offset:offset + length]
+
+
+_segments = _SegmentCache()
+
+
+def _decompressed_chunks(view: memoryview, codec: str) -> Iterator[bytes]:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd archive segments")
+        with zstandard.ZstdDecompressor().stream_reader(view) as reader:
+            while True:
+                chunk = reader.read(_READ_CHUNK)
+                if not chunk:
+                    break
+                yield chunk
+    else:
+        decompressor = zlib.decompressobj(wbits=31)
+        for start in range(0, len(view), _READ_CHUNK):
+            chunk = decompressor.decompress(view[start:start + _READ_CHUNK])
+            if chunk:
+                yield chunk
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
+def iter_bundle_rows(entry: ArchivedBundle) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (kind, row) pairs of an archived bundle without inflating it all at once"""
+    view = _segments.view(entry.segment, entry.offset, entry.length)
+    pending = b""
+    for chunk in _decompressed_chunks(view, entry.codec):
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line:
+                record = json.loads(line)
+                kind = record.pop("kind")
+                if kind != "bundle":
+                    yield kind, record
+    if pending.strip():
+        record = json.loads(pending)
+        kind = record.pop("kind")
+        if kind != "bundle":
+            yield kind, record
+
+
+def _row_filters(model, trace_id=None, operation_name=None, min_duration=None, level=None):
+    """SQL clauses for the live tables and the equivalent predicates for archived rows"""
+    clauses, predicates = [], []
+    if trace_id:
+        clauses.append(model.trace_id_hex == trace_id)
+        predicates.append(lambda row: row.get("trace_id_hex") == trace_id)
+    if operation_name and model is Span:
+        clauses.append(Span.operation_name == operation_name)
+        predicates.append(lambda row: row.get("operation_name") == operation_name)
+    if min_duration is not None and model is Span:
+        clauses.append(Span.duration >= min_duration)
+        predicates.append(lambda row: row.get("duration") is not None and row["duration"] >= min_duration)
+    if level and model is Log:
+        clauses.append(func.lower(Log.log_data["level"].as_string()) == level.lower())
+        predicates.append(lambda row: str((row.get("log_data") or {}).get("level", "")).lower() == level.lower())
+    return clauses, predicates
+
+
+def _archived_page(entry: ArchivedBundle, kind: str, predicates, limit: int, after):
+    sort_name = PAGE_ORDER[kind]
+
+    # Archived times are the ISO strings of the same naive datetimes, which sort alike
+    def key(sort_value, row_id):
+        return (sort_value is None, sort_value or "", row_id)
+
+    after_key = key(_serialise_value(after[0]), after[1]) if after is not None else None
+    rows = (
+        row for row_kind, row in iter_bundle_rows(entry)
+        if row_kind == kind and (after_key is None or key(row.get(sort_name), row["id"]) > after_key)
+        and all(predicate(row) for predicate in predicates)
+    )
+    return heapq.nsmallest(limit + 1, rows, key=lambda row: key(row.get(sort_name), row["id"]))
+
+
+def _after_page_key(column, id_column, after):
+    """Rows after `after` in (column ASC NULLS LAST, id ASC) order"""
+    sort_value, row_id = after
+    if sort_value is None:
+        return and_(column.is_(None), id_column > row_id)
+    return or_(
+        column > sort_value,
+        and_(column == sort_value, id_column > row_id),
+        column.is_(None)
+    )
+
+
+async def load_bundle_page(db, error_metric_id: str, kind: str, limit: int,
+                           after: Optional[Tuple[Optional[datetime.datetime], str]] = None,
+                           **filters) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+    """
+    One page of an error's traces, spans or logs in time order (PAGE_ORDER, then id),
+    and the (time, id) key to continue from, None on the last page.
+    Rows hold only the kind's PAGE_COLUMNS; live rows keep their native datetimes.
+    Archived bundles are filtered while they are streamed out of the segment.
+    """
+    model = dict(BUNDLE_KINDS)[kind]
+    columns = PAGE_COLUMNS[kind]
+    sort_name = PAGE_ORDER[kind]
+    clauses, predicates = _row_filters(model, **filters)
+    entry = await db.get(ArchivedBundle, error_metric_id)
+    if entry:
+        rows = await asyncio.to_thread(_archived_page, entry, kind, predicates, limit, after)
+        rows = [{name: row.get(name) for name in columns} for row in rows]
+    else:
+        column = getattr(model, sort_name)
+        query = select(*(getattr(model, name) for name in columns)).where(
+            model.error_metric_id == error_metric_id, *clauses
+        )
+        if after is not None:
+            query = query.where(_after_page_key(column, model.id, after))
+        result = await db.execute(query.order_by(column.asc().nulls_last(), model.id).limit(limit + 1))
+        rows = [row._asdict() for row in result]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][sort_name], rows[-1]["id"])
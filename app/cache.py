@@ -0,0 +1,90 @@
+"""
+Small in-process caches for API responses that only change when the worker writes
+
+Each cache is bounded by entry count and/or by the total size of its values
+(`size_of`, the byte length by default) and evicts the least recently used
+entries to stay within both. Hits, misses, evictions and the bytes and
+entries held are exported per cache on /metrics.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.metrics import REGISTRY
+
+CACHE_HITS = REGISTRY.counter("rca_cache_hits_total", "Lookups answered from the cache", labels=("cache",))
+CACHE_MISSES = REGISTRY.counter("rca_cache_misses_total", "Lookups not found in the cache", labels=("cache",))
+CACHE_EVICTIONS = REGISTRY.counter(
+    "rca_cache_evictions_total",
+    "Entries dropped to stay within the cache's limits",
+    labels=("cache",)
+)
+CACHE_BYTES = REGISTRY.gauge("rca_cache_bytes", "Size of the values the cache holds", labels=("cache",))
+CACHE_ENTRIES = REGISTRY.gauge("rca_cache_entries", "Entries the cache holds", labels=("cache",))
+
+
+class LRUCache:
+    """Least-recently-used mapping bounded by `max_entries` and `max_bytes` (None: no limit, 0: disabled)"""
+
+    def __init__(self, name: str, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 size_of: Callable[[Any], int] = len):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.bytes = 0
+        # key -> (value, size)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        CACHE_BYTES.set_function(lambda: self.bytes, cache=name)
+        CACHE_ENTRIES.set_function(lambda: len(self._entries), cache=name)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries != 0 and self.max_bytes != 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                CACHE_MISSES.inc(cache=self.name)
+                return None
+            self._entries.move_to_end(key)
+        CACHE_HITS.inc(cache=self.name)
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any):
+        if not self.enabled:
+            return
+        size = self.size_of(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Would evict everything else and still not fit
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                CACHE_EVICTIONS.inc(cache=self.name)
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
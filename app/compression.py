@@ -0,0 +1,177 @@
+"""
+Response compression (brotli or gzip) as ASGI middleware
+
+Buffered responses are compressed whole once they reach COMPRESSION_MIN_BYTES.
+Streaming bodies (downloads) are compressed chunk by chunk and flushed after
+each chunk, so the client still receives data as it is produced instead of
+the middleware buffering the whole export. Server-sent events and bodies that
+are already compressed (e.g. `?gzip=true` downloads) pass through untouched.
+Brotli is used when the `brotli` package is installed and the client accepts it.
+"""
+import os
+import zlib
+from typing import Optional
+from dotenv import load_dotenv
+
+from app.metrics import REGISTRY
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+load_dotenv()
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+# Smaller buffered bodies are not worth the CPU or the encoding overhead
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# 4 compresses repetitive JSON close to gzip -9 at a fraction of the CPU
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/javascript", "text/")
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+COMPRESSION_RATIO = REGISTRY.histogram(
+    "rca_http_compression_ratio",
+    "Uncompressed / compressed size of each compressed response",
+    labels=("encoding",),
+    buckets=(1.5, 2, 3, 5, 8, 12, 20, 35, 50, 100)
+)
+BYTES_IN = REGISTRY.counter(
+    "rca_http_compression_input_bytes_total",
+    "Response bytes before compression",
+    labels=("encoding",)
+)
+BYTES_OUT = REGISTRY.counter(
+    "rca_http_compression_output_bytes_total",
+    "Response bytes sent after compression",
+    labels=("encoding",)
+)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The best encoding the client accepts: br, then gzip, else None"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip()] = quality
+    for encoding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        """Compress `data`; with `flush` everything so far is emitted for the client to decode"""
+        self.bytes_in += len(data)
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            if flush:
+                out += self._brotli.flush()
+        else:
+            out = self._zlib.compress(data)
+            if flush:
+                out += self._zlib.flush(zlib.Z_SYNC_FLUSH)
+        self.bytes_out += len(out)
+        return out
+
+    def finish(self) -> bytes:
+        out = self._brotli.finish() if self.encoding == "br" else self._zlib.flush()
+        self.bytes_out += len(out)
+        if self.bytes_out:
+            COMPRESSION_RATIO.observe(self.bytes_in / self.bytes_out, encoding=self.encoding)
+        BYTES_IN.inc(self.bytes_in, encoding=self.encoding)
+        BYTES_OUT.inc(self.bytes_out, encoding=self.encoding)
+        return out
+
+
+def _compressible(headers) -> bool:
+    if b"content-encoding" in headers:
+        return False
+    content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+    if content_type.startswith(UNCOMPRESSED_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        request_headers = dict(scope["headers"])
+        encoding = choose_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = {key.lower(): value for key, value in start["headers"]}
+                declared_size = int(headers.get(b"content-length", b"-1") or -1)
+                small = (not more_body and len(body) < self.minimum_size) or (0 <= declared_size < self.minimum_size)
+                if start["status"] in (204, 304) or small or not _compressible(headers):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                start["headers"] = [
+                    (key, value) for key, value in start["headers"] if key.lower() != b"content-length"
+                ] + [(b"content-encoding", encoding.encode()), (b"vary", b"Accept-Encoding")]
+                if not more_body:
+                    # Buffered body: compress it in one go and send its real length
+                    compressed = compressor.compress(body) + compressor.finish()
+                    start["headers"].append((b"content-length", str(len(compressed)).encode()))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send(start)
+
+            if more_body:
+                # Flush per chunk so streamed downloads keep arriving as they are produced
+                await send({"type": "http.response.body", "body": compressor.compress(body, flush=True),
+                            "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.compress(body) + compressor.finish()})
+
+        await self.app(scope, receive, send_compressed)
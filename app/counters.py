@@ -0,0 +1,75 @@
+"""
+Per-error counters denormalised onto ErrorMetric
+
+The worker bumps trace_count, span_count and log_count in the same
+transaction that saves each batch, and sets has_rca / rca_severity with the
+RCA report, so /api/errors can show them straight from the card row. The
+counts keep describing the bundle after it is moved to the cold archive.
+"""
+import re
+from typing import Optional
+from sqlalchemy import select, update, func, exists, bindparam
+
+from app.models import ErrorMetric, Trace, Span, Log, RCAReport, ArchivedBundle
+
+SEVERITIES = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+# Matches "**Severity**: HIGH" from the simple agent and plain "Severity: high" from LLM output
+SEVERITY_PATTERN = re.compile(r"\bseverity\W{0,4}(critical|high|medium|low)\b", re.IGNORECASE)
+
+
+def parse_rca_severity(summary: Optional[str]) -> Optional[str]:
+    match = SEVERITY_PATTERN.search(summary or "")
+    return match.group(1).upper() if match else None
+
+
+def record_bundle_counts(db, error_metric_id: str, traces: int = 0, spans: int = 0, logs: int = 0):
+    """Add saved rows to the card's counters; call before their transaction commits"""
+    db.execute(
+        update(ErrorMetric)
+        .where(ErrorMetric.id == error_metric_id)
+        .values(
+            trace_count=ErrorMetric.trace_count + traces,
+            span_count=ErrorMetric.span_count + spans,
+            log_count=ErrorMetric.log_count + logs
+        )
+    )
+
+
+def record_rca(db, error_metric_id: str, summary: Optional[str]):
+    """Flag the card as analysed; call before the report's transaction commits"""
+    db.execute(
+        update(ErrorMetric)
+        .where(ErrorMetric.id == error_metric_id)
+        .values(has_rca=True, rca_severity=parse_rca_severity(summary))
+    )
+
+
+def backfill_error_counters(db) -> int:
+    """Recompute every card's counters from the live tables and the archive index"""
+    def bundle_count(model, archived_column):
+        live = select(func.count()).select_from(model).where(model.error_metric_id == ErrorMetric.id)
+        archived = select(archived_column).where(ArchivedBundle.error_metric_id == ErrorMetric.id)
+        return live.scalar_subquery() + func.coalesce(archived.scalar_subquery(), 0)
+
+    updated = db.execute(update(ErrorMetric).values(
+        trace_count=bundle_count(Trace, ArchivedBundle.trace_count),
+        span_count=bundle_count(Span, ArchivedBundle.span_count),
+        log_count=bundle_count(Log, ArchivedBundle.log_count),
+        has_rca=exists().where(RCAReport.error_metric_id == ErrorMetric.id),
+        rca_severity=None
+    ).execution_options(synchronize_session=False)).rowcount
+
+    # Severity only lives in the report text
+    severities = [
+        {"error_id": error_metric_id, "severity": parse_rca_severity(summary)}
+        for error_metric_id, summary in db.execute(select(RCAReport.error_metric_id, RCAReport.analysis_summary))
+    ]
+    severities = [row for row in severities if row["severity"]]
+    if severities:
+        table = ErrorMetric.__table__
+        db.execute(
+            table.update().where(table.c.id == bindparam("error_id")).values(rca_severity=bindparam("severity")),
+            severities
+        )
+    db.commit()
+    return updated
@@ -0,0 +1,180 @@
+"""
+The /api/errors/{id} detail payload assembled by PostgreSQL in one statement
+
+The ORM path loads the card, then its RCA report, and builds the response
+from Python objects. On PostgreSQL the same JSON is produced by the database:
+the card is joined to its report through a LATERAL subquery and rendered with
+json_build_object, so the detail view costs one round trip and the API
+passes the database's JSON text straight through without decoding it.
+Timestamps and floats are formatted explicitly (_iso, _float) so every value
+equals the ORM path's; only the whitespace of the JSON text differs. Set
+DETAIL_SQL_JSON=false to use the ORM path everywhere.
+
+Either way, once a card has its RCA report the response body is final and is
+kept in an in-process LRU cache bounded by DETAIL_CACHE_BYTES.
+"""
+import os
+import time
+from typing import Optional, Tuple
+
+from sqlalchemy import select, func, case, cast, null, true, literal_column, bindparam, Text, Numeric, DateTime, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import LRUCache
+from app.models import ErrorMetric, RCAReport, DataVersion
+from app.versions import DETAILS_VERSION
+from app.notify import change_listener, RESYNC
+
+DETAIL_SQL_JSON = os.getenv("DETAIL_SQL_JSON", "true").lower() in ("1", "true", "yes", "on")
+# Memory for cached detail responses (0 disables the cache)
+DETAIL_CACHE_BYTES = int(os.getenv("DETAIL_CACHE_BYTES", str(32 * 1024 * 1024)))
+# How stale the cache may be after cards are deleted
+DETAIL_CACHE_RECHECK_SECONDS = float(os.getenv("DETAIL_CACHE_RECHECK_SECONDS", "5"))
+
+# Keys of the "error" object, in response order
+ERROR_FIELDS = (
+    "id", "env", "service", "span_kind", "http_code", "exception", "root_name", "count",
+    "window_start", "window_end", "created_at", "has_rca", "rca_severity"
+)
+
+
+def _json_object(**fields):
+    """json_build_object('key', value, ...) with the keys inlined as constants"""
+    arguments = []
+    for key, value in fields.items():
+        arguments.extend((literal_column(f"'{key}'"), value))
+    return func.json_build_object(*arguments)
+
+
+def _iso(column):
+    """Text of a timestamp as datetime.isoformat() writes it: no fraction when it is zero"""
+    return func.regexp_replace(func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS.US'), r'\.000000$', '')
+
+
+def _float(column):
+    """A float8 as Python writes it: whole numbers keep their ".0" (3.0, not 3)"""
+    return case(
+        (column == func.trunc(column), func.to_json(func.round(cast(column, Numeric), 1))),
+        else_=func.to_json(column),
+    )
+
+
+def _value(column):
+    if isinstance(column.type, DateTime):
+        return _iso(column)
+    if isinstance(column.type, Float):
+        return _float(column)
+    return column
+
+
+def _detail_statement():
+    report = (
+        select(RCAReport.id, RCAReport.analysis_summary, RCAReport.correlation_data, RCAReport.created_at)
+        .where(RCAReport.error_metric_id == ErrorMetric.id)
+        .limit(1)
+        .lateral("report")
+    )
+    document = _json_object(
+        error=_json_object(**{name: _value(getattr(ErrorMetric, name)) for name in ERROR_FIELDS}),
+        counts=_json_object(traces=ErrorMetric.trace_count, spans=ErrorMetric.span_count, logs=ErrorMetric.log_count),
+        rca_report=case(
+            (report.c.id.is_(None), null()),
+            else_=_json_object(
+                id=report.c.id,
+                analysis_summary=report.c.analysis_summary,
+                correlation_data=report.c.correlation_data,
+                created_at=_iso(report.c.created_at),
+            ),
+        ),
+    )
+    return (
+        # As text: the driver would otherwise decode the json value into Python objects
+        select(cast(document, Text), report.c.id.is_not(None))
+        .select_from(ErrorMetric.__table__.outerjoin(report, true()))
+        .where(ErrorMetric.id == bindparam("error_id"))
+    )
+
+
+# Built once: composing the expression costs more than running it
+DETAIL_STATEMENT = _detail_statement()
+
+
+def sql_json_supported(db: AsyncSession) -> bool:
+    return DETAIL_SQL_JSON and db.get_bind().dialect.name == "postgresql"
+
+
+async def error_detail_json(db: AsyncSession, error_id: str) -> Optional[Tuple[bytes, bool]]:
+    """
+    The detail response body for `error_id` as rendered by PostgreSQL and whether
+    it includes an RCA report, or None if there is no such card
+    """
+    row = (await db.execute(DETAIL_STATEMENT, {"error_id": error_id})).first()
+    return (row[0].encode(), row[1]) if row is not None else None
+
+
+class DetailCache:
+    """
+    Serialised detail responses of cards whose RCA report exists. Nothing about
+    such a card changes afterwards, so entries never go stale while the card
+    lives; deleting cards bumps DETAILS_VERSION, which is checked at most every
+    DETAIL_CACHE_RECHECK_SECONDS and empties the cache when it moves. While
+    change notifications are received the deletes arrive through them instead,
+    and the cache is emptied when the listener drops.
+    """
+
+    def __init__(self, max_bytes: int = DETAIL_CACHE_BYTES, recheck_seconds: float = DETAIL_CACHE_RECHECK_SECONDS):
+        self.entries = LRUCache("error_details", max_bytes=max_bytes)
+        self.recheck_seconds = recheck_seconds
+        self._version = None
+        self._checked_at = 0.0
+        # Whether the last lookup relied on change notifications
+        self._listening = False
+
+    async def _check_version(self, db: AsyncSession):
+        if change_listener.connected:
+            # Deletes arrive as notifications (on_change)
+            self._listening = True
+            return
+        if self._listening:
+            # The listener dropped: deletes since the last version seen may have been
+            # missed, so start over from an empty cache and a fresh baseline
+            self._listening = False
+            self.invalidate()
+            self._version = None
+            self._checked_at = 0.0
+        now = time.monotonic()
+        if now - self._checked_at < self.recheck_seconds:
+            return
+        self._checked_at = now
+        version = await db.scalar(select(DataVersion.version).where(DataVersion.name == DETAILS_VERSION)) or 0
+        if self._version is not None and version != self._version:
+            self.invalidate()
+        self._version = version
+
+    async def get(self, db: AsyncSession, error_id: str) -> Optional[bytes]:
+        if not self.entries.enabled:
+            return None
+        await self._check_version(db)
+        return self.entries.get(error_id)
+
+    def put(self, error_id: str, body: bytes):
+        self.entries.set(error_id, body)
+
+    def invalidate(self, error_id: Optional[str] = None):
+        """Forget one card, or every card"""
+        if error_id is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(error_id)
+
+    def on_change(self, change):
+        """Change listener handler: drop what a worker write or delete made stale"""
+        if change.get("stage") in ("rca_report", "deleted"):
+            self.invalidate(change.get("error_id"))
+        elif change.get("stage") == RESYNC:
+            # Deletes may have gone unnoticed while the listener was away
+            self.invalidate()
+            self._version = None
+
+
+detail_cache = DetailCache()
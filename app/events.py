@@ -0,0 +1,205 @@
+"""
+Server-sent events for the dashboard
+
+One broadcaster per API process watches the data version counters the worker
+bumps (a primary-key lookup every EVENTS_POLL_INTERVAL seconds). When they
+move it reads only the cards and RCA reports created since the last check,
+plus the stats rollups, and fans them out to every connected client as
+`error_card`, `rca_report` and `stats` events. On PostgreSQL the worker's
+`rca_events` notifications (app/notify.py) wake it as soon as a write
+commits, and polling drops to an EVENTS_NOTIFY_FALLBACK_SECONDS safety net.
+"""
+import os
+import json
+import asyncio
+import datetime
+from collections import deque
+from typing import Optional, Set
+from sqlalchemy import select, func
+from dotenv import load_dotenv
+
+from app.database import AsyncSessionLocal
+from app.models import ErrorMetric, RCAReport, DataVersion
+from app.rollups import read_stats
+from app.counters import parse_rca_severity
+from app.versions import ERRORS_VERSION, STATS_VERSION
+from app.notify import change_listener
+
+load_dotenv()
+
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "2"))
+# Poll interval while change notifications are being received
+EVENTS_NOTIFY_FALLBACK_SECONDS = float(os.getenv("EVENTS_NOTIFY_FALLBACK_SECONDS", "30"))
+EVENTS_KEEPALIVE_SECONDS = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+# Events buffered per client; a client that falls this far behind is disconnected
+# and resynchronises when its EventSource reconnects
+EVENTS_CLIENT_QUEUE = int(os.getenv("EVENTS_CLIENT_QUEUE", "256"))
+
+# Rows committed slightly out of created_at order are still picked up
+WATERMARK_OVERLAP = datetime.timedelta(seconds=30)
+
+
+def error_card_event(error: ErrorMetric):
+    return {
+        "id": error.id,
+        "env": error.env,
+        "service": error.service,
+        "span_kind": error.span_kind,
+        "http_code": error.http_code,
+        "exception": error.exception,
+        "root_name": error.root_name,
+        "count": error.count,
+        "window_start": error.window_start.isoformat(),
+        "window_end": error.window_end.isoformat(),
+        "created_at": error.created_at.isoformat(),
+        "trace_count": error.trace_count,
+        "span_count": error.span_count,
+        "log_count": error.log_count,
+        "has_rca": error.has_rca,
+        "rca_severity": error.rca_severity
+    }
+
+
+def rca_report_event(report: RCAReport, counts=None):
+    # The worker saves the report after the card's traces, spans and logs, so
+    # its counts are final here (error_card events go out before they exist)
+    return {
+        "id": report.id,
+        "error_metric_id": report.error_metric_id,
+        "analysis_summary": report.analysis_summary,
+        "rca_severity": parse_rca_severity(report.analysis_summary),
+        "created_at": report.created_at.isoformat(),
+        "counts": counts
+    }
+
+
+def format_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class Broadcaster:
+    def __init__(self, poll_interval: float = EVENTS_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._versions = None
+        # Newest created_at seen per table, as the database recorded it
+        self._watermarks = {}
+        # Ids already sent inside the overlap window
+        self._recent = deque(maxlen=1000)
+        # Set by change notifications to poll straight away
+        self._wake: Optional[asyncio.Event] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=EVENTS_CLIENT_QUEUE)
+        self.subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, message: str):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too slow to keep up: end its stream rather than buffer without bound
+                self.subscribers.discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    def on_change(self, change):
+        """Change listener handler: poll now rather than at the next interval"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self):
+        self._wake = asyncio.Event()
+        while self.subscribers:
+            self._wake.clear()
+            try:
+                await self.poll()
+            except Exception as e:
+                print(f"Event poll failed: {e}")
+            interval = EVENTS_NOTIFY_FALLBACK_SECONDS if change_listener.connected else self.poll_interval
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+        self._versions = None
+
+    async def poll(self):
+        """Publish what the worker committed since the previous poll"""
+        async with AsyncSessionLocal() as db:
+            versions = dict((await db.execute(
+                select(DataVersion.name, DataVersion.version)
+                .where(DataVersion.name.in_((ERRORS_VERSION, STATS_VERSION)))
+            )).all())
+            if self._versions is None:
+                # First poll after (re)starting: only changes from now on are news
+                self._versions = versions
+                for model in (ErrorMetric, RCAReport):
+                    latest = await db.scalar(select(func.max(model.created_at)))
+                    self._watermarks[model] = latest
+                    if latest is not None:
+                        # Rows inside the overlap window are old news too
+                        self._recent.extend((await db.execute(
+                            select(model.id).where(model.created_at >= latest - WATERMARK_OVERLAP)
+                        )).scalars())
+                return
+            if versions == self._versions:
+                return
+            self._versions = versions
+
+            for error in await self._new_rows(db, ErrorMetric):
+                self.publish(format_event("error_card", error_card_event(error)))
+            reports = await self._new_rows(db, RCAReport)
+            if reports:
+                counts = {row.id: {"traces": row.trace_count, "spans": row.span_count, "logs": row.log_count}
+                          for row in await db.execute(
+                              select(ErrorMetric.id, ErrorMetric.trace_count, ErrorMetric.span_count,
+                                     ErrorMetric.log_count)
+                              .where(ErrorMetric.id.in_({report.error_metric_id for report in reports}))
+                          )}
+                for report in reports:
+                    self.publish(format_event("rca_report", rca_report_event(report, counts.get(report.error_metric_id))))
+            self.publish(format_event("stats", await read_stats(db)))
+
+    async def _new_rows(self, db, model):
+        """Rows of `model` created since the last poll and not yet sent"""
+        query = select(model).order_by(model.created_at)
+        if self._watermarks.get(model) is not None:
+            query = query.where(model.created_at >= self._watermarks[model] - WATERMARK_OVERLAP)
+        rows = []
+        for row in (await db.execute(query)).scalars():
+            self._watermarks[model] = max(self._watermarks.get(model) or row.created_at, row.created_at)
+            if row.id not in self._recent:
+                self._recent.append(row.id)
+                rows.append(row)
+        return rows
+
+
+broadcaster = Broadcaster()
+
+
+async def event_stream(request):
+    """SSE body for one client: pushed events plus periodic keep-alive comments"""
+    queue = broadcaster.subscribe()
+    try:
+        # Reconnect quickly after a dropped connection
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                break
+            yield message
+    finally:
+        broadcaster.unsubscribe(queue)
@@ -0,0 +1,208 @@
+"""
+Streaming export of an error's correlation bundle
+
+Rows are read through server-side cursors (`yield_per`) and written out as
+they arrive, so a download starts immediately and memory stays flat however
+many logs an error has. Two formats are produced:
+
+- json:   the correlation document the worker builds (error_card,
+          trace_ids_hex, span_metadata, logs grouped by trace, rca_analysis)
+- ndjson: one {"kind": ..., ...} record per line, suited to jq/grep and to
+          loading back into other tools
+"""
+import json
+import zlib
+import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+from sqlalchemy import select
+from starlette.concurrency import iterate_in_threadpool
+
+from app.archive import iter_bundle_rows
+from app.models import ErrorMetric, Trace, Span, Log, RCAReport, ArchivedBundle
+from app.replicas import ReadSessionLocal
+
+MEDIA_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+# Rows fetched per round trip from the server-side cursor
+YIELD_PER = 1000
+# Small writes are coalesced into chunks of about this size
+CHUNK_BYTES = 64 * 1024
+
+
+def error_card(error: ErrorMetric) -> Dict[str, Any]:
+    return {
+        "env": error.env,
+        "service": error.service,
+        "span_kind": error.span_kind,
+        "http_code": error.http_code,
+        "exception": error.exception,
+        "root_name": error.root_name,
+        "count": error.count,
+        "window_start": error.window_start.strftime("%Y-%m-%d %H:%M:%S"),
+        "window_end": error.window_end.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def _timestamp(value) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+def span_metadata(span) -> Dict[str, Any]:
+    return {
+        "trace_id_hex": span["trace_id_hex"],
+        "span_id": span["span_id"],
+        "operation_name": span["operation_name"],
+        "start_time": _timestamp(span["start_time"]),
+        "duration": span["duration"],
+        "tags": span["tags"]
+    }
+
+
+async def _live_rows(db, error_metric_id: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """(kind, row) pairs from the live tables; logs come grouped by trace"""
+    queries = (
+        ("trace", select(Trace.trace_id_hex).where(Trace.error_metric_id == error_metric_id)),
+        ("span", select(Span.trace_id_hex, Span.span_id, Span.operation_name, Span.start_time,
+                        Span.duration, Span.tags).where(Span.error_metric_id == error_metric_id)),
+        ("log", select(Log.trace_id_hex, Log.log_data).where(Log.error_metric_id == error_metric_id)
+                .order_by(Log.trace_id_hex, Log.id)),
+    )
+    for kind, query in queries:
+        result = await db.stream(query.execution_options(yield_per=YIELD_PER))
+        async for row in result.mappings():
+            yield kind, row
+
+
+def _archived_rows(entry: ArchivedBundle, group_logs: bool) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(kind, row) pairs from an archived bundle, traces then spans then logs"""
+    if not group_logs:
+        yield from iter_bundle_rows(entry)
+        return
+    # First pass: traces and spans, and whether the logs are stored grouped by
+    # trace (the archiver writes them so; bundles from older releases are not)
+    trace_ids, seen, grouped = [], set(), True
+    for kind, row in iter_bundle_rows(entry):
+        if kind != "log":
+            yield kind, row
+        elif not trace_ids or row["trace_id_hex"] != trace_ids[-1]:
+            if row["trace_id_hex"] in seen:
+                grouped = False
+            else:
+                seen.add(row["trace_id_hex"])
+                trace_ids.append(row["trace_id_hex"])
+    # Then the logs, streamed again rather than held in memory: in one pass when
+    # they are grouped, otherwise one pass per trace
+    for trace_id in ([None] if grouped else trace_ids):
+        for kind, row in iter_bundle_rows(entry):
+            if kind == "log" and (grouped or row["trace_id_hex"] == trace_id):
+                yield kind, row
+
+
+class _Chunker:
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def add(self, text: str) -> bool:
+        self.parts.append(text)
+        self.size += len(text)
+        return self.size >= CHUNK_BYTES
+
+    def take(self) -> bytes:
+        chunk = "".join(self.parts).encode()
+        self.parts, self.size = [], 0
+        return chunk
+
+
+# Sections of the JSON document, in the order rows arrive
+SECTIONS = ("trace", "span", "log")
+OPENERS = {"trace": '"trace_ids_hex": [', "span": ', "span_metadata": [', "log": ', "logs": {'}
+
+
+def _close_section(section: str, empty: bool) -> str:
+    if section == "log":
+        return "}" if empty else "]}"
+    return "]"
+
+
+def _object_key(value) -> str:
+    # json.dumps writes a None dict key as "null"; keep the same document shape
+    return json.dumps("null" if value is None else str(value))
+
+
+async def _json_document(error: ErrorMetric, rows, rca) -> AsyncIterator[str]:
+    yield '{"error_card": ' + json.dumps(error_card(error)) + ", " + OPENERS["trace"]
+    section, empty, current_trace = 0, True, None
+    async for kind, row in rows:
+        target = SECTIONS.index(kind)
+        while section < target:
+            yield _close_section(SECTIONS[section], empty) + OPENERS[SECTIONS[section + 1]]
+            section, empty = section + 1, True
+        if kind == "trace":
+            if row["trace_id_hex"]:
+                yield ("" if empty else ", ") + json.dumps(row["trace_id_hex"])
+                empty = False
+        elif kind == "span":
+            yield ("" if empty else ", ") + json.dumps(span_metadata(row))
+            empty = False
+        elif empty or row["trace_id_hex"] != current_trace:
+            # Logs arrive grouped by trace: start the next "<trace_id>": [...] entry
+            yield ("" if empty else "], ") + _object_key(row["trace_id_hex"]) + ": [" + json.dumps(row["log_data"])
+            current_trace, empty = row["trace_id_hex"], False
+        else:
+            yield ", " + json.dumps(row["log_data"])
+    while section < len(SECTIONS) - 1:
+        yield _close_section(SECTIONS[section], empty) + OPENERS[SECTIONS[section + 1]]
+        section, empty = section + 1, True
+    yield _close_section("log", empty)
+    if rca:
+        yield ', "rca_analysis": ' + json.dumps({"summary": rca.analysis_summary, "correlation_data": rca.correlation_data})
+    yield "}"
+
+
+async def _ndjson_records(error: ErrorMetric, rows, rca) -> AsyncIterator[str]:
+    yield json.dumps({"kind": "error_card", "error_metric_id": error.id, **error_card(error)}) + "\n"
+    async for kind, row in rows:
+        if kind == "trace":
+            record = {"trace_id_hex": row["trace_id_hex"]}
+        elif kind == "span":
+            record = span_metadata(row)
+        else:
+            record = {"trace_id_hex": row["trace_id_hex"], "log_data": row["log_data"]}
+        yield json.dumps({"kind": kind, **record}) + "\n"
+    if rca:
+        yield json.dumps({"kind": "rca_analysis", "summary": rca.analysis_summary,
+                          "correlation_data": rca.correlation_data}) + "\n"
+
+
+async def stream_error_export(error: ErrorMetric, replica=None, fmt: str = "json",
+                              compress: bool = False) -> AsyncIterator[bytes]:
+    """Yield the export of `error` as bytes, optionally as a gzip stream"""
+    # The request's session is closed once the handler returns, so the
+    # stream reads through its own session on the same database
+    async with ReadSessionLocal(info={"replica": replica}) as db:
+        entry = await db.get(ArchivedBundle, error.id)
+        if entry:
+            rows = iterate_in_threadpool(_archived_rows(entry, group_logs=fmt == "json"))
+        else:
+            rows = _live_rows(db, error.id)
+        rca = (await db.execute(
+            select(RCAReport).where(RCAReport.error_metric_id == error.id).limit(1)
+        )).scalars().first()
+
+        pieces = _json_document(error, rows, rca) if fmt == "json" else _ndjson_records(error, rows, rca)
+        compressor = zlib.compressobj(wbits=31) if compress else None
+        chunker = _Chunker()
+        async for piece in pieces:
+            if chunker.add(piece):
+                chunk = chunker.take()
+                yield compressor.compress(chunk) if compressor else chunk
+        chunk = chunker.take()
+        if compressor:
+            yield compressor.compress(chunk) + compressor.flush()
+        elif chunk:
+            yield chunk
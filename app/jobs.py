@@ -0,0 +1,131 @@
+"""
+Ingestion cycles queued from the API and run by the worker
+
+POST /api/trigger-cycle only inserts a `cycle_jobs` row and returns its id.
+The worker claims queued jobs between its scheduled cycles and runs them
+through the same pipeline, recording progress and the time spent in each
+stage on the row, which /api/jobs/{id} reports.
+"""
+import os
+import time
+import datetime
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+
+from app.database import session_scope
+from app.models import CycleJob
+from app.writer import write_queue
+
+load_dotenv()
+
+# How often the idle worker looks for queued jobs
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "5"))
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+async def enqueue_cycle_job(db: AsyncSession, window_end: datetime.datetime) -> CycleJob:
+    """Queue a cycle for the 5-minute window ending at `window_end` (IST)"""
+    job = CycleJob(status=JOB_QUEUED, window_end=window_end.replace(tzinfo=None),
+                   requested_at=datetime.datetime.now())
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+def claim_next_job() -> Optional[Tuple[str, datetime.datetime]]:
+    """Mark the oldest queued job as running; returns its (id, window_end) or None"""
+    with session_scope() as db:
+        job = db.execute(
+            select(CycleJob).where(CycleJob.status == JOB_QUEUED)
+            .order_by(CycleJob.requested_at).limit(1)
+            # Several workers never claim the same job (ignored on SQLite)
+            .with_for_update(skip_locked=True)
+        ).scalars().first()
+        if job is None:
+            db.rollback()
+            return None
+        job.status = JOB_RUNNING
+        job.started_at = datetime.datetime.now()
+        claimed = (job.id, job.window_end)
+        db.commit()
+        return claimed
+
+
+def fail_interrupted_jobs() -> int:
+    """Jobs left running by a worker that stopped mid-cycle will never finish"""
+    with session_scope() as db:
+        failed = db.execute(
+            update(CycleJob).where(CycleJob.status == JOB_RUNNING)
+            .values(status=JOB_FAILED, finished_at=datetime.datetime.now(), error="Worker restarted during the cycle")
+        ).rowcount
+        db.commit()
+        return failed
+
+
+class JobTracker:
+    """Times the stages of one cycle and, for queued jobs, saves them on the job row"""
+
+    def __init__(self, job_id: Optional[str] = None):
+        self.job_id = job_id
+        self.stages: Dict[str, float] = {}
+        self.progress = {"cards_total": 0, "cards_done": 0}
+        self.error_metric_ids = []
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(self.stages.get(name, 0.0) + time.perf_counter() - started, 3)
+
+    def _save(self, values: Dict[str, Any]):
+        with session_scope() as db:
+            db.execute(update(CycleJob).where(CycleJob.id == self.job_id).values(**values))
+            db.commit()
+
+    def save(self, **values):
+        """Queue an update of the job row behind the cycle's own writes"""
+        if self.job_id is None:
+            return
+        values.update(progress=dict(self.progress), stages=dict(self.stages),
+                      error_metric_ids=list(self.error_metric_ids))
+        write_queue.submit(self._save, values)
+
+    def card_done(self, error_metric_id: Optional[str]):
+        if error_metric_id:
+            self.error_metric_ids.append(error_metric_id)
+        self.progress["cards_done"] += 1
+        self.save()
+
+    def finish(self, error: Optional[str] = None):
+        self.save(status=JOB_FAILED if error else JOB_SUCCEEDED, error=error,
+                  finished_at=datetime.datetime.now())
+        write_queue.join()
+
+
+def job_payload(job: CycleJob) -> Dict[str, Any]:
+    finished_or_now = job.finished_at or datetime.datetime.now()
+    return {
+        "id": job.id,
+        "status": job.status,
+        "window_end": job.window_end.isoformat(),
+        "requested_at": job.requested_at.isoformat() if job.requested_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "queued_seconds": round(((job.started_at or finished_or_now) - job.requested_at).total_seconds(), 3)
+        if job.requested_at else None,
+        "duration_seconds": round((finished_or_now - job.started_at).total_seconds(), 3) if job.started_at else None,
+        "progress": job.progress or {"cards_total": 0, "cards_done": 0},
+        "stages": job.stages or {},
+        "error_metric_ids": job.error_metric_ids or [],
+        "error": job.error
+    }
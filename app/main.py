@@ -1,19 +1,51 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from pydantic import BaseModel, Field
 from typing import List, Optional
+import os
 import datetime
-import pytz
 
-from app.database import get_db, engine
-from app.models import Base, ErrorMetric, Trace, Span, Log, RCAReport
-from app.ingestion import run_ingestion_cycle, get_next_5min_boundary
+from app.database import get_async_db, async_engine
+from app.replicas import get_read_db, read_from_primary, replica_set, stick_to_primary
+from app.models import ErrorMetric, RCAReport, CycleJob
+from app.jobs import enqueue_cycle_job, job_payload, JOB_SUCCEEDED, JOB_FAILED
+from app.archive import load_bundle_page
+from app.export import MEDIA_TYPES, stream_error_export
+from app.rollups import read_stats, hour_bucket
+from app.versions import ERRORS_VERSION, STATS_VERSION, validators_for
+from app.events import event_stream, broadcaster
+from app.notify import change_listener
+from app.traces import trace_timeline
+from app.details import sql_json_supported, error_detail_json, detail_cache
+from app.search import SEARCH_KINDS, SEARCH_MIN_LENGTH, search, search_supported
+from app.timeseries import TIMESERIES_MAX_BUCKETS, parse_interval, parse_group_by, bucket_origin, read_timeseries
+from app.metrics import REGISTRY, CONTENT_TYPE
+from app.serialization import ORJSONResponse, dumps
+from app.compression import CompressionMiddleware
+from app.telemetry import RequestMetricsMiddleware, recent_slow_queries
+from app.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, encode_cursor, decode_cursor, fetch_page, approximate_count
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Upper bound for the /api/errors look-back window (30 days)
+ERRORS_MAX_HOURS = int(os.getenv("API_ERRORS_MAX_HOURS", "720"))
+# Most ids one POST /api/errors/batch may ask for
+ERRORS_BATCH_MAX = int(os.getenv("API_ERRORS_BATCH_MAX", "500"))
+# Shared by all gunicorn workers (set by gunicorn.conf.py) so /metrics reports their totals
+API_METRICS_DIR = os.getenv("API_METRICS_DIR")
+# How often each worker publishes its metrics there
+API_METRICS_FLUSH_SECONDS = float(os.getenv("API_METRICS_FLUSH_SECONDS", "1"))
 
-app = FastAPI(title="RCA Platform API", version="1.0.0")
+# Columns /api/errors returns for each card, selected as plain tuples
+ERROR_LIST_COLUMNS = (
+    ErrorMetric.id, ErrorMetric.env, ErrorMetric.service, ErrorMetric.span_kind, ErrorMetric.http_code,
+    ErrorMetric.exception, ErrorMetric.root_name, ErrorMetric.count, ErrorMetric.window_start,
+    ErrorMetric.window_end, ErrorMetric.created_at, ErrorMetric.trace_count, ErrorMetric.span_count,
+    ErrorMetric.log_count, ErrorMetric.has_rca, ErrorMetric.rca_severity
+)
+
+app = FastAPI(title="RCA Platform API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -24,6 +56,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# brotli/gzip for JSON and NDJSON bodies, streamed downloads included
+app.add_middleware(CompressionMiddleware)
+
+# Outermost, so latency includes compression and sizes are what went over the wire
+app.add_middleware(RequestMetricsMiddleware)
+
+@app.on_event("startup")
+async def share_metrics():
+    if API_METRICS_DIR:
+        REGISTRY.share_directory(API_METRICS_DIR, API_METRICS_FLUSH_SECONDS)
+
+@app.on_event("startup")
+async def start_change_listener():
+    # Worker notifications (PostgreSQL) push events and invalidate cached details at once
+    change_listener.add_handler(broadcaster.on_change)
+    change_listener.add_handler(detail_cache.on_change)
+    change_listener.start()
+
+@app.on_event("shutdown")
+async def close_database_pools():
+    await change_listener.stop()
+    # Pooled aiosqlite connections each own a thread that would otherwise keep the process alive
+    await async_engine.dispose()
+    for replica in replica_set.replicas:
+        await replica.engine.dispose()
+
 @app.get("/")
 async def root():
     return {"message": "RCA Platform API", "status": "running"}
@@ -32,68 +90,64 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.datetime.now().isoformat()}
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics of the API, summed over all workers (per-route latency, database and pool telemetry)"""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.get("/metrics/slow-queries")
+async def slow_queries():
+    """Latest statements slower than SLOW_QUERY_MS in this API process, newest first"""
+    return {"slow_queries": recent_slow_queries()}
+
 @app.get("/api/errors")
 async def get_errors(
-    db: Session = Depends(get_db),
-    hours: int = Query(24, description="Number of hours to look back"),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    hours: int = Query(24, ge=1, le=ERRORS_MAX_HOURS, description="Number of hours to look back"),
     env: Optional[str] = Query(None, description="Filter by environment"),
-    service: Optional[str] = Query(None, description="Filter by service")
+    service: Optional[str] = Query(None, description="Filter by service"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Error cards per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
-    """Get error metrics for the last N hours"""
+    """Get error metrics for the last N hours, newest first, one page at a time"""
     end_time = datetime.datetime.now()
     start_time = end_time - datetime.timedelta(hours=hours)
     
-    query = db.query(ErrorMetric).filter(
+    # Cards start on 5-minute boundaries, so the result only changes when the worker
+    # writes or the window's start crosses one
+    window = start_time.replace(minute=start_time.minute - start_time.minute % 5, second=0, microsecond=0)
+    validators = await validators_for(db, ERRORS_VERSION, (hours, env, service, limit, cursor, window))
+    if validators.matches(request):
+        return validators.not_modified()
+    
+    query = select(*ERROR_LIST_COLUMNS).where(
         ErrorMetric.window_start >= start_time,
         ErrorMetric.window_start <= end_time
     )
     
     if env:
-        query = query.filter(ErrorMetric.env == env)
+        query = query.where(ErrorMetric.env == env)
     if service:
-        query = query.filter(ErrorMetric.service == service)
+        query = query.where(ErrorMetric.service == service)
     
-    errors = query.order_by(desc(ErrorMetric.window_start)).all()
+    errors, next_cursor = await fetch_page(
+        db, query, ErrorMetric.window_start, ErrorMetric.id, limit,
+        decode_cursor(cursor) if cursor else None
+    )
     
-    return {
-        "errors": [
-            {
-                "id": error.id,
-                "env": error.env,
-                "service": error.service,
-                "span_kind": error.span_kind,
-                "http_code": error.http_code,
-                "exception": error.exception,
-                "root_name": error.root_name,
-                "count": error.count,
-                "window_start": error.window_start.isoformat(),
-                "window_end": error.window_end.isoformat(),
-                "created_at": error.created_at.isoformat()
-            }
-            for error in errors
-        ],
-        "total": len(errors)
+    payload = {
+        "errors": [error._asdict() for error in errors],
+        "next_cursor": next_cursor
     }
+    # The total only needs computing once, for the first page
+    if not cursor:
+        payload["total"], payload["total_exact"] = await approximate_count(db, query)
+    # Returned directly so rows skip FastAPI's jsonable_encoder pass
+    return ORJSONResponse(payload, headers=validators.headers())
 
-@app.get("/api/errors/{error_id}")
-async def get_error_details(error_id: str, db: Session = Depends(get_db)):
-    """Get detailed information for a specific error"""
-    error = db.query(ErrorMetric).filter(ErrorMetric.id == error_id).first()
-    if not error:
-        raise HTTPException(status_code=404, detail="Error not found")
-    
-    # Get traces
-    traces = db.query(Trace).filter(Trace.error_metric_id == error_id).all()
-    
-    # Get spans for this error
-    spans = db.query(Span).filter(Span.error_metric_id == error_id).all()
-    
-    # Get logs for this error
-    logs = db.query(Log).filter(Log.error_metric_id == error_id).all()
-    
-    # Get RCA report
-    rca_report = db.query(RCAReport).filter(RCAReport.error_metric_id == error_id).first()
-    
+def error_card(error) -> dict:
+    """The "error" and "counts" parts of a detail response, from an ErrorMetric or a row of ERROR_LIST_COLUMNS"""
     return {
         "error": {
             "id": error.id,
@@ -106,166 +160,318 @@ async def get_error_details(error_id: str, db: Session = Depends(get_db)):
             "count": error.count,
             "window_start": error.window_start.isoformat(),
             "window_end": error.window_end.isoformat(),
-            "created_at": error.created_at.isoformat()
+            "created_at": error.created_at.isoformat(),
+            "has_rca": error.has_rca,
+            "rca_severity": error.rca_severity
         },
-        "traces": [
-            {
-                "id": trace.id,
-                "trace_id_hex": trace.trace_id_hex,
-                "trace_id_b64": trace.trace_id_b64,
-                "created_at": trace.created_at.isoformat()
-            }
-            for trace in traces
-        ],
-        "spans": [
-            {
-                "id": span.id,
-                "trace_id_hex": span.trace_id_hex,
-                "span_id": span.span_id,
-                "operation_name": span.operation_name,
-                "start_time": span.start_time.isoformat() if span.start_time else None,
-                "duration": span.duration,
-                "tags": span.tags,
-                "created_at": span.created_at.isoformat()
-            }
-            for span in spans
-        ],
-        "logs": [
-            {
-                "id": log.id,
-                "trace_id_hex": log.trace_id_hex,
-                "log_data": log.log_data,
-                "created_at": log.created_at.isoformat()
-            }
-            for log in logs
-        ],
-        "rca_report": {
-            "id": rca_report.id,
-            "analysis_summary": rca_report.analysis_summary,
-            "correlation_data": rca_report.correlation_data,
-            "created_at": rca_report.created_at.isoformat()
-        } if rca_report else None
+        # Traces, spans and logs are paged from the sub-resource endpoints below
+        "counts": {"traces": error.trace_count, "spans": error.span_count, "logs": error.log_count}
     }
 
-@app.get("/api/errors/{error_id}/download")
-async def download_error_data(error_id: str, db: Session = Depends(get_db)):
-    """Download complete correlation data for an error as JSON"""
-    error = db.query(ErrorMetric).filter(ErrorMetric.id == error_id).first()
-    if not error:
-        raise HTTPException(status_code=404, detail="Error not found")
+class ErrorBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=ERRORS_BATCH_MAX)
+
+@app.post("/api/errors/batch")
+async def get_errors_batch(batch: ErrorBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """Error cards with their counts and RCA summaries for up to ERRORS_BATCH_MAX ids, in two queries"""
+    # Read from the primary, like the detail view: highlighted cards may have just been written
+    error_ids = list(dict.fromkeys(batch.ids))
+    errors = (await db.execute(
+        select(*ERROR_LIST_COLUMNS).where(ErrorMetric.id.in_(error_ids))
+    )).all()
+    reports = {}
+    for report in (await db.execute(
+        select(RCAReport.error_metric_id, RCAReport.id, RCAReport.analysis_summary, RCAReport.created_at)
+        .where(RCAReport.error_metric_id.in_([error.id for error in errors]))
+    )).all():
+        reports.setdefault(report.error_metric_id, report)
     
-    # Get all related data
-    traces = db.query(Trace).filter(Trace.error_metric_id == error_id).all()
-    trace_ids = [trace.trace_id_hex for trace in traces if trace.trace_id_hex]
+    cards = {}
+    for error in errors:
+        report = reports.get(error.id)
+        cards[error.id] = {
+            **error_card(error),
+            # The summary only; correlation data stays on the detail endpoint
+            "rca_report": {
+                "id": report.id,
+                "analysis_summary": report.analysis_summary,
+                "created_at": report.created_at.isoformat()
+            } if report else None
+        }
+    return ORJSONResponse({
+        "errors": [cards[error_id] for error_id in error_ids if error_id in cards],
+        "missing": [error_id for error_id in error_ids if error_id not in cards]
+    })
+
+@app.get("/api/errors/{error_id}")
+async def get_error_details(error_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get an error card with its trace/span/log counts and RCA report"""
+    body = await detail_cache.get(db, error_id)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
     
-    spans = []
-    logs = []
-    if trace_ids:
-        spans = db.query(Span).filter(Span.trace_id.in_(trace_ids)).all()
-        logs = db.query(Log).filter(Log.trace_id.in_(trace_ids)).all()
+    # Read from the primary: Google Chat deep links arrive right after the worker writes the card
+    if sql_json_supported(db):
+        # One statement; PostgreSQL renders the JSON and it is passed through as is
+        detail = await error_detail_json(db, error_id)
+        if detail is None:
+            raise HTTPException(status_code=404, detail="Error not found")
+        body, has_report = detail
+    else:
+        error = await db.get(ErrorMetric, error_id)
+        if not error:
+            raise HTTPException(status_code=404, detail="Error not found")
+        
+        # Get RCA report
+        rca_report = (await db.execute(
+            select(RCAReport).where(RCAReport.error_metric_id == error_id).limit(1)
+        )).scalars().first()
+        
+        body = dumps({
+            **error_card(error),
+            "rca_report": {
+                "id": rca_report.id,
+                "analysis_summary": rca_report.analysis_summary,
+                "correlation_data": rca_report.correlation_data,
+                "created_at": rca_report.created_at.isoformat()
+            } if rca_report else None
+        })
+        has_report = rca_report is not None
     
-    rca_report = db.query(RCAReport).filter(RCAReport.error_metric_id == error_id).first()
+    # Until the RCA report is written the card can still change
+    if has_report:
+        detail_cache.put(error_id, body)
+    return Response(content=body, media_type="application/json")
+
+async def get_error_or_404(db: AsyncSession, error_id: str) -> ErrorMetric:
+    error = await db.get(ErrorMetric, error_id)
+    if not error and db.info.get("replica"):
+        # Freshly ingested cards may not have reached the replica yet
+        read_from_primary(db)
+        error = await db.get(ErrorMetric, error_id)
+    if not error:
+        raise HTTPException(status_code=404, detail="Error not found")
+    return error
+
+async def bundle_page(db: AsyncSession, error_id: str, kind: str, limit: int, cursor: Optional[str], **filters):
+    """A page of an error's traces/spans/logs plus the cursor for the next one"""
+    await get_error_or_404(db, error_id)
+    after = decode_cursor(cursor, nullable=True) if cursor else None
+    if after is not None and not isinstance(after[1], str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows, next_key = await load_bundle_page(db, error_id, kind, limit, after, **filters)
+    return rows, encode_cursor(*next_key) if next_key else None
+
+@app.get("/api/errors/{error_id}/traces")
+async def get_error_traces(
+    error_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    trace_id: Optional[str] = Query(None, description="Filter by trace id (hex)"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Traces per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """Page through the traces correlated with an error"""
+    traces, next_cursor = await bundle_page(db, error_id, "trace", limit, cursor, trace_id=trace_id)
+    return ORJSONResponse({
+        "traces": traces,
+        "next_cursor": next_cursor
+    })
+
+@app.get("/api/errors/{error_id}/spans")
+async def get_error_spans(
+    error_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    trace_id: Optional[str] = Query(None, description="Filter by trace id (hex)"),
+    operation_name: Optional[str] = Query(None, description="Filter by operation name"),
+    min_duration: Optional[float] = Query(None, ge=0, description="Only spans at least this long"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Spans per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """Page through the spans correlated with an error"""
+    spans, next_cursor = await bundle_page(
+        db, error_id, "span", limit, cursor,
+        trace_id=trace_id, operation_name=operation_name, min_duration=min_duration
+    )
+    return ORJSONResponse({
+        "spans": spans,
+        "next_cursor": next_cursor
+    })
+
+@app.get("/api/errors/{error_id}/logs")
+async def get_error_logs(
+    error_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    trace_id: Optional[str] = Query(None, description="Filter by trace id (hex)"),
+    level: Optional[str] = Query(None, description="Filter by log level (case-insensitive)"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Logs per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """Page through the logs correlated with an error"""
+    logs, next_cursor = await bundle_page(db, error_id, "log", limit, cursor, trace_id=trace_id, level=level)
+    return ORJSONResponse({
+        "logs": logs,
+        "next_cursor": next_cursor
+    })
+
+@app.get("/api/errors/{error_id}/download")
+async def download_error_data(
+    error_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json document or one record per line"),
+    gzip: bool = Query(False, description="Download as a .gz file")
+):
+    """Stream the complete correlation data for an error"""
+    error = await get_error_or_404(db, error_id)
     
-    # Build correlation data structure
-    correlation_data = {
-        "error_card": {
-            "env": error.env,
-            "service": error.service,
-            "span_kind": error.span_kind,
-            "http_code": error.http_code,
-            "exception": error.exception,
-            "root_name": error.root_name,
-            "count": error.count,
-            "window_start": error.window_start.strftime("%Y-%m-%d %H:%M:%S"),
-            "window_end": error.window_end.strftime("%Y-%m-%d %H:%M:%S")
-        },
-        "trace_ids_hex": trace_ids,
-        "span_metadata": [
-            {
-                "trace_id_hex": span.trace_id,
-                "span_id": span.span_id,
-                "operation_name": span.operation_name,
-                "start_time": span.start_time.timestamp() if span.start_time else None,
-                "duration": span.duration,
-                "tags": span.tags
-            }
-            for span in spans
-        ],
-        "logs": {}
-    }
+    filename = f"error-{error_id}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream_error_export(error, db.info.get("replica"), format, compress=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.get("/api/traces/{trace_id}")
+async def get_trace(
+    trace_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Spans and logs per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """Every span and log stored for a trace across error cards, deduplicated and in time order"""
+    validators = await validators_for(db, ERRORS_VERSION, (trace_id, limit, cursor))
+    if validators.matches(request):
+        return validators.not_modified()
     
-    # Group logs by trace_id
-    for log in logs:
-        if log.trace_id not in correlation_data["logs"]:
-            correlation_data["logs"][log.trace_id] = []
-        correlation_data["logs"][log.trace_id].append(log.log_data)
+    timeline = await trace_timeline(db, trace_id)
+    if timeline is None and db.info.get("replica"):
+        # Freshly ingested traces may not have reached the replica yet
+        read_from_primary(db)
+        timeline = await trace_timeline(db, trace_id)
+    if timeline is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
     
-    if rca_report:
-        correlation_data["rca_analysis"] = {
-            "summary": rca_report.analysis_summary,
-            "correlation_data": rca_report.correlation_data
-        }
+    after = decode_cursor(cursor, datetime_sort=False) if cursor else None
+    if after is not None and not all(isinstance(part, str) for part in after):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    items, next_key = timeline.page(limit, after)
+    return ORJSONResponse({
+        "trace_id": trace_id,
+        "error_metric_ids": timeline.error_metric_ids,
+        "counts": timeline.counts,
+        "items": items,
+        "next_cursor": encode_cursor(*next_key) if next_key else None
+    }, headers=validators.headers())
+
+@app.get("/api/search")
+async def search_text(
+    db: AsyncSession = Depends(get_read_db),
+    q: str = Query(..., min_length=SEARCH_MIN_LENGTH, max_length=200, description="Text to find"),
+    kind: str = Query("logs", pattern=f"^({'|'.join(SEARCH_KINDS)})$", description="Search log messages or RCA summaries"),
+    hours: int = Query(24, ge=1, le=ERRORS_MAX_HOURS, description="Number of hours to look back"),
+    env: Optional[str] = Query(None, description="Filter by environment"),
+    service: Optional[str] = Query(None, description="Filter by service"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Results per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """Ranked full-text search over log messages or RCA summaries of recent error cards"""
+    if not search_supported(db):
+        raise HTTPException(status_code=501, detail="Search is not supported on this database")
     
-    return correlation_data
+    end_time = datetime.datetime.now()
+    start_time = end_time - datetime.timedelta(hours=hours)
+    results, next_cursor = await search(
+        db, q, kind, start_time, end_time, env=env, service=service, limit=limit,
+        cursor=decode_cursor(cursor, datetime_sort=False) if cursor else None
+    )
+    return ORJSONResponse({
+        "results": [result._asdict() for result in results],
+        "next_cursor": next_cursor
+    })
 
-@app.get("/api/stats")
-async def get_stats(db: Session = Depends(get_db)):
-    """Get platform statistics"""
-    # Total errors in last 24 hours
+@app.get("/api/timeseries")
+async def get_timeseries(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    hours: int = Query(24, ge=1, le=ERRORS_MAX_HOURS, description="Number of hours to look back"),
+    interval: str = Query("1h", description="Bucket size, e.g. 5m, 1h or 1d"),
+    group_by: Optional[str] = Query(None, description="Comma-separated: env, service, http_code"),
+    env: Optional[str] = Query(None, description="Filter by environment"),
+    service: Optional[str] = Query(None, description="Filter by service"),
+    top: int = Query(10, ge=1, le=100, description="Series with the most errors to return")
+):
+    """Error cards per time bucket, one array of counts per env/service/http_code series"""
+    try:
+        seconds = parse_interval(interval)
+        groups = parse_group_by(group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     end_time = datetime.datetime.now()
-    start_time = end_time - datetime.timedelta(hours=24)
-    
-    total_errors = db.query(func.count(ErrorMetric.id)).filter(
-        ErrorMetric.window_start >= start_time
-    ).scalar()
-    
-    # Errors by environment
-    env_stats = db.query(
-        ErrorMetric.env,
-        func.count(ErrorMetric.id).label('count')
-    ).filter(
-        ErrorMetric.window_start >= start_time
-    ).group_by(ErrorMetric.env).all()
+    start_time = end_time - datetime.timedelta(hours=hours)
+    origin = bucket_origin(start_time, seconds)
+    buckets = int((end_time - origin).total_seconds()) // seconds + 1
+    if buckets > TIMESERIES_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"{buckets} buckets requested; use a larger interval (at most {TIMESERIES_MAX_BUCKETS} buckets)"
+        )
     
-    # Errors by service
-    service_stats = db.query(
-        ErrorMetric.service,
-        func.count(ErrorMetric.id).label('count')
-    ).filter(
-        ErrorMetric.window_start >= start_time
-    ).group_by(ErrorMetric.service).order_by(desc('count')).limit(10).all()
+    # The result only changes when the worker writes or a new bucket begins
+    validators = await validators_for(
+        db, ERRORS_VERSION, (hours, seconds, tuple(groups), env, service, top, origin, buckets)
+    )
+    if validators.matches(request):
+        return validators.not_modified()
     
-    # Total traces and logs
-    total_traces = db.query(func.count(Trace.id)).scalar()
-    total_logs = db.query(func.count(Log.id)).scalar()
-    total_rca_reports = db.query(func.count(RCAReport.id)).scalar()
+    payload = await read_timeseries(db, start_time, end_time, seconds, groups, env=env, service=service, top=top)
+    return ORJSONResponse(payload, headers=validators.headers())
+
+@app.get("/api/stats")
+async def get_stats(request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
+    """Get platform statistics from the hourly rollups the worker maintains"""
+    validators = await validators_for(db, STATS_VERSION, (hour_bucket(datetime.datetime.now()),))
+    if validators.matches(request):
+        return validators.not_modified()
+    validators.apply(response)
+    return await read_stats(db)
+
+@app.get("/api/events")
+async def events(request: Request):
+    """Server-sent events: new error cards, RCA reports and stats as the worker commits them"""
+    return StreamingResponse(
+        event_stream(request),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they are written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/trigger-cycle", status_code=202)
+async def trigger_manual_cycle(db: AsyncSession = Depends(get_async_db)):
+    """Queue an ingestion cycle for the worker; poll /api/jobs/{job_id} for its progress"""
+    # Imported here: the ingestion client pulls in requests, which only this endpoint needs
+    from app.ingestion import get_next_5min_boundary
     
+    next_boundary = get_next_5min_boundary()
+    job = await enqueue_cycle_job(db, next_boundary)
     return {
-        "last_24_hours": {
-            "total_errors": total_errors,
-            "environments": [{"env": env, "count": count} for env, count in env_stats],
-            "top_services": [{"service": service, "count": count} for service, count in service_stats]
-        },
-        "total_data": {
-            "traces": total_traces,
-            "logs": total_logs,
-            "rca_reports": total_rca_reports
-        }
+        "message": "Cycle queued",
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}",
+        "next_boundary": next_boundary.strftime("%Y-%m-%d %H:%M:%S")
     }
 
-@app.post("/api/trigger-cycle")
-async def trigger_manual_cycle():
-    """Manually trigger an ingestion cycle (for testing)"""
-    try:
-        next_boundary = get_next_5min_boundary()
-        correlation_data = run_ingestion_cycle(next_boundary)
-        return {
-            "message": "Manual cycle triggered successfully",
-            "error_cards_found": len(correlation_data),
-            "next_boundary": next_boundary.strftime("%Y-%m-%d %H:%M:%S")
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error triggering cycle: {str(e)}")
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Status, progress and per-stage timings of a queued cycle"""
+    # Read from the primary: the worker updates the row as the cycle advances
+    job = await db.get(CycleJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status in (JOB_SUCCEEDED, JOB_FAILED):
+        # The cards it wrote should be visible to this client straight away,
+        # however long the cycle ran; queueing it is too early to pin reads
+        stick_to_primary(response)
+    return job_payload(job)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,359 @@
+"""
+Minimal in-process metrics registry rendered in the Prometheus text format
+
+Under pre-forked API workers each process counts on its own. With a shared
+directory (share_directory) every process writes a snapshot of its metrics
+there each `interval` seconds and /metrics renders the sum over all of them,
+so a scrape sees the same totals whichever worker answers. Counters and
+histograms of exited workers are folded into one cumulative snapshot
+(mark_process_dead), so totals never go backwards; their gauges are dropped.
+"""
+import os
+import json
+import glob
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def collect(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        """(label values, value) of every series"""
+        raise NotImplementedError
+
+    def merge(self, value, other):
+        """Combine one series' values from two processes"""
+        return value + other
+
+    def samples(self, items=None) -> List[str]:
+        items = self.collect() if items is None else items
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in items]
+
+    def render(self, items=None) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples(items))
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, description, labels=()):
+        super().__init__(name, description, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self):
+        with self._lock:
+            return list(self._values.items())
+
+
+class Gauge(_Metric):
+    """
+    A gauge that is either set directly or read from a callback at scrape time.
+    `aggregate` ("sum", "max" or "min") combines the values of several processes.
+    """
+    kind = "gauge"
+
+    def __init__(self, name, description, labels=(), aggregate: str = "sum"):
+        super().__init__(name, description, labels)
+        self.aggregate = aggregate
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callbacks: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, callback: Callable[[], float], **labels):
+        with self._lock:
+            self._callbacks[self._key(labels)] = callback
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._callbacks:
+            return self._callbacks[key]()
+        return self._values.get(key, 0.0)
+
+    def collect(self):
+        with self._lock:
+            items = list(self._values.items())
+            callbacks = list(self._callbacks.items())
+        items.extend((key, callback()) for key, callback in callbacks)
+        return items
+
+    def merge(self, value, other):
+        if self.aggregate == "max":
+            return max(value, other)
+        if self.aggregate == "min":
+            return min(value, other)
+        return value + other
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name, description, labels=(), buckets: Optional[Iterable[float]] = None):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS))
+        # key -> (per-bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def collect(self):
+        with self._lock:
+            return [(key, [list(state[0]), state[1], state[2]]) for key, state in self._values.items()]
+
+    def merge(self, value, other):
+        return _add(value, other)
+
+    def samples(self, items=None):
+        lines = []
+        items = self.collect() if items is None else items
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        # Shared snapshot directory when several processes serve the same /metrics
+        self.directory: Optional[str] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._snapshot_lock = threading.Lock()
+        self._started: Optional[int] = None
+
+    def _register(self, metric_class, name, description, labels=(), **kwargs):
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                return existing
+            metric = metric_class(name, description, labels, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+    def counter(self, name, description, labels=()) -> Counter:
+        return self._register(Counter, name, description, labels)
+
+    def gauge(self, name, description, labels=(), aggregate="sum") -> Gauge:
+        return self._register(Gauge, name, description, labels, aggregate=aggregate)
+
+    def histogram(self, name, description, labels=(), buckets=None) -> Histogram:
+        return self._register(Histogram, name, description, labels, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        if self.directory is None:
+            return "\n".join(metric.render() for metric in metrics) + "\n"
+        self.write_snapshot()
+        merged = _merge_snapshots(metrics, _snapshot_files(self.directory))
+        return "\n".join(metric.render(list(merged[metric.name].items())) for metric in metrics) + "\n"
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {"kind": metric.kind, "series": [[list(key), value] for key, value in metric.collect()]}
+            for metric in metrics
+        }
+
+    def write_snapshot(self):
+        # Unique per process, even when a later worker is given the same pid
+        path = os.path.join(self.directory, f"{os.getpid()}-{self._started}.json")
+        with self._snapshot_lock:
+            _write_json(path, self.snapshot())
+
+    def share_directory(self, directory: str, interval: float = 1.0):
+        """Publish this process's metrics in `directory` and render the sum of every process there"""
+        self.directory = directory
+        if self._flusher is not None:
+            return
+        self._started = time.time_ns()
+
+        def flush():
+            while True:
+                try:
+                    self.write_snapshot()
+                except OSError as e:
+                    print(f"⚠ Could not write metrics snapshot: {e}")
+                time.sleep(interval)
+
+        self._flusher = threading.Thread(target=flush, name="metrics-snapshot", daemon=True)
+        self._flusher.start()
+
+
+REGISTRY = Registry()
+
+# Cumulative counters and histograms of the processes that have exited
+RETIRED_SNAPSHOT = "retired.json"
+RETIRED_REMEMBER_SECONDS = 300
+
+
+def _write_json(path: str, data):
+    # Written aside and renamed, so readers never see half a snapshot
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(data, f)
+    os.replace(temporary, path)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _snapshot_files(directory: str) -> List[dict]:
+    for _ in range(3):
+        paths = glob.glob(os.path.join(directory, "*.json"))
+        snapshots = {os.path.basename(path): _read_json(path) for path in paths}
+        if None not in snapshots.values():
+            break
+        # A snapshot was folded into the retired one between listing and reading it
+    retired = snapshots.get(RETIRED_SNAPSHOT) or {"folded": {}, "metrics": {}}
+    # Snapshots the retired totals already include are skipped, whichever was read first
+    return [retired["metrics"]] + [
+        snapshot for name, snapshot in snapshots.items()
+        if snapshot is not None and name != RETIRED_SNAPSHOT and name not in retired["folded"]
+    ]
+
+
+def _merge_snapshots(metrics: List[_Metric], snapshots: List[dict]) -> Dict[str, Dict[Tuple[str, ...], Any]]:
+    merged = {metric.name: {} for metric in metrics}
+    by_name = {metric.name: metric for metric in metrics}
+    for snapshot in snapshots:
+        for name, data in snapshot.items():
+            metric = by_name.get(name)
+            if metric is None:
+                continue
+            values = merged[name]
+            for key, value in data["series"]:
+                key = tuple(key)
+                values[key] = metric.merge(values[key], value) if key in values else value
+    return merged
+
+
+def mark_process_dead(directory: str, pid: int):
+    """
+    Fold an exited process's counters and histograms into the retired totals and
+    drop its gauges (called by the gunicorn master from child_exit)
+    """
+    retired_path = os.path.join(directory, RETIRED_SNAPSHOT)
+    retired = _read_json(retired_path) or {"folded": {}, "metrics": {}}
+    now = time.time()
+    # Long enough for any scrape that listed a folded snapshot to have finished with it
+    retired["folded"] = {name: at for name, at in retired["folded"].items() if now - at < RETIRED_REMEMBER_SECONDS}
+    paths = glob.glob(os.path.join(directory, f"{pid}-*.json"))
+    for path in paths:
+        snapshot = _read_json(path)
+        if snapshot is None:
+            continue
+        for name, data in snapshot.items():
+            if data["kind"] == "gauge":
+                continue
+            totals = {tuple(key): value for key, value in retired["metrics"].get(name, {}).get("series", [])}
+            for key, value in data["series"]:
+                key = tuple(key)
+                totals[key] = _add(totals[key], value) if key in totals else value
+            retired["metrics"][name] = {
+                "kind": data["kind"], "series": [[list(key), value] for key, value in totals.items()]
+            }
+        retired["folded"][os.path.basename(path)] = now
+    # The new totals name the snapshots they include before those are removed, so
+    # a scrape never counts a process twice or not at all
+    _write_json(retired_path, retired)
+    for path in paths:
+        os.remove(path)
+
+
+def _add(value, other):
+    if isinstance(value, list):
+        # Histogram: per-bucket counts, sum, count
+        return [[a + b for a, b in zip(value[0], other[0])], value[1] + other[1], value[2] + other[2]]
+    return value + other
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0"):
+    """Serve REGISTRY on /metrics from a daemon thread (for processes without an HTTP API)"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = REGISTRY.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE + "; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"📈 Serving metrics on http://{host}:{port}/metrics")
+    return server
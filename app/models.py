@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, JSON, Index
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Float, Text, JSON, Boolean, Index, false
 from sqlalchemy.sql import func
 from app.database import Base
 import uuid
@@ -17,10 +17,18 @@ class ErrorMetric(Base):
     window_start = Column(DateTime, nullable=False)
     window_end = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=func.now())
+    # Denormalised by the worker as it saves each batch, so lists need no joins
+    trace_count = Column(Integer, nullable=False, default=0, server_default='0')
+    span_count = Column(Integer, nullable=False, default=0, server_default='0')
+    log_count = Column(Integer, nullable=False, default=0, server_default='0')
+    has_rca = Column(Boolean, nullable=False, default=False, server_default=false())
+    rca_severity = Column(String, nullable=True)
     
     __table_args__ = (
         Index('idx_error_metrics_timestamp', 'window_start', 'window_end'),
         Index('idx_error_metrics_env_service', 'env', 'service'),
+        # Keyset pagination order for /api/errors
+        Index('idx_error_metrics_window_start_id', 'window_start', 'id'),
     )
 
 class Trace(Base):
@@ -33,7 +41,7 @@ class Trace(Base):
     created_at = Column(DateTime, default=func.now())
     
     __table_args__ = (
-        Index('idx_traces_error_metric', 'error_metric_id'),
+        Index('idx_traces_error_metric', 'error_metric_id', 'created_at', 'id'),
         Index('idx_traces_trace_id', 'trace_id_hex'),
     )
 
@@ -51,7 +59,7 @@ class Span(Base):
     created_at = Column(DateTime, default=func.now())
     
     __table_args__ = (
-        Index('idx_spans_error_metric', 'error_metric_id'),
+        Index('idx_spans_error_metric', 'error_metric_id', 'start_time', 'id'),
         Index('idx_spans_trace_id', 'trace_id_hex'),
         Index('idx_spans_start_time', 'start_time'),
     )
@@ -66,7 +74,7 @@ class Log(Base):
     created_at = Column(DateTime, default=func.now())
     
     __table_args__ = (
-        Index('idx_logs_error_metric', 'error_metric_id'),
+        Index('idx_logs_error_metric', 'error_metric_id', 'created_at', 'id'),
         Index('idx_logs_trace_id', 'trace_id_hex'),
         Index('idx_logs_created_at', 'created_at'),
     )
@@ -83,4 +91,80 @@ class RCAReport(Base):
     __table_args__ = (
         Index('idx_rca_error_metric', 'error_metric_id'),
         Index('idx_rca_created_at', 'created_at'),
-    ) 
\ No newline at end of file
+    )
+
+class ArchivedBundle(Base):
+    __tablename__ = "archived_bundles"
+    
+    error_metric_id = Column(String, primary_key=True)
+    segment = Column(String, nullable=False)
+    offset = Column(BigInteger, nullable=False)
+    length = Column(BigInteger, nullable=False)
+    codec = Column(String, nullable=False)
+    trace_count = Column(Integer, nullable=False, default=0)
+    span_count = Column(Integer, nullable=False, default=0)
+    log_count = Column(Integer, nullable=False, default=0)
+    archived_at = Column(DateTime, default=func.now())
+    
+    __table_args__ = (
+        Index('idx_archived_bundles_segment', 'segment'),
+    )
+
+class ArchivedTrace(Base):
+    """Trace ids inside each archived bundle, so /api/traces can find them"""
+    __tablename__ = "archived_traces"
+    
+    trace_id_hex = Column(String, primary_key=True)
+    error_metric_id = Column(String, primary_key=True)
+
+class ErrorRollup(Base):
+    """Error cards per hour of window_start, maintained by the worker"""
+    __tablename__ = "error_rollups_hourly"
+    
+    bucket = Column(DateTime, primary_key=True)
+    env = Column(String, primary_key=True, default='')
+    service = Column(String, primary_key=True, default='')
+    http_code = Column(String, primary_key=True, default='')
+    error_count = Column(BigInteger, nullable=False, default=0)
+
+class VolumeRollup(Base):
+    """Traces, spans, logs and RCA reports ingested per hour, maintained by the worker"""
+    __tablename__ = "volume_rollups_hourly"
+    
+    bucket = Column(DateTime, primary_key=True)
+    traces = Column(BigInteger, nullable=False, default=0)
+    spans = Column(BigInteger, nullable=False, default=0)
+    logs = Column(BigInteger, nullable=False, default=0)
+    rca_reports = Column(BigInteger, nullable=False, default=0)
+
+class DataVersion(Base):
+    """Write counters the API turns into ETags; bumped by the worker with each save"""
+    __tablename__ = "data_versions"
+    
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    # Naive UTC, used for Last-Modified
+    updated_at = Column(DateTime, nullable=False)
+
+class CycleJob(Base):
+    """An ingestion cycle requested through the API and run by the worker"""
+    __tablename__ = "cycle_jobs"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    # queued -> running -> succeeded | failed
+    status = Column(String, nullable=False, default='queued')
+    # End of the 5-minute window to ingest, naive IST like the cards' windows
+    window_end = Column(DateTime, nullable=False)
+    requested_at = Column(DateTime, default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # {"cards_total": n, "cards_done": n}
+    progress = Column(JSON, nullable=True)
+    # Seconds spent per stage: ingestion, save, rca, alert, flush
+    stages = Column(JSON, nullable=True)
+    error_metric_ids = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_cycle_jobs_status_requested', 'status', 'requested_at'),
+    )
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+Change notifications from the worker to the API over PostgreSQL LISTEN/NOTIFY
+
+The worker calls notify_change() inside each write transaction; PostgreSQL
+delivers the `rca_events` notification when (and only if) the transaction
+commits, with a JSON payload {"error_id": ..., "stage": ...}. Every API process
+runs one ChangeListener on a dedicated connection and passes each payload to
+its handlers: the SSE broadcaster wakes up at once instead of waiting for its
+next poll, and the detail cache forgets cards that changed. After a
+(re)connect the handlers get a "resync" change, since notifications sent
+while disconnected are lost.
+
+SQLite has no notifications, and transaction-mode PgBouncer cannot hold a
+LISTEN, so there the API keeps polling the data version counters (set
+EVENTS_LISTEN_URL to a direct PostgreSQL connection to listen anyway).
+"""
+import os
+import json
+import asyncio
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CHANNEL = "rca_events"
+EVENTS_LISTEN = os.getenv("EVENTS_LISTEN", "true").lower() in ("1", "true", "yes", "on")
+# Connection used for LISTEN (default: DATABASE_URL unless it goes through PgBouncer)
+EVENTS_LISTEN_URL = os.getenv("EVENTS_LISTEN_URL")
+# Seconds between liveness checks of the listening connection
+EVENTS_LISTEN_KEEPALIVE = float(os.getenv("EVENTS_LISTEN_KEEPALIVE", "30"))
+
+# Stages: error_card, traces, spans, logs and rca_report from the worker, deleted
+# from cleanup jobs; resync is sent locally after the listener (re)connects
+RESYNC = "resync"
+
+
+def notify_change(db, stage: str, error_id: Optional[str] = None):
+    """Announce a change to listening API processes once `db`'s transaction commits (PostgreSQL only)"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    payload = json.dumps({"error_id": error_id, "stage": stage})
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+
+class ChangeListener:
+    """One LISTEN connection per API process, reconnecting until stopped"""
+
+    def __init__(self):
+        self.handlers: List[Callable[[Dict], None]] = []
+        self.connected = False
+        self._task: Optional[asyncio.Task] = None
+
+    def add_handler(self, handler: Callable[[Dict], None]):
+        self.handlers.append(handler)
+
+    def listen_url(self) -> Optional[str]:
+        from app.database import DATABASE_URL, PGBOUNCER_MODE
+
+        if not EVENTS_LISTEN:
+            return None
+        if EVENTS_LISTEN_URL:
+            return EVENTS_LISTEN_URL
+        if make_url(DATABASE_URL).get_backend_name() != "postgresql" or PGBOUNCER_MODE:
+            return None
+        return DATABASE_URL
+
+    def start(self):
+        """Start listening in the background if the database supports it"""
+        url = self.listen_url()
+        if url is None or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(url))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def dispatch(self, change: Dict):
+        for handler in self.handlers:
+            try:
+                handler(change)
+            except Exception as e:
+                print(f"⚠ Change handler failed: {e}")
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            return
+        self.dispatch(change)
+
+    async def _listen(self, url: str):
+        from sqlalchemy.ext.asyncio import create_async_engine
+        from app.database import to_async_url
+
+        async_url, connect_args = to_async_url(url)
+        engine = create_async_engine(async_url, poolclass=NullPool, connect_args=connect_args)
+        try:
+            async with engine.connect() as conn:
+                raw = (await conn.get_raw_connection()).driver_connection
+                closed = asyncio.Event()
+                raw.add_termination_listener(lambda connection: closed.set())
+                await raw.add_listener(CHANNEL, self._on_notification)
+                self.connected = True
+                print(f"📡 Listening for {CHANNEL} notifications")
+                self.dispatch({"error_id": None, "stage": RESYNC})
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), timeout=EVENTS_LISTEN_KEEPALIVE)
+                    except asyncio.TimeoutError:
+                        # A dropped TCP connection only shows up once something is sent
+                        await raw.fetchval("SELECT 1", timeout=EVENTS_LISTEN_KEEPALIVE)
+        finally:
+            self.connected = False
+            await engine.dispose()
+
+    async def _run(self, url: str):
+        delay = 1.0
+        while True:
+            try:
+                await self._listen(url)
+                print(f"⚠ {CHANNEL} listener connection closed; polling until it reconnects")
+                delay = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠ {CHANNEL} listener disconnected ({e}); polling until it reconnects")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+
+change_listener = ChangeListener()
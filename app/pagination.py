@@ -0,0 +1,88 @@
+"""
+Keyset (cursor) pagination helpers for list endpoints
+
+Pages are ordered newest first on a sort column plus the primary key, and the
+cursor encodes the last row's (sort value, id) so the next page starts with
+an index range scan instead of an OFFSET that re-reads every earlier row.
+"""
+import os
+import json
+import base64
+import datetime
+from fastapi import HTTPException
+from sqlalchemy import select, func, and_, or_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+PAGE_SIZE_DEFAULT = int(os.getenv("API_PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("API_PAGE_SIZE_MAX", "500"))
+# Counting stops here; larger totals are reported as an estimate
+EXACT_COUNT_LIMIT = int(os.getenv("API_EXACT_COUNT_LIMIT", "10000"))
+
+
+def encode_cursor(sort_value, row_id) -> str:
+    if isinstance(sort_value, datetime.datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, datetime_sort: bool = True, nullable: bool = False):
+    """
+    Inverse of encode_cursor; a malformed cursor is a 400, not a 500.
+    With `nullable` a null sort value (a row without a time) is passed through.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if datetime_sort and not (nullable and sort_value is None):
+            sort_value = datetime.datetime.fromisoformat(sort_value)
+        return sort_value, row_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_cursor(sort_column, id_column, cursor):
+    """Rows that come after `cursor` in (sort_column DESC, id_column DESC) order"""
+    sort_value, row_id = cursor
+    return or_(
+        sort_column < sort_value,
+        and_(sort_column == sort_value, id_column < row_id)
+    )
+
+
+async def fetch_page(db: AsyncSession, query, sort_column, id_column, limit: int, cursor=None):
+    """
+    One page of `query` plus the cursor for the next page (None on the last page).
+    `query` selects plain columns, including sort_column and id_column; rows come back as tuples.
+    """
+    if cursor is not None:
+        query = query.where(after_cursor(sort_column, id_column, cursor))
+    query = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+
+async def approximate_count(db: AsyncSession, query):
+    """
+    Count the rows matched by `query`, giving up after EXACT_COUNT_LIMIT rows.
+    Returns (total, exact); beyond the limit PostgreSQL's planner estimate is used.
+    """
+    capped = query.with_only_columns(query.selected_columns[0]).limit(EXACT_COUNT_LIMIT + 1).subquery()
+    total = await db.scalar(select(func.count()).select_from(capped))
+    if total <= EXACT_COUNT_LIMIT:
+        return total, True
+
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql":
+        compiled = query.compile(bind, compile_kwargs={"literal_binds": True})
+        plan = await db.scalar(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        return max(estimate, EXACT_COUNT_LIMIT + 1), False
+    return EXACT_COUNT_LIMIT + 1, False
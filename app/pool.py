@@ -0,0 +1,79 @@
+"""
+Connection pools that export checkout wait time, active connections and overflow events
+"""
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from app.metrics import REGISTRY
+
+POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "rca_db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    labels=("role", "engine"),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+POOL_OVERFLOW_EVENTS = REGISTRY.counter(
+    "rca_db_pool_overflow_total",
+    "Connections opened beyond pool_size (max_overflow headroom used)",
+    labels=("role", "engine")
+)
+POOL_TIMEOUTS = REGISTRY.counter(
+    "rca_db_pool_timeouts_total",
+    "Checkouts that gave up after pool_timeout seconds",
+    labels=("role", "engine")
+)
+POOL_CHECKED_OUT = REGISTRY.gauge(
+    "rca_db_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+    labels=("role", "engine")
+)
+POOL_SIZE = REGISTRY.gauge(
+    "rca_db_pool_connections",
+    "Connections currently held by the pool (idle and checked out)",
+    labels=("role", "engine")
+)
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout; labels are attached once the engine is built"""
+    metric_labels = {"role": "unknown", "engine": "unknown"}
+
+    def instrument(self, **labels):
+        self.metric_labels = labels
+        POOL_CHECKED_OUT.set_function(self.checkedout, **labels)
+        POOL_SIZE.set_function(lambda: self.checkedin() + self.checkedout(), **labels)
+        return self
+
+    def connect(self):
+        overflow_before = self._overflow
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc(**self.metric_labels)
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, **self.metric_labels)
+        if self._overflow > overflow_before and self._overflow > 0:
+            POOL_OVERFLOW_EVENTS.inc(**self.metric_labels)
+        return connection
+
+    def recreate(self):
+        # Pools are recreated on dispose(); keep exporting under the same labels
+        return super().recreate().instrument(**self.metric_labels)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine, role: str, name: str):
+    """Attach metric labels to an engine's pool if it is an instrumented one"""
+    if isinstance(engine.pool, _InstrumentedPoolMixin):
+        engine.pool.instrument(role=role, engine=name)
+    return engine
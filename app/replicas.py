@@ -0,0 +1,168 @@
+"""
+Read-replica routing for the API's read-only endpoints
+
+Read sessions pin one healthy replica for their lifetime and send every
+SELECT there, while flushes (and therefore all writes) always go to the
+primary. Replicas are probed for replication lag at most once every
+REPLICA_LAG_CHECK_INTERVAL seconds; a replica that is further behind than
+REPLICA_MAX_LAG_SECONDS, or cannot be reached, is skipped until the next
+probe, and when none qualify reads fall back to the primary.
+"""
+import os
+import time
+import asyncio
+import itertools
+from typing import List, Optional
+from fastapi import Request, Response
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+
+from app.database import async_engine, build_async_engine
+from app.metrics import REGISTRY
+from app.models import ErrorMetric
+
+load_dotenv()
+
+# Comma-separated replica URLs in the same (sync) form as DATABASE_URL
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "30"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "10"))
+
+# Clients that just wrote something carry this cookie and read from the primary
+READ_PRIMARY_COOKIE = "rca_read_primary"
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+# Streaming standbys report replay lag directly; an idle primary leaves the
+# replay timestamp behind, so a fully replayed standby counts as zero lag
+PG_STANDBY_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+REPLICA_LAG = REGISTRY.gauge(
+    "rca_db_replica_lag_seconds",
+    "Replication lag measured at the last probe (-1 when the replica is unreachable)",
+    labels=("replica",),
+    aggregate="max"
+)
+REPLICA_HEALTHY = REGISTRY.gauge(
+    "rca_db_replica_healthy",
+    "1 when the replica is within REPLICA_MAX_LAG_SECONDS and serving reads",
+    labels=("replica",),
+    aggregate="min"
+)
+
+
+class Replica:
+    def __init__(self, url: str, index: int):
+        self.url = url
+        self.name = f"replica-{index}"
+        self.engine = build_async_engine(url, name=self.name)
+        self.lag: Optional[float] = None
+        self.healthy = True
+        REPLICA_LAG.set_function(lambda: -1 if self.lag is None else self.lag, replica=self.name)
+        REPLICA_HEALTHY.set_function(lambda: 1 if self.healthy else 0, replica=self.name)
+
+
+class ReplicaSet:
+    """Tracks replica lag and hands out a healthy replica round-robin"""
+
+    def __init__(self, urls: List[str], max_lag: float = REPLICA_MAX_LAG_SECONDS,
+                 check_interval: float = REPLICA_LAG_CHECK_INTERVAL):
+        self.replicas = [Replica(url, index) for index, url in enumerate(urls)]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+
+    async def _watermark(self, engine) -> Optional[float]:
+        async with engine.connect() as conn:
+            latest = await conn.scalar(select(func.max(ErrorMetric.created_at)))
+        return latest.timestamp() if latest else None
+
+    async def _measure_lag(self, replica: Replica, primary_watermark: Optional[float]) -> float:
+        if replica.engine.dialect.name == "postgresql":
+            async with replica.engine.connect() as conn:
+                lag = await conn.scalar(PG_STANDBY_LAG_SQL)
+            if lag is not None:
+                return float(lag)
+        # Not a streaming standby (or not Postgres): compare the newest error card
+        replica_watermark = await self._watermark(replica.engine)
+        if primary_watermark is None:
+            return 0.0
+        if replica_watermark is None:
+            return float("inf")
+        return max(0.0, primary_watermark - replica_watermark)
+
+    async def refresh(self):
+        """Re-measure every replica's lag against the primary"""
+        try:
+            primary_watermark = await self._watermark(async_engine)
+        except Exception as e:
+            print(f"Replica lag check could not read the primary: {e}")
+            primary_watermark = None
+        for replica in self.replicas:
+            try:
+                replica.lag = await self._measure_lag(replica, primary_watermark)
+                replica.healthy = replica.lag <= self.max_lag
+            except Exception as e:
+                print(f"Replica lag check failed for {replica.name}: {e}")
+                replica.lag = None
+                replica.healthy = False
+        self._checked_at = time.monotonic()
+
+    async def choose(self) -> Optional[Replica]:
+        """A replica within the lag budget, or None to read from the primary"""
+        if not self.replicas:
+            return None
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            async with self._lock:
+                if time.monotonic() - self._checked_at >= self.check_interval:
+                    await self.refresh()
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica
+        return None
+
+
+class RoutingSession(Session):
+    """Sends reads to the replica pinned in session.info and everything else to the primary"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if replica is None or self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            return async_engine.sync_engine
+        return replica.engine.sync_engine
+
+
+replica_set = ReplicaSet(DATABASE_REPLICA_URLS)
+ReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession, sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+)
+
+
+async def get_read_db(request: Request):
+    """Session for read-only endpoints, served by a replica when one is fresh enough"""
+    replica = None
+    if not (request.cookies.get(READ_PRIMARY_COOKIE) or request.headers.get(READ_PRIMARY_HEADER)):
+        replica = await replica_set.choose()
+    async with ReadSessionLocal(info={"replica": replica}) as db:
+        yield db
+
+
+def read_from_primary(db: AsyncSession):
+    """Route the rest of a read session to the primary (e.g. after a miss on a lagging replica)"""
+    db.info["replica"] = None
+
+
+def stick_to_primary(response: Response):
+    """Keep this client's reads on the primary until replicas have caught up with its write"""
+    response.set_cookie(READ_PRIMARY_COOKIE, "1", max_age=max(1, int(REPLICA_MAX_LAG_SECONDS)), httponly=True)
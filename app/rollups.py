@@ -0,0 +1,143 @@
+"""
+Hourly rollups behind /api/stats
+
+The worker bumps these counters in the same transaction that saves each
+card, trace batch, span batch, log batch and RCA report, so the stats
+endpoint reads at most a day of small buckets instead of scanning the raw
+tables. Error buckets are keyed by the hour of the card's window_start;
+volume buckets by the hour the rows were ingested, and they keep counting
+rows after they are moved to the cold archive.
+"""
+import datetime
+from typing import Dict
+from sqlalchemy import select, func, desc, delete, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import upsert_increment
+from app.models import ErrorMetric, Trace, Span, Log, RCAReport, ArchivedBundle, ErrorRollup, VolumeRollup
+from app.versions import bump_versions, STATS_VERSION
+
+STATS_HOURS = 24
+
+
+def hour_bucket(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def record_error(db, error: ErrorMetric):
+    """Count a new error card; call before the card's transaction commits"""
+    upsert_increment(db, ErrorRollup, {
+        "bucket": hour_bucket(error.window_start),
+        "env": error.env or '',
+        "service": error.service or '',
+        "http_code": error.http_code or '',
+    }, {"error_count": 1})
+
+
+def record_volume(db, traces: int = 0, spans: int = 0, logs: int = 0, rca_reports: int = 0):
+    """Count rows ingested this hour; call before their transaction commits"""
+    upsert_increment(db, VolumeRollup, {"bucket": hour_bucket(datetime.datetime.now())}, {
+        "traces": traces, "spans": spans, "logs": logs, "rca_reports": rca_reports
+    })
+
+
+async def read_stats(db: AsyncSession, now: datetime.datetime = None) -> Dict:
+    """The /api/stats payload from the last STATS_HOURS error buckets and all volume buckets"""
+    now = now or datetime.datetime.now()
+    since = hour_bucket(now) - datetime.timedelta(hours=STATS_HOURS - 1)
+    in_window = ErrorRollup.bucket >= since
+    errors = func.sum(ErrorRollup.error_count).label('count')
+
+    total_errors = await db.scalar(select(func.coalesce(func.sum(ErrorRollup.error_count), 0)).where(in_window))
+    env_stats = (await db.execute(
+        select(ErrorRollup.env, errors).where(in_window).group_by(ErrorRollup.env)
+    )).all()
+    service_stats = (await db.execute(
+        select(ErrorRollup.service, errors).where(in_window)
+        .group_by(ErrorRollup.service).order_by(desc('count')).limit(10)
+    )).all()
+    totals = (await db.execute(select(
+        func.coalesce(func.sum(VolumeRollup.traces), 0),
+        func.coalesce(func.sum(VolumeRollup.logs), 0),
+        func.coalesce(func.sum(VolumeRollup.rca_reports), 0)
+    ))).one()
+
+    return {
+        "last_24_hours": {
+            "total_errors": int(total_errors),
+            "environments": [{"env": env, "count": int(count)} for env, count in env_stats],
+            "top_services": [{"service": service, "count": int(count)} for service, count in service_stats]
+        },
+        "total_data": {
+            "traces": int(totals[0]),
+            "logs": int(totals[1]),
+            "rca_reports": int(totals[2])
+        }
+    }
+
+
+def _hour_expr(db, column):
+    if db.get_bind().dialect.name == "sqlite":
+        # Same text layout SQLAlchemy stores DateTime values in, so buckets compare and collide correctly
+        return func.strftime('%Y-%m-%d %H:00:00.000000', column)
+    return func.date_trunc('hour', column)
+
+
+def backfill_rollups(db):
+    """Rebuild every rollup bucket from the raw tables (run once after upgrading)"""
+    db.execute(delete(ErrorRollup))
+    db.execute(delete(VolumeRollup))
+
+    bucket = _hour_expr(db, ErrorMetric.window_start)
+    db.execute(ErrorRollup.__table__.insert().from_select(
+        ["bucket", "env", "service", "http_code", "error_count"],
+        select(
+            bucket,
+            func.coalesce(ErrorMetric.env, ''),
+            func.coalesce(ErrorMetric.service, ''),
+            func.coalesce(ErrorMetric.http_code, ''),
+            func.count()
+        ).group_by(
+            bucket,
+            func.coalesce(ErrorMetric.env, ''),
+            func.coalesce(ErrorMetric.service, ''),
+            func.coalesce(ErrorMetric.http_code, '')
+        )
+    ))
+
+    volumes = {}
+    for name, model in (("traces", Trace), ("spans", Span), ("logs", Log), ("rca_reports", RCAReport)):
+        bucket = _hour_expr(db, model.created_at)
+        for hour, count in db.execute(select(bucket, func.count()).group_by(bucket)):
+            if hour is None:
+                continue
+            if isinstance(hour, str):
+                hour = datetime.datetime.fromisoformat(hour)
+            volumes.setdefault(hour, {"traces": 0, "spans": 0, "logs": 0, "rca_reports": 0})[name] = count
+    # Rows already moved to the cold archive, counted in the hour their card was ingested
+    bucket = _hour_expr(db, ErrorMetric.created_at)
+    archived = select(
+        bucket,
+        func.sum(ArchivedBundle.trace_count), func.sum(ArchivedBundle.span_count), func.sum(ArchivedBundle.log_count)
+    ).join(ErrorMetric, ErrorMetric.id == ArchivedBundle.error_metric_id).group_by(bucket)
+    for hour, traces, spans, logs in db.execute(archived):
+        if hour is None:
+            continue
+        if isinstance(hour, str):
+            hour = datetime.datetime.fromisoformat(hour)
+        counts = volumes.setdefault(hour, {"traces": 0, "spans": 0, "logs": 0, "rca_reports": 0})
+        counts["traces"] += traces or 0
+        counts["spans"] += spans or 0
+        counts["logs"] += logs or 0
+    if volumes:
+        db.execute(VolumeRollup.__table__.insert(), [{"bucket": hour, **counts} for hour, counts in volumes.items()])
+    bump_versions(db, STATS_VERSION)
+    db.commit()
+    return len(volumes)
+
+
+def rollups_missing(db) -> bool:
+    """True when cards exist but the rollups were never built (e.g. right after upgrading)"""
+    has_rollups = db.scalar(select(literal(1)).select_from(ErrorRollup).limit(1))
+    has_errors = db.scalar(select(literal(1)).select_from(ErrorMetric).limit(1))
+    return bool(has_errors and not has_rollups)
@@ -0,0 +1,24 @@
+"""
+Versioned schema migrations (Alembic, see migrations/)
+
+Importing the API no longer touches the database. The schema is brought up
+to date as a separate step: run_backend.py, run_worker.py and the maintenance
+scripts call upgrade_database() before they start (a single version lookup
+when nothing is pending), or a deploy runs `python run_migrations.py`.
+Databases created before migrations existed are adopted by the baseline
+revision, which adds the columns and indexes they lack.
+"""
+import os
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def alembic_config() -> Config:
+    return Config(ALEMBIC_INI)
+
+
+def upgrade_database(revision: str = "head"):
+    """Apply pending migrations up to `revision`"""
+    command.upgrade(alembic_config(), revision)
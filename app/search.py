@@ -0,0 +1,211 @@
+"""
+Full-text search over log messages and RCA summaries
+
+PostgreSQL: `logs` and `rca_reports` carry a generated `search_vector`
+tsvector column with a GIN index, so the database keeps it up to date on
+every insert. When the pg_trgm extension is available, trigram GIN indexes
+on the raw text also serve substring matches (`ILIKE '%...%'`).
+
+SQLite: contentless FTS5 tables (`logs_fts`, `rca_reports_fts`) using the
+trigram tokenizer, keyed by the source row's rowid and kept in sync by
+insert/delete triggers. Queries are matched as a quoted phrase, which the
+trigram tokenizer treats as a substring match.
+
+The indexes are created (and existing rows indexed) by create_search_indexes(),
+which the 0002 schema migration runs. The log message is the `message` field
+of log_data, falling back to VictoriaLogs' `_msg`.
+"""
+from typing import Dict, List, Optional
+from sqlalchemy import select, func, or_, text, literal_column, table, column
+
+from app.models import ErrorMetric, Log, RCAReport
+from app.pagination import fetch_page
+
+SEARCH_KINDS = ("logs", "rca")
+# Databases with search indexes (see create_search_indexes)
+SEARCH_DIALECTS = ("postgresql", "sqlite")
+# Trigram matching needs at least three characters
+SEARCH_MIN_LENGTH = 3
+
+PG_LOG_MESSAGE = "coalesce(logs.log_data->>'message', logs.log_data->>'_msg', '')"
+SQLITE_LOG_MESSAGE = "coalesce(json_extract({row}.log_data, '$.message'), json_extract({row}.log_data, '$._msg'), '')"
+
+# kind -> (source table, text expression, text search configuration)
+PG_SOURCES = {
+    "logs": ("logs", PG_LOG_MESSAGE, "simple"),
+    "rca": ("rca_reports", "coalesce(rca_reports.analysis_summary, '')", "english"),
+}
+
+PG_DDL = [
+    f"""ALTER TABLE logs ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, {PG_LOG_MESSAGE})) STORED""",
+    "CREATE INDEX IF NOT EXISTS idx_logs_search_vector ON logs USING gin (search_vector)",
+    """ALTER TABLE rca_reports ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('english'::regconfig, coalesce(rca_reports.analysis_summary, ''))) STORED""",
+    "CREATE INDEX IF NOT EXISTS idx_rca_reports_search_vector ON rca_reports USING gin (search_vector)",
+]
+PG_TRIGRAM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS idx_logs_message_trgm ON logs USING gin (({PG_LOG_MESSAGE}) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_rca_reports_summary_trgm ON rca_reports "
+    "USING gin ((coalesce(rca_reports.analysis_summary, '')) gin_trgm_ops)",
+]
+
+# kind -> (FTS table, source table, text expression over {row})
+SQLITE_SOURCES = {
+    "logs": ("logs_fts", "logs", SQLITE_LOG_MESSAGE),
+    "rca": ("rca_reports_fts", "rca_reports", "coalesce({row}.analysis_summary, '')"),
+}
+
+
+def _sqlite_ddl(fts: str, source: str, expression: str) -> List[str]:
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(body, content='', tokenize='trigram')",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {source} BEGIN
+            INSERT INTO {fts}(rowid, body) VALUES (new.rowid, {expression.format(row='new')});
+        END""",
+        # Contentless tables are told exactly what was indexed so it can be removed
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {source} BEGIN
+            INSERT INTO {fts}({fts}, rowid, body) VALUES ('delete', old.rowid, {expression.format(row='old')});
+        END""",
+    ]
+
+
+def _index_sqlite_rows(conn, fts: str, source: str, expression: str):
+    conn.execute(text(
+        f"INSERT INTO {fts}(rowid, body) SELECT rowid, {expression.format(row=source)} FROM {source}"
+    ))
+
+
+def is_search_object(type_: str, name: str) -> bool:
+    """Whether a reflected table, column or index is one create_search_indexes() made"""
+    if type_ == "table":
+        # FTS5 also creates shadow tables such as logs_fts_data
+        return any(name == fts or name.startswith(f"{fts}_") for fts, _, _ in SQLITE_SOURCES.values())
+    if type_ == "column":
+        return name == "search_vector"
+    if type_ == "index":
+        return name.endswith(("_search_vector", "_trgm"))
+    return False
+
+
+def create_search_indexes(conn):
+    """Create the search columns, tables, triggers and indexes that are missing"""
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        for statement in PG_DDL:
+            conn.execute(text(statement))
+        try:
+            # In a savepoint, so a missing extension does not abort the surrounding migration
+            with conn.begin_nested():
+                for statement in PG_TRIGRAM_DDL:
+                    conn.execute(text(statement))
+        except Exception as e:
+            print(f"⚠ pg_trgm unavailable, /api/search matches whole words only: {str(e).splitlines()[0]}")
+    elif dialect == "sqlite":
+        for fts, source, expression in SQLITE_SOURCES.values():
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}
+            ).first()
+            for statement in _sqlite_ddl(fts, source, expression):
+                conn.execute(text(statement))
+            if not exists:
+                print(f"🔎 Indexing existing {source} rows for search...")
+                _index_sqlite_rows(conn, fts, source, expression)
+
+
+def drop_search_indexes(conn):
+    """Remove everything create_search_indexes() adds"""
+    if conn.dialect.name == "postgresql":
+        for index in ("idx_logs_message_trgm", "idx_rca_reports_summary_trgm"):
+            conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+        for source in ("logs", "rca_reports"):
+            conn.execute(text(f"ALTER TABLE {source} DROP COLUMN IF EXISTS search_vector"))
+    elif conn.dialect.name == "sqlite":
+        for fts, source, _ in SQLITE_SOURCES.values():
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {fts}_insert"))
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {fts}_delete"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {fts}"))
+
+
+def rebuild_search_indexes(engine):
+    """Re-index every row on SQLite (needed after VACUUM, which may renumber rowids; see run_search_reindex.py)"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        for fts, source, expression in SQLITE_SOURCES.values():
+            conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('delete-all')"))
+            _index_sqlite_rows(conn, fts, source, expression)
+
+
+# Whether pg_trgm is installed, per database URL
+_trigram_available: Dict[str, bool] = {}
+
+
+async def _has_trigram(db) -> bool:
+    url = str(db.get_bind().url)
+    if url not in _trigram_available:
+        _trigram_available[url] = bool(await db.scalar(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ))
+    return _trigram_available[url]
+
+
+def search_supported(db) -> bool:
+    return db.get_bind().dialect.name in SEARCH_DIALECTS
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _result_columns(kind: str):
+    if kind == "logs":
+        return (Log.id, Log.error_metric_id, Log.trace_id_hex, Log.log_data, Log.created_at)
+    return (RCAReport.id, RCAReport.error_metric_id, RCAReport.analysis_summary, RCAReport.created_at)
+
+
+async def search(db, query: str, kind: str, start_time, end_time, env: Optional[str] = None,
+                 service: Optional[str] = None, limit: int = 50, cursor=None):
+    """
+    Rows of `kind` whose text matches `query`, for error cards whose window starts
+    in [start_time, end_time], best match first. Returns (rows, next_cursor).
+    Only for the SEARCH_DIALECTS; callers check search_supported() first.
+    """
+    model = Log if kind == "logs" else RCAReport
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        source, expression, config = PG_SOURCES[kind]
+        vector = literal_column(f"{source}.search_vector")
+        tsquery = func.websearch_to_tsquery(literal_column(f"'{config}'::regconfig"), query)
+        matches = vector.op("@@")(tsquery)
+        if await _has_trigram(db):
+            matches = or_(matches, literal_column(expression).ilike(_like_pattern(query), escape="\\"))
+        rank = func.ts_rank_cd(vector, tsquery)
+        # A cached generic plan cannot see how selective the time window and the query are
+        # and falls back to ranking every match; plan each search for its own parameters
+        await db.execute(text("SET LOCAL plan_cache_mode = force_custom_plan"))
+        inner = select(*_result_columns(kind), ErrorMetric.env, ErrorMetric.service, rank.label("rank")).where(matches)
+    else:
+        fts, source, _ = SQLITE_SOURCES[kind]
+        fts_table = table(fts, column("rowid"))
+        phrase = '"' + query.replace('"', '""') + '"'
+        # bm25() is lower for better matches; negate it so both backends rank descending
+        rank = -func.bm25(literal_column(fts))
+        inner = select(*_result_columns(kind), ErrorMetric.env, ErrorMetric.service, rank.label("rank")).select_from(
+            fts_table.join(model, literal_column(f"{source}.rowid") == fts_table.c.rowid)
+        ).where(literal_column(fts).op("MATCH")(phrase))
+
+    inner = inner.join(ErrorMetric, ErrorMetric.id == model.error_metric_id).where(
+        ErrorMetric.window_start >= start_time,
+        ErrorMetric.window_start <= end_time
+    )
+    if env:
+        inner = inner.where(ErrorMetric.env == env)
+    if service:
+        inner = inner.where(ErrorMetric.service == service)
+
+    ranked = inner.subquery()
+    return await fetch_page(db, select(ranked), ranked.c.rank, ranked.c.id, limit, cursor)
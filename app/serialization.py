@@ -0,0 +1,35 @@
+"""
+JSON responses rendered with orjson
+
+orjson encodes datetimes (as ISO 8601, like `.isoformat()`), UUIDs and nested
+JSON columns natively and several times faster than json.dumps. List
+endpoints select plain column tuples and return an ORJSONResponse directly,
+which also skips FastAPI's jsonable_encoder pass over every value. Without
+the `orjson` package responses fall back to the standard library encoder.
+"""
+import json
+import datetime
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
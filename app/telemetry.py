@@ -0,0 +1,190 @@
+"""
+Per-route request telemetry and the slow-query log
+
+RequestMetricsMiddleware resolves each request to its route template (e.g.
+/api/errors/{error_id}) before the handler runs and records latency, response
+size and in-flight requests under that label, along with the time the
+request spent in the database and how many statements it ran. Every engine is
+hooked on before/after_cursor_execute: statements slower than SLOW_QUERY_MS are
+printed with the route that issued them, counted, and kept in a short ring
+buffer served at /metrics/slow-queries. Outside a request (the worker,
+scripts) the route label is "-".
+"""
+import os
+import re
+import time
+import datetime
+import contextvars
+from collections import deque
+from typing import Optional
+from sqlalchemy import event
+from starlette.routing import Match
+from dotenv import load_dotenv
+
+from app.metrics import REGISTRY
+
+load_dotenv()
+
+# Statements at least this slow are logged (0 logs every statement)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+# Slow statements kept for /metrics/slow-queries
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+# Longer statements are cut in the log
+SLOW_QUERY_MAX_CHARS = 500
+
+NO_ROUTE = "-"
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    "rca_http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    labels=("method", "route", "status"),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+RESPONSE_SIZE = REGISTRY.histogram(
+    "rca_http_response_size_bytes",
+    "Response body bytes sent (after compression)",
+    labels=("method", "route"),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "rca_http_requests_in_flight",
+    "Requests currently being handled",
+    labels=("method", "route")
+)
+REQUEST_DB_TIME = REGISTRY.histogram(
+    "rca_http_request_db_seconds",
+    "Time a request spent executing database statements",
+    labels=("method", "route"),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+REQUEST_QUERIES = REGISTRY.histogram(
+    "rca_http_request_queries",
+    "Database statements executed per request",
+    labels=("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+)
+QUERY_LATENCY = REGISTRY.histogram(
+    "rca_db_query_duration_seconds",
+    "Database statement execution time",
+    labels=("route",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+)
+SLOW_QUERIES = REGISTRY.counter(
+    "rca_db_slow_queries_total",
+    "Statements that took at least SLOW_QUERY_MS",
+    labels=("route",)
+)
+
+
+class _RequestStats:
+    """Database time and statement count of the request being handled"""
+    __slots__ = ("route", "db_seconds", "queries")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.db_seconds = 0.0
+        self.queries = 0
+
+
+# Set by the middleware; copied into the tasks and threads the handler starts
+_current_request: contextvars.ContextVar[Optional[_RequestStats]] = contextvars.ContextVar(
+    "rca_current_request", default=None
+)
+_slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+
+def current_route() -> str:
+    stats = _current_request.get()
+    return stats.route if stats is not None else NO_ROUTE
+
+
+def recent_slow_queries():
+    """The latest slow statements, newest first"""
+    return list(reversed(_slow_queries))
+
+
+def _record_query(statement: str, elapsed: float):
+    stats = _current_request.get()
+    route = stats.route if stats is not None else NO_ROUTE
+    if stats is not None:
+        stats.db_seconds += elapsed
+        stats.queries += 1
+    QUERY_LATENCY.observe(elapsed, route=route)
+    if elapsed * 1000 < SLOW_QUERY_MS:
+        return
+    SLOW_QUERIES.inc(route=route)
+    statement = re.sub(r"\s+", " ", statement).strip()[:SLOW_QUERY_MAX_CHARS]
+    _slow_queries.append({
+        "at": datetime.datetime.utcnow().isoformat() + "Z",
+        "route": route,
+        "duration_ms": round(elapsed * 1000, 1),
+        "statement": statement,
+    })
+    print(f"🐢 Slow query ({elapsed * 1000:.0f} ms) on {route}: {statement}")
+
+
+def instrument_queries(engine):
+    """Time every statement `engine` executes (pass the sync_engine of an async engine)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("query_started", None)
+        if started is not None:
+            _record_query(statement, time.perf_counter() - started)
+
+    return engine
+
+
+def resolve_route(scope) -> str:
+    """Route template the router will dispatch `scope` to"""
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+        if match == Match.PARTIAL and partial is None:
+            partial = getattr(route, "path", None)
+    # Unknown paths share one label so scanners cannot blow up the series count
+    return partial or UNMATCHED_ROUTE
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = resolve_route(scope)
+        stats = _RequestStats(route)
+        token = _current_request.set(stats)
+        status = 500
+        size = 0
+
+        async def send_measured(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(method=method, route=route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_measured)
+        finally:
+            REQUEST_LATENCY.observe(time.perf_counter() - started, method=method, route=route, status=str(status))
+            RESPONSE_SIZE.observe(size, method=method, route=route)
+            REQUEST_DB_TIME.observe(stats.db_seconds, method=method, route=route)
+            REQUEST_QUERIES.observe(stats.queries, method=method, route=route)
+            REQUESTS_IN_FLIGHT.dec(method=method, route=route)
+            _current_request.reset(token)
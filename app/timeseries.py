@@ -0,0 +1,128 @@
+"""
+Error counts per time bucket behind /api/timeseries
+
+Intervals that are whole hours are summed from the hourly rollups the worker
+maintains; shorter ones (multiples of the 5-minute card window) are counted
+from error_metrics. Either way the bucketing happens in SQL: each row's
+window_start is turned into a bucket number relative to the first bucket, so
+the query returns one row per non-empty (bucket, group) and the payload is
+built as one array of counts per series rather than one object per row.
+"""
+import os
+import re
+import calendar
+import datetime
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import select, func, cast, BigInteger
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+
+from app.models import ErrorMetric, ErrorRollup
+
+load_dotenv()
+
+TIMESERIES_GROUPS = ("env", "service", "http_code")
+# Cards cover 5-minute windows, so finer buckets would only add empty ones
+TIMESERIES_MIN_SECONDS = 300
+TIMESERIES_MAX_BUCKETS = int(os.getenv("TIMESERIES_MAX_BUCKETS", "2000"))
+
+INTERVAL_PATTERN = re.compile(r"^([1-9][0-9]*)([mhd])$")
+UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400}
+
+
+def parse_interval(interval: str) -> int:
+    """Seconds in an interval such as `5m`, `1h` or `1d`; ValueError if it is not usable"""
+    match = INTERVAL_PATTERN.match(interval)
+    if not match:
+        raise ValueError(f"Invalid interval {interval!r}, expected e.g. 5m, 1h or 1d")
+    seconds = int(match.group(1)) * UNIT_SECONDS[match.group(2)]
+    if seconds % TIMESERIES_MIN_SECONDS:
+        raise ValueError(f"Interval must be a multiple of {TIMESERIES_MIN_SECONDS // 60} minutes")
+    return seconds
+
+
+def parse_group_by(group_by: Optional[str]) -> List[str]:
+    """Validated, de-duplicated list of grouping columns from `env,service`"""
+    groups = []
+    for name in (group_by or "").split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in TIMESERIES_GROUPS:
+            raise ValueError(f"Cannot group by {name!r}, expected any of {', '.join(TIMESERIES_GROUPS)}")
+        if name not in groups:
+            groups.append(name)
+    return groups
+
+
+def bucket_origin(start: datetime.datetime, seconds: int) -> datetime.datetime:
+    """Start of the bucket containing `start`, with buckets aligned to midnight"""
+    midnight = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    offset = int((start - midnight).total_seconds()) // seconds * seconds
+    return midnight + datetime.timedelta(seconds=offset)
+
+
+def _epoch(db, column):
+    # Whole seconds since 1970 of a naive timestamp, read as UTC on both backends
+    if db.get_bind().dialect.name == "sqlite":
+        return cast(func.strftime('%s', column), BigInteger)
+    return cast(func.floor(func.extract('epoch', column)), BigInteger)
+
+
+def _bucket_number(db, column, origin: datetime.datetime, seconds: int):
+    # Rows are never before the origin, so integer division floors
+    return (_epoch(db, column) - calendar.timegm(origin.timetuple())) // seconds
+
+
+async def read_timeseries(db: AsyncSession, start: datetime.datetime, end: datetime.datetime, seconds: int,
+                          group_by: Sequence[str] = (), env: Optional[str] = None,
+                          service: Optional[str] = None, top: int = 10) -> Dict:
+    """
+    Error cards per `seconds` bucket between `start` and `end`, split by `group_by`.
+    Only the `top` series with the most errors are returned; `totals` counts all of them.
+    """
+    origin = bucket_origin(start, seconds)
+    bucket_count = int((end - origin).total_seconds()) // seconds + 1
+
+    if seconds % 3600 == 0:
+        source = "rollups"
+        model, timestamp, errors = ErrorRollup, ErrorRollup.bucket, func.sum(ErrorRollup.error_count)
+        columns = [getattr(ErrorRollup, name).label(name) for name in group_by]
+        env_column, service_column = ErrorRollup.env, ErrorRollup.service
+    else:
+        source = "error_metrics"
+        model, timestamp, errors = ErrorMetric, ErrorMetric.window_start, func.count()
+        columns = [func.coalesce(getattr(ErrorMetric, name), '').label(name) for name in group_by]
+        env_column, service_column = ErrorMetric.env, ErrorMetric.service
+
+    bucket = _bucket_number(db, timestamp, origin, seconds).label("bucket")
+    query = select(bucket, *columns, errors).select_from(model).where(
+        timestamp >= origin,
+        timestamp <= end
+    ).group_by(bucket, *columns)
+    if env:
+        query = query.where(env_column == env)
+    if service:
+        query = query.where(service_column == service)
+
+    totals = [0] * bucket_count
+    series: Dict[tuple, List[int]] = {}
+    for row in (await db.execute(query)).all():
+        index, key, count = row[0], tuple(row[1:-1]), int(row[-1])
+        if not 0 <= index < bucket_count:
+            continue
+        totals[index] += count
+        series.setdefault(key, [0] * bucket_count)[index] += count
+
+    ranked = sorted(series.items(), key=lambda item: (-sum(item[1]), item[0]))[:top] if group_by else []
+    return {
+        "source": source,
+        "interval_seconds": seconds,
+        "start": origin,
+        "end": end,
+        "buckets": [origin + datetime.timedelta(seconds=seconds * i) for i in range(bucket_count)],
+        "group_by": list(group_by),
+        "series": [{**dict(zip(group_by, key)), "counts": counts} for key, counts in ranked],
+        "series_total": len(series) if group_by else 0,
+        "totals": totals
+    }
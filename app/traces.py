@@ -0,0 +1,196 @@
+"""
+Everything stored for one trace, across the error cards that captured it
+
+The same trace is often saved under several error cards (one per window or
+error group it touched), so its spans and logs are read by trace id through
+idx_spans_trace_id / idx_logs_trace_id, deduplicated and merged into a single
+timeline. Spans are deduplicated by span id. Logs are deduplicated by content
+and position, so a line repeated within one card is kept as often as it
+occurs. Cards moved to the cold archive are found through archived_traces and
+read back from their bundles. Timelines are cached per trace and set of cards
+with their span and log counts, which change only when the worker saves more
+of the trace.
+"""
+import os
+import asyncio
+import bisect
+import hashlib
+import datetime
+import json
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import LRUCache
+from app.serialization import dumps
+from app.archive import iter_bundle_rows
+from app.models import ErrorMetric, Trace, Span, Log, ArchivedBundle, ArchivedTrace
+
+# Timelines kept in memory (each holds every span and log of its trace)
+TRACE_CACHE_ENTRIES = int(os.getenv("TRACE_CACHE_ENTRIES", "256"))
+# ...and the memory they may use, measured as their serialised size
+TRACE_CACHE_BYTES = int(os.getenv("TRACE_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# Sorts after any ISO timestamp, so rows without a time come last
+_NO_TIME = "~"
+
+_timelines = LRUCache("traces", max_entries=TRACE_CACHE_ENTRIES, max_bytes=TRACE_CACHE_BYTES,
+                      size_of=lambda timeline: timeline.size)
+
+
+class TraceTimeline:
+    """Deduplicated spans and logs of a trace in time order, with their page keys"""
+    __slots__ = ("error_metric_ids", "items", "keys", "counts", "size")
+
+    def __init__(self, error_metric_ids: List[str], items: List[Dict[str, Any]], keys: List[Tuple[str, str]]):
+        self.error_metric_ids = error_metric_ids
+        self.items = items
+        self.keys = keys
+        self.counts = {
+            "spans": sum(1 for item in items if item["type"] == "span"),
+            "logs": sum(1 for item in items if item["type"] == "log"),
+        }
+        self.size = len(dumps(items))
+
+    def page(self, limit: int, after: Optional[Tuple[str, str]] = None):
+        """Up to `limit` items after the page key `after`, and the key to continue from"""
+        start = bisect.bisect_right(self.keys, after) if after is not None else 0
+        end = start + limit
+        next_key = self.keys[end - 1] if end < len(self.items) else None
+        return self.items[start:end], next_key
+
+
+def _sort_time(value) -> str:
+    """Naive UTC ISO timestamp for ordering spans and logs together"""
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return _NO_TIME
+    if not isinstance(value, datetime.datetime):
+        return _NO_TIME
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+
+def _log_content(log_data) -> str:
+    # The same log line stored under two cards is identical, field for field
+    content = json.dumps(log_data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(content.encode(), digest_size=12).hexdigest()
+
+
+def _log_keys(logs) -> List[str]:
+    """Content hash plus occurrence number within the log's card, for logs in id order"""
+    seen = Counter()
+    keys = []
+    for log in logs:
+        content = _log_content(log["log_data"])
+        seen[(log["error_metric_id"], content)] += 1
+        keys.append(f"{content}:{seen[(log['error_metric_id'], content)]}")
+    return keys
+
+
+def _merge(rows, keys, item_of, kind: str, merged: Dict[Tuple[str, str], Dict[str, Any]]):
+    for row, row_key in zip(rows, keys):
+        key = (kind, row_key)
+        item = merged.get(key)
+        if item is None:
+            merged[key] = item_of(row)
+            merged[key]["error_metric_ids"] = [row["error_metric_id"]]
+        elif row["error_metric_id"] not in item["error_metric_ids"]:
+            item["error_metric_ids"].append(row["error_metric_id"])
+
+
+def _archived_rows(entries: List[ArchivedBundle], trace_id: str):
+    """The trace's spans and logs inside archived bundles"""
+    spans, logs = [], []
+    for entry in entries:
+        for kind, row in iter_bundle_rows(entry):
+            if row.get("trace_id_hex") != trace_id:
+                continue
+            if kind == "span":
+                spans.append(row)
+            elif kind == "log":
+                logs.append(row)
+    return spans, logs
+
+
+async def _trace_cards(db: AsyncSession, trace_id: str) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """(error_metric_id, span_count, log_count) of every card holding the trace"""
+    error_ids = (await db.execute(union(
+        select(Trace.error_metric_id).where(Trace.trace_id_hex == trace_id),
+        select(Span.error_metric_id).where(Span.trace_id_hex == trace_id),
+        select(Log.error_metric_id).where(Log.trace_id_hex == trace_id),
+        select(ArchivedTrace.error_metric_id).where(ArchivedTrace.trace_id_hex == trace_id),
+    ))).scalars().all()
+    if not error_ids:
+        return []
+    counts = {row.id: (row.span_count, row.log_count) for row in (await db.execute(
+        select(ErrorMetric.id, ErrorMetric.span_count, ErrorMetric.log_count).where(ErrorMetric.id.in_(error_ids))
+    ))}
+    return [(error_id, *counts.get(error_id, (None, None))) for error_id in sorted(error_ids)]
+
+
+async def _read_timeline(db: AsyncSession, trace_id: str, error_ids: List[str]) -> TraceTimeline:
+    spans = [row._asdict() for row in (await db.execute(
+        select(Span.id, Span.error_metric_id, Span.span_id, Span.operation_name, Span.start_time,
+               Span.duration, Span.tags)
+        .where(Span.trace_id_hex == trace_id).order_by(Span.id)
+    ))]
+    logs = [row._asdict() for row in (await db.execute(
+        select(Log.id, Log.error_metric_id, Log.log_data, Log.created_at)
+        .where(Log.trace_id_hex == trace_id).order_by(Log.id)
+    ))]
+    entries = (await db.execute(
+        select(ArchivedBundle).where(ArchivedBundle.error_metric_id.in_(error_ids))
+    )).scalars().all()
+    if entries:
+        # Decompression is CPU and page-fault bound, keep it off the event loop
+        archived_spans, archived_logs = await asyncio.to_thread(_archived_rows, entries, trace_id)
+        spans.extend(archived_spans)
+        logs.extend(archived_logs)
+
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    _merge(spans, [span["span_id"] or span["id"] for span in spans], lambda span: {
+        "type": "span",
+        "time": _sort_time(span["start_time"]),
+        "span_id": span["span_id"],
+        "operation_name": span["operation_name"],
+        "start_time": _iso(span["start_time"]),
+        "duration": span["duration"],
+        "tags": span["tags"],
+    }, "span", merged)
+    _merge(logs, _log_keys(logs), lambda log: {
+        "type": "log",
+        "time": _sort_time((log["log_data"].get("_time") if isinstance(log["log_data"], dict) else None)
+                           or log["created_at"]),
+        "log_data": log["log_data"],
+    }, "log", merged)
+
+    ordered = sorted(((item["time"], f"{kind}:{key}"), item) for (kind, key), item in merged.items())
+    keys = [key for key, _ in ordered]
+    items = [item for _, item in ordered]
+    for item in items:
+        if item["time"] == _NO_TIME:
+            item["time"] = None
+    return TraceTimeline(error_ids, items, keys)
+
+
+async def trace_timeline(db: AsyncSession, trace_id: str) -> Optional[TraceTimeline]:
+    """The trace's timeline, from the cache unless its cards gained spans or logs since"""
+    cards = await _trace_cards(db, trace_id)
+    if not cards:
+        return None
+    cache_key = (trace_id, tuple(cards))
+    timeline = _timelines.get(cache_key)
+    if timeline is None:
+        timeline = await _read_timeline(db, trace_id, [error_id for error_id, _, _ in cards])
+        _timelines.set(cache_key, timeline)
+    return timeline
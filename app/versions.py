@@ -0,0 +1,70 @@
+"""
+Data version counters and HTTP cache validators for the dashboard's polled endpoints
+
+The worker bumps a named counter in the same transaction as every write that
+changes what an endpoint returns. The API turns the counter (plus the query
+parameters and time window) into an ETag, so a matching If-None-Match is
+answered with 304 after one primary-key lookup, before any query or
+serialisation runs.
+"""
+import hashlib
+import datetime
+from email.utils import format_datetime
+from typing import Iterable, Optional
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import upsert_increment
+from app.models import DataVersion
+
+# /api/errors: the error card list; /api/stats: rollups and totals
+ERRORS_VERSION = "errors"
+STATS_VERSION = "stats"
+# Bumped when cards are deleted, so cached /api/errors/{id} responses are dropped
+DETAILS_VERSION = "details"
+
+# Browsers revalidate on every request and reuse their copy on 304
+CACHE_CONTROL = "no-cache"
+
+
+def bump_versions(db, *names: str):
+    """Mark `names` as changed; call before the write's transaction commits"""
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    for name in names:
+        upsert_increment(db, DataVersion, {"name": name}, {"version": 1}, assign={"updated_at": now})
+
+
+class Validators:
+    def __init__(self, etag: str, last_modified: Optional[datetime.datetime], version: int = 0):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.version = version
+
+    def headers(self):
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(
+                self.last_modified.replace(tzinfo=datetime.timezone.utc), usegmt=True
+            )
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags or self.etag[len("W/"):] in tags
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers())
+
+    def apply(self, response: Response):
+        response.headers.update(self.headers())
+
+
+async def validators_for(db: AsyncSession, name: str, parts: Iterable = ()) -> Validators:
+    """ETag/Last-Modified for data version `name` and the request-specific `parts`"""
+    row = await db.get(DataVersion, name)
+    version = row.version if row else 0
+    digest = hashlib.blake2b(repr(tuple(parts)).encode(), digest_size=8).hexdigest()
+    return Validators(f'W/"{name}-{version}-{digest}"', row.updated_at if row else None, version)
\ No newline at end of file
@@ -14,7 +14,13 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 load_dotenv()
 
 from app.ingestion import run_ingestion_cycle
-from app.database import get_db
+from app.database import session_scope
+from app.writer import write_queue
+from app.jobs import JobTracker, claim_next_job, JOB_POLL_INTERVAL
+from app.rollups import record_error, record_volume
+from app.counters import record_bundle_counts, record_rca
+from app.versions import bump_versions, ERRORS_VERSION, STATS_VERSION
+from app.notify import notify_change
 from app.models import ErrorMetric, Trace, Span, Log, RCAReport
 from app.google_chat import GoogleChatNotifier
 
@@ -27,6 +33,12 @@ except ImportError:
     RCAAgent = SimpleRCAAgent
     print("✓ Using simplified RCA agent for Railway")
 
+def parse_window_time(value):
+    """Error cards carry IST window bounds as 'YYYY-mm-dd HH:MM:SS' strings"""
+    if isinstance(value, str):
+        return datetime.datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    return value
+
 class RCAWorker:
     def __init__(self):
         self.ist = pytz.timezone('Asia/Kolkata')
@@ -36,7 +48,7 @@ class RCAWorker:
     def save_error_metric(self, error_card):
         """Save error metric to database"""
         try:
-            with get_db() as db:
+            with session_scope() as db:
                 error_metric = ErrorMetric(
                     env=error_card.get('env', ''),
                     service=error_card.get('service', ''),
@@ -45,10 +57,15 @@ class RCAWorker:
                     exception=error_card.get('exception', ''),
                     root_name=error_card.get('root_name', ''),
                     count=error_card.get('count', 0),
-                    window_start=error_card.get('window_start'),
-                    window_end=error_card.get('window_end')
+                    window_start=parse_window_time(error_card.get('window_start')),
+                    window_end=parse_window_time(error_card.get('window_end'))
                 )
                 db.add(error_metric)
+                record_error(db, error_metric)
+                bump_versions(db, ERRORS_VERSION, STATS_VERSION)
+                # Assigns the id the notification carries
+                db.flush()
+                notify_change(db, "error_card", error_metric.id)
                 db.commit()
                 db.refresh(error_metric)
                 print(f"✓ Saved error metric: {error_metric.id}")
@@ -60,7 +77,7 @@ class RCAWorker:
     def save_traces(self, error_metric_id, trace_ids_hex):
         """Save traces to database"""
         try:
-            with get_db() as db:
+            with session_scope() as db:
                 for trace_id_hex in trace_ids_hex:
                     trace = Trace(
                         error_metric_id=error_metric_id,
@@ -68,6 +85,10 @@ class RCAWorker:
                         trace_id_b64=trace_id_hex  # Simplified for Railway
                     )
                     db.add(trace)
+                record_volume(db, traces=len(trace_ids_hex))
+                record_bundle_counts(db, error_metric_id, traces=len(trace_ids_hex))
+                bump_versions(db, ERRORS_VERSION, STATS_VERSION)
+                notify_change(db, "traces", error_metric_id)
                 db.commit()
                 print(f"✓ Saved {len(trace_ids_hex)} traces")
         except Exception as e:
@@ -76,7 +97,7 @@ class RCAWorker:
     def save_spans(self, error_metric_id, span_metadata):
         """Save spans to database"""
         try:
-            with get_db() as db:
+            with session_scope() as db:
                 for span in span_metadata:
                     # Parse start_time correctly
                     start_time = None
@@ -98,6 +119,10 @@ class RCAWorker:
                         tags=span.get("tags", {})
                     )
                     db.add(span_record)
+                record_volume(db, spans=len(span_metadata))
+                record_bundle_counts(db, error_metric_id, spans=len(span_metadata))
+                bump_versions(db, ERRORS_VERSION, STATS_VERSION)
+                notify_change(db, "spans", error_metric_id)
                 db.commit()
                 print(f"✓ Saved {len(span_metadata)} spans")
         except Exception as e:
@@ -106,7 +131,7 @@ class RCAWorker:
     def save_logs(self, error_metric_id, logs_dict):
         """Save logs to database"""
         try:
-            with get_db() as db:
+            with session_scope() as db:
                 log_count = 0
                 for trace_id_hex, logs in logs_dict.items():
                     for log in logs:
@@ -117,6 +142,10 @@ class RCAWorker:
                         )
                         db.add(log_record)
                         log_count += 1
+                record_volume(db, logs=log_count)
+                record_bundle_counts(db, error_metric_id, logs=log_count)
+                bump_versions(db, ERRORS_VERSION, STATS_VERSION)
+                notify_change(db, "logs", error_metric_id)
                 db.commit()
                 print(f"✓ Saved {log_count} logs")
                 return log_count
@@ -127,13 +156,17 @@ class RCAWorker:
     def save_rca_report(self, error_metric_id, rca_summary):
         """Save RCA report to database"""
         try:
-            with get_db() as db:
+            with session_scope() as db:
                 rca_report = RCAReport(
                     error_metric_id=error_metric_id,
                     analysis_summary=rca_summary,
                     correlation_data={}  # Simplified for Railway
                 )
                 db.add(rca_report)
+                record_volume(db, rca_reports=1)
+                record_rca(db, error_metric_id, rca_summary)
+                bump_versions(db, ERRORS_VERSION, STATS_VERSION)
+                notify_change(db, "rca_report", error_metric_id)
                 db.commit()
                 db.refresh(rca_report)
                 print(f"✓ Saved RCA report: {rca_report.id}")
@@ -142,48 +175,53 @@ class RCAWorker:
             print(f"Error saving RCA report: {e}")
             return None
     
-    def run_cycle(self):
+    def run_cycle(self, window_end_dt=None, tracker=None):
         """Run one ingestion cycle"""
+        tracker = tracker or JobTracker()
         try:
             # Use current time as the END of the 5-minute window
-            window_end_dt = datetime.datetime.now(self.ist)
-            correlation_data_list = run_ingestion_cycle(window_end_dt)
+            window_end_dt = window_end_dt or datetime.datetime.now(self.ist)
+            with tracker.stage("ingestion"):
+                correlation_data_list = run_ingestion_cycle(window_end_dt)
             
             if not correlation_data_list:
                 print("No error cards found in this cycle")
+                tracker.finish()
                 return
             
             print(f"📊 Processing {len(correlation_data_list)} error cards...")
+            tracker.progress["cards_total"] = len(correlation_data_list)
+            tracker.save()
             
             for idx, correlation_data in enumerate(correlation_data_list, 1):
                 print(f"--- Processing Error Card {idx}/{len(correlation_data_list)} ---")
                 
-                # Save error metric
-                error_metric = self.save_error_metric(correlation_data['error_card'])
-                if not error_metric:
-                    continue
-                
-                # Save traces
-                trace_ids_hex = correlation_data.get('trace_ids_hex', [])
-                if trace_ids_hex:
-                    self.save_traces(error_metric.id, trace_ids_hex)
-                else:
-                    print("⚠ No traces found")
-                
-                # Save spans
-                span_metadata = correlation_data.get('span_metadata', [])
-                if span_metadata:
-                    self.save_spans(error_metric.id, span_metadata)
-                else:
-                    print("⚠ No spans found")
-                
-                # Save logs
-                logs_dict = correlation_data.get('logs', {})
-                log_count = 0
-                if logs_dict:
-                    log_count = self.save_logs(error_metric.id, logs_dict)
-                else:
-                    print("⚠ No logs found")
+                with tracker.stage("save"):
+                    # Save error metric (waits for the id the other rows reference)
+                    error_metric = write_queue.run(self.save_error_metric, correlation_data['error_card'])
+                    if not error_metric:
+                        tracker.card_done(None)
+                        continue
+                    
+                    # Traces, spans and logs are persisted by the writer while RCA runs
+                    trace_ids_hex = correlation_data.get('trace_ids_hex', [])
+                    if trace_ids_hex:
+                        write_queue.submit(self.save_traces, error_metric.id, trace_ids_hex)
+                    else:
+                        print("⚠ No traces found")
+                    
+                    span_metadata = correlation_data.get('span_metadata', [])
+                    if span_metadata:
+                        write_queue.submit(self.save_spans, error_metric.id, span_metadata)
+                    else:
+                        print("⚠ No spans found")
+                    
+                    logs_dict = correlation_data.get('logs', {})
+                    logs_saved = None
+                    if logs_dict:
+                        logs_saved = write_queue.submit(self.save_logs, error_metric.id, logs_dict)
+                    else:
+                        print("⚠ No logs found")
                 
                 # Generate RCA analysis
                 print("🤖 Generating RCA analysis...")
@@ -193,22 +231,24 @@ class RCAWorker:
                     'span_metadata': correlation_data.get('span_metadata', []),
                     'logs': correlation_data.get('logs', {})
                 }
-                rca_summary = self.rca_agent.analyze_error_card(correlation_data_for_rca)
-                
-                # Save RCA report
-                rca_report = self.save_rca_report(error_metric.id, rca_summary)
+                with tracker.stage("rca"):
+                    rca_summary = self.rca_agent.analyze_error_card(correlation_data_for_rca)
+                    
+                    # Save RCA report
+                    rca_report = write_queue.run(self.save_rca_report, error_metric.id, rca_summary)
                 
                 # Send Google Chat alert
                 print("📤 Sending Google Chat alert...")
-                try:
-                    self.chat_notifier.send_error_alert(
-                        correlation_data['error_card'],
-                        rca_summary,
-                        error_metric.id
-                    )
-                    print(f"✓ Google Chat alert sent successfully for error {error_metric.id}")
-                except Exception as e:
-                    print(f"Error sending Google Chat alert: {e}")
+                with tracker.stage("alert"):
+                    try:
+                        self.chat_notifier.send_error_alert(
+                            correlation_data['error_card'],
+                            rca_summary,
+                            error_metric.id
+                        )
+                        print(f"✓ Google Chat alert sent successfully for error {error_metric.id}")
+                    except Exception as e:
+                        print(f"Error sending Google Chat alert: {e}")
                 
                 # Log completion
                 completion_data = {
@@ -216,15 +256,37 @@ class RCAWorker:
                     'rca_id': rca_report.id if rca_report else None,
                     'trace_count': len(trace_ids_hex),
                     'span_count': len(span_metadata),
-                    'log_count': log_count,
+                    'log_count': logs_saved.result() if logs_saved else 0,
                     'rca_summary': rca_summary
                 }
                 print(f"✓ Completed processing: {completion_data}")
+                tracker.card_done(error_metric.id)
             
+            with tracker.stage("flush"):
+                write_queue.join()
+            tracker.finish()
             print("✅ RCA cycle completed successfully")
             
         except Exception as e:
             print(f"Error in RCA cycle: {e}")
+            tracker.finish(error=str(e))
+    
+    def run_job(self, job_id, window_end):
+        """Run a cycle queued through POST /api/trigger-cycle"""
+        print(f"🔄 Running queued cycle job {job_id} for window ending {window_end} IST")
+        self.run_cycle(self.ist.localize(window_end), JobTracker(job_id))
+    
+    def run_queued_jobs_until(self, deadline):
+        """Run queued jobs while waiting for the next scheduled cycle"""
+        while True:
+            claimed = write_queue.run(claim_next_job)
+            if claimed:
+                self.run_job(*claimed)
+                continue
+            remaining = (deadline - datetime.datetime.now(self.ist)).total_seconds()
+            if remaining <= 0:
+                return
+            time.sleep(min(JOB_POLL_INTERVAL, remaining))
     
     def run_continuous(self):
         """Run continuous ingestion cycles"""
@@ -242,7 +304,7 @@ class RCAWorker:
                 
                 wait_seconds = (next_boundary - now).total_seconds()
                 print(f"⏰ Waiting {int(wait_seconds)} seconds until next cycle...")
-                time.sleep(wait_seconds)
+                self.run_queued_jobs_until(next_boundary)
                 
                 print(f"🔄 Starting RCA cycle at {datetime.datetime.now(self.ist).strftime('%Y-%m-%d %H:%M:%S')} IST")
                 self.run_cycle()
@@ -0,0 +1,73 @@
+"""
+Single-writer queue for the worker's database writes
+
+SQLite allows one writer at a time, so in embedded mode every write the
+worker makes is funnelled through one background thread in submission
+order. Callers get a Future back and can keep correlating the next card
+(or running RCA) while earlier rows are persisted. On other backends the
+writes simply run inline.
+"""
+import queue
+import threading
+from concurrent.futures import Future
+
+from app.database import engine
+from app.metrics import REGISTRY
+
+WRITE_QUEUE_DEPTH = REGISTRY.gauge(
+    "rca_db_write_queue_depth",
+    "Writes waiting for the single SQLite writer thread"
+)
+
+
+class WriteQueue:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        WRITE_QUEUE_DEPTH.set_function(self._queue.qsize)
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            future, fn, args, kwargs = self._queue.get()
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except Exception as e:
+                        future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Queue a write; writes run one at a time in submission order"""
+        future = Future()
+        if not self.enabled:
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        self._ensure_thread()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def run(self, fn, *args, **kwargs):
+        """Queue a write and wait for its result"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def join(self):
+        """Block until every queued write has been applied"""
+        if self.enabled:
+            self._queue.join()
+
+
+write_queue = WriteQueue(enabled=engine.dialect.name == "sqlite")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent API latency: blocking sync Session handlers vs the AsyncSession path
+
+Seeds a throwaway SQLite database (or uses --database-url), then runs the same
+concurrent /api/errors/{id} load against a legacy copy of the handler that calls
+the synchronous Session from inside `async def`, and against app.main. A prober
+pings /api/health during the load to show how long the event loop is blocked.
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import datetime
+import tempfile
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def seed(errors, logs_per_error):
+    """Insert synthetic error cards with traces, spans and logs"""
+    from app.database import engine
+    from app.models import Base, ErrorMetric, Trace, Span, Log, RCAReport
+
+    Base.metadata.create_all(bind=engine)
+    now = datetime.datetime.now()
+    error_ids = []
+    with engine.begin() as conn:
+        for i in range(errors):
+            error_id = str(uuid.uuid4())
+            error_ids.append(error_id)
+            window_start = now - datetime.timedelta(minutes=5 * i)
+            conn.execute(ErrorMetric.__table__.insert(), [{
+                "id": error_id, "env": "bench", "service": f"service-{i % 10}", "span_kind": "server",
+                "http_code": "500", "exception": "BenchException", "root_name": "GET /bench", "count": 1.0,
+                "window_start": window_start, "window_end": window_start + datetime.timedelta(minutes=5),
+                "created_at": now
+            }])
+            trace_ids = [uuid.uuid4().hex for _ in range(5)]
+            conn.execute(Trace.__table__.insert(), [
+                {"id": str(uuid.uuid4()), "error_metric_id": error_id, "trace_id_hex": t, "trace_id_b64": t, "created_at": now}
+                for t in trace_ids
+            ])
+            conn.execute(Span.__table__.insert(), [
+                {"id": str(uuid.uuid4()), "error_metric_id": error_id, "trace_id_hex": random.choice(trace_ids),
+                 "span_id": uuid.uuid4().hex[:16], "operation_name": "bench-op", "start_time": window_start,
+                 "duration": random.random(), "tags": {"bench": True}, "created_at": now}
+                for _ in range(50)
+            ])
+            conn.execute(Log.__table__.insert(), [
+                {"id": str(uuid.uuid4()), "error_metric_id": error_id, "trace_id_hex": random.choice(trace_ids),
+                 "log_data": {"_msg": f"bench log line {n}", "level": "ERROR"}, "created_at": now}
+                for n in range(logs_per_error)
+            ])
+            conn.execute(RCAReport.__table__.insert(), [{
+                "id": str(uuid.uuid4()), "error_metric_id": error_id, "analysis_summary": "bench",
+                "correlation_data": {}, "created_at": now
+            }])
+    return error_ids
+
+
+def build_legacy_app():
+    """The pre-async handler shape: `async def` calling the blocking Session"""
+    from fastapi import FastAPI, Depends
+    from sqlalchemy.orm import Session
+    from app.database import get_db
+    from app.models import ErrorMetric, Trace, Span, Log, RCAReport
+    from app.archive import row_to_dict
+
+    legacy = FastAPI()
+
+    @legacy.get("/api/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    @legacy.get("/api/errors/{error_id}")
+    async def get_error_details(error_id: str, db: Session = Depends(get_db)):
+        error = db.query(ErrorMetric).filter(ErrorMetric.id == error_id).first()
+        return {
+            "error": row_to_dict(error),
+            "traces": [row_to_dict(t) for t in db.query(Trace).filter(Trace.error_metric_id == error_id).all()],
+            "spans": [row_to_dict(s) for s in db.query(Span).filter(Span.error_metric_id == error_id).all()],
+            "logs": [row_to_dict(l) for l in db.query(Log).filter(Log.error_metric_id == error_id).all()],
+            "rca_report": row_to_dict(db.query(RCAReport).filter(RCAReport.error_metric_id == error_id).first())
+        }
+
+    return legacy
+
+
+async def run_load(app, error_ids, concurrency, requests_per_worker):
+    import httpx
+
+    detail_latencies = []
+    health_latencies = []
+    done = asyncio.Event()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def worker():
+            for _ in range(requests_per_worker):
+                started = time.perf_counter()
+                response = await client.get(f"/api/errors/{random.choice(error_ids)}")
+                response.raise_for_status()
+                detail_latencies.append(time.perf_counter() - started)
+
+        async def prober():
+            # Measured from when the probe was due, so time the loop spent
+            # blocked before it could even send the request is included
+            due = time.perf_counter()
+            while not done.is_set():
+                await client.get("/api/health")
+                health_latencies.append(time.perf_counter() - due)
+                due = time.perf_counter() + 0.01
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(prober())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {
+        "elapsed": elapsed,
+        "rps": len(detail_latencies) / elapsed,
+        "detail_p50": percentile(detail_latencies, 50),
+        "detail_p95": percentile(detail_latencies, 95),
+        "health_p50": percentile(health_latencies, 50),
+        "health_p95": percentile(health_latencies, 95),
+        "health_max": max(health_latencies) if health_latencies else 0.0,
+    }
+
+
+def report(name, result):
+    print(f"\n📊 {name}")
+    print(f"   Throughput:      {result['rps']:.1f} req/s ({result['elapsed']:.2f}s total)")
+    print(f"   Detail latency:  p50 {result['detail_p50'] * 1000:.1f} ms | p95 {result['detail_p95'] * 1000:.1f} ms")
+    print(f"   Health latency:  p50 {result['health_p50'] * 1000:.1f} ms | p95 {result['health_p95'] * 1000:.1f} ms"
+          f" | max {result['health_max'] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Scratch database to seed and benchmark (default: temporary SQLite file)")
+    parser.add_argument("--errors", type=int, default=50, help="Error cards to seed")
+    parser.add_argument("--logs-per-error", type=int, default=2000, help="Logs to seed per error card")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=10, help="Requests per client")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    print(f"🌱 Seeding {args.errors} error cards x {args.logs_per_error} logs into {os.environ['DATABASE_URL']}")
+    error_ids = seed(args.errors, args.logs_per_error)
+
+    from app.main import app, close_database_pools
+
+    async def run_app_load():
+        try:
+            return await run_load(app, error_ids, args.concurrency, args.requests)
+        finally:
+            await close_database_pools()
+
+    before = asyncio.run(run_load(build_legacy_app(), error_ids, args.concurrency, args.requests))
+    after = asyncio.run(run_app_load())
+
+    report("Before: sync Session inside async handlers", before)
+    report("After: AsyncSession handlers", after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/search over a large log table
+
+Seeds a throwaway SQLite database (or uses --database-url) with error cards and
+synthetic log lines, a small share of which mention "connection pool exhausted",
+builds the search indexes with app.search.create_search_indexes, then times the
+first page of ranked results for a few queries scoped to the last 24 hours and
+to a single service.
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import datetime
+import tempfile
+import statistics
+
+WORDS = ("request", "handled", "user", "session", "cache", "miss", "upstream", "timeout", "retry",
+         "payment", "order", "created", "queue", "consumer", "lag", "latency", "slow", "query")
+QUERIES = ("connection pool exhausted", "pool exhausted", "timeout", "orde")
+
+
+def seed(errors, logs_per_error):
+    """Insert synthetic error cards and their logs in batches"""
+    from app.database import engine
+    from app.models import Base, ErrorMetric, Log
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    now = datetime.datetime.now()
+    with engine.begin() as conn:
+        for start in range(0, errors, 100):
+            cards, logs = [], []
+            for i in range(start, min(start + 100, errors)):
+                # Cards spread over the last 30 days
+                window_start = now - datetime.timedelta(seconds=(30 * 86400 // errors) * i)
+                error_id = str(uuid.uuid4())
+                cards.append({
+                    "id": error_id, "env": "bench", "service": f"service-{i % 10}", "span_kind": "server",
+                    "http_code": "500", "exception": "BenchException", "root_name": "GET /bench",
+                    "count": 1.0, "window_start": window_start,
+                    "window_end": window_start + datetime.timedelta(minutes=5), "created_at": now
+                })
+                for _ in range(logs_per_error):
+                    if rng.random() < 0.001:
+                        message = f"db connection pool exhausted after {rng.randint(1, 30)}s"
+                    else:
+                        message = " ".join(rng.choice(WORDS) for _ in range(8))
+                    logs.append({"id": str(uuid.uuid4()), "error_metric_id": error_id,
+                                 "trace_id_hex": uuid.uuid4().hex, "created_at": now,
+                                 "log_data": {"message": message, "level": "error"}})
+            conn.execute(ErrorMetric.__table__.insert(), cards)
+            conn.execute(Log.__table__.insert(), logs)
+
+
+async def measure(query, service, rounds):
+    from app.database import AsyncSessionLocal
+    from app.search import search
+
+    end_time = datetime.datetime.now()
+    start_time = end_time - datetime.timedelta(hours=24)
+    times = []
+    async with AsyncSessionLocal() as db:
+        rows, _ = await search(db, query, "logs", start_time, end_time, service=service)
+        for _ in range(rounds):
+            started = time.perf_counter()
+            rows, _ = await search(db, query, "logs", start_time, end_time, service=service)
+            times.append(time.perf_counter() - started)
+    return statistics.median(times), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Scratch database to seed and benchmark (default: temporary SQLite file)")
+    parser.add_argument("--errors", type=int, default=5000, help="Error cards to seed")
+    parser.add_argument("--logs-per-error", type=int, default=200, help="Log lines per error card")
+    parser.add_argument("--rounds", type=int, default=10, help="Timed repetitions (the median is reported)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    total = args.errors * args.logs_per_error
+    print(f"🌱 Seeding {args.errors} error cards and {total} logs into {os.environ['DATABASE_URL']}")
+    started = time.perf_counter()
+    seed(args.errors, args.logs_per_error)
+    print(f"   done in {time.perf_counter() - started:.0f}s")
+
+    from sqlalchemy import text
+    from app.database import engine
+    from app.search import create_search_indexes
+
+    print("🔎 Building search indexes")
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        create_search_indexes(conn)
+        # Statistics (as autovacuum would gather) let the planner start from the time window
+        conn.execute(text("ANALYZE"))
+    print(f"   done in {time.perf_counter() - started:.0f}s")
+
+    from app.main import close_database_pools
+
+    async def run():
+        try:
+            results = []
+            for query in QUERIES:
+                for service in (None, "service-3"):
+                    results.append((query, service, await measure(query, service, args.rounds)))
+            return results
+        finally:
+            await close_database_pools()
+
+    print(f"\n📊 First page of /api/search?kind=logs&hours=24 over {total} logs")
+    for query, service, (elapsed, found) in asyncio.run(run()):
+        scope = f"service={service}" if service else "all services"
+        print(f"   {query!r:30} {scope:20} {elapsed * 1000:8.1f} ms  ({found} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-row cost of building an /api/errors page: ORM entities vs column tuples
+
+Seeds a throwaway SQLite database (or uses --database-url) with error cards, then
+times the same page two ways. Before: hydrate ErrorMetric entities, build dicts with
+`.isoformat()` per datetime, run FastAPI's jsonable_encoder and json.dumps (what a
+plain dict return value went through). After: select only the listed columns as
+tuples and render them with app.serialization (orjson when installed).
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import datetime
+import tempfile
+import statistics
+
+
+def seed(errors):
+    """Insert synthetic error cards"""
+    from app.database import engine
+    from app.models import Base, ErrorMetric
+
+    Base.metadata.create_all(bind=engine)
+    now = datetime.datetime.now()
+    rows = []
+    for i in range(errors):
+        window_start = now - datetime.timedelta(seconds=30 * i)
+        rows.append({
+            "id": str(uuid.uuid4()), "env": "bench", "service": f"service-{i % 10}", "span_kind": "server",
+            "http_code": "500", "exception": "BenchException: something went wrong", "root_name": "GET /bench",
+            "count": float(i % 7 + 1), "window_start": window_start,
+            "window_end": window_start + datetime.timedelta(minutes=5), "created_at": now,
+            "trace_count": 5, "span_count": 50, "log_count": 200, "has_rca": True, "rca_severity": "HIGH"
+        })
+    with engine.begin() as conn:
+        conn.execute(ErrorMetric.__table__.insert(), rows)
+
+
+async def before(db, limit):
+    """Entity query, hand-built dicts, jsonable_encoder and json.dumps"""
+    from fastapi.encoders import jsonable_encoder
+    from sqlalchemy import select
+    from app.models import ErrorMetric
+
+    started = time.perf_counter()
+    errors = (await db.execute(
+        select(ErrorMetric).order_by(ErrorMetric.window_start.desc(), ErrorMetric.id.desc()).limit(limit)
+    )).scalars().all()
+    fetched = time.perf_counter()
+    payload = {"errors": [
+        {
+            "id": error.id,
+            "env": error.env,
+            "service": error.service,
+            "span_kind": error.span_kind,
+            "http_code": error.http_code,
+            "exception": error.exception,
+            "root_name": error.root_name,
+            "count": error.count,
+            "window_start": error.window_start.isoformat(),
+            "window_end": error.window_end.isoformat(),
+            "created_at": error.created_at.isoformat(),
+            "trace_count": error.trace_count,
+            "span_count": error.span_count,
+            "log_count": error.log_count,
+            "has_rca": error.has_rca,
+            "rca_severity": error.rca_severity
+        }
+        for error in errors
+    ]}
+    body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+    db.expunge_all()
+    return fetched - started, time.perf_counter() - fetched, body
+
+
+async def after(db, limit):
+    """Column tuples rendered by app.serialization"""
+    from sqlalchemy import select
+    from app.main import ERROR_LIST_COLUMNS
+    from app.models import ErrorMetric
+    from app.serialization import dumps
+
+    started = time.perf_counter()
+    errors = (await db.execute(
+        select(*ERROR_LIST_COLUMNS).order_by(ErrorMetric.window_start.desc(), ErrorMetric.id.desc()).limit(limit)
+    )).all()
+    fetched = time.perf_counter()
+    body = dumps({"errors": [error._asdict() for error in errors]})
+    return fetched - started, time.perf_counter() - fetched, body
+
+
+async def measure(fn, limit, rounds):
+    from app.database import AsyncSessionLocal
+
+    fetch_times, render_times = [], []
+    async with AsyncSessionLocal() as db:
+        await fn(db, limit)  # warm up caches and the compiled statement
+        for _ in range(rounds):
+            fetch, render, body = await fn(db, limit)
+            fetch_times.append(fetch)
+            render_times.append(render)
+    return statistics.median(fetch_times), statistics.median(render_times), body
+
+
+def report(name, limit, fetch, render, body):
+    print(f"\n📊 {name}")
+    print(f"   Query + rows:    {fetch * 1000:.1f} ms ({fetch / limit * 1e6:.2f} µs/row)")
+    print(f"   Serialise:       {render * 1000:.1f} ms ({render / limit * 1e6:.2f} µs/row)")
+    print(f"   Total:           {(fetch + render) / limit * 1e6:.2f} µs/row, {len(body) / 1024:.0f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Scratch database to seed and benchmark (default: temporary SQLite file)")
+    parser.add_argument("--errors", type=int, default=5000, help="Error cards to seed")
+    parser.add_argument("--limit", type=int, default=500, help="Rows per page")
+    parser.add_argument("--rounds", type=int, default=20, help="Timed repetitions (the median is reported)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    print(f"🌱 Seeding {args.errors} error cards into {os.environ['DATABASE_URL']}")
+    seed(args.errors)
+
+    from app.main import close_database_pools
+    from app.serialization import orjson
+
+    async def run():
+        try:
+            return await measure(before, args.limit, args.rounds), await measure(after, args.limit, args.rounds)
+        finally:
+            await close_database_pools()
+
+    (old_fetch, old_render, old_body), (new_fetch, new_render, new_body) = asyncio.run(run())
+    if json.loads(old_body) != json.loads(new_body):
+        print("⚠ The two payloads differ")
+
+    report("Before: ORM entities + jsonable_encoder + json.dumps", args.limit, old_fetch, old_render, old_body)
+    report(f"After: column tuples + {'orjson' if orjson else 'json (orjson not installed)'}",
+           args.limit, new_fetch, new_render, new_body)
+    speedup = (old_fetch + old_render) / (new_fetch + new_render)
+    print(f"\n✅ {speedup:.1f}x less time per row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark API cold start: `import app.main` and time to the first response
+
+Each run is a fresh interpreter, so nothing is cached between runs. The import
+is timed in-process; the first response is measured by starting uvicorn on a
+free port (as run_backend.py does, without reload and migrations) and polling
+/api/health until it answers. The slowest imports come from `python -X importtime`.
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+
+def time_import():
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_first_response(timeout=30.0):
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"No response from uvicorn within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def slowest_imports(count):
+    """(cumulative µs, module) of the slowest top-level imports under app.main"""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Two-space indent: imported directly by app.main
+        if name.startswith("   ") and not name.startswith("    ") and cumulative.strip().isdigit():
+            modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database the app is configured with (default: DATABASE_URL)")
+    parser.add_argument("--rounds", type=int, default=10, help="Fresh interpreters per measurement (the median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    imports = [time_import() for _ in range(args.rounds)]
+    responses = [time_first_response() for _ in range(args.rounds)]
+
+    print(f"\n📊 API cold start over {args.rounds} runs (median)")
+    print(f"   import app.main:        {statistics.median(imports) * 1000:7.0f} ms")
+    print(f"   first /api/health:      {statistics.median(responses) * 1000:7.0f} ms")
+    if args.top:
+        print("\n🐢 Slowest imports of app.main")
+        for cumulative, name in slowest_imports(args.top):
+            print(f"   {cumulative / 1000:7.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark API throughput against the number of gunicorn workers
+
+Seeds a throwaway SQLite database (or uses --database-url), then for each
+worker count starts the production server (gunicorn.conf.py, as run_backend.py
+does) on a free port and drives it with a mix of /api/errors list and detail
+requests from several load-generator processes for a fixed time. Requests/sec
+should grow with the worker count up to the number of CPUs; the load
+generators share the machine with the server, so leave CPUs for them (or run
+against a server on another host) when measuring many workers.
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import socket
+import asyncio
+import argparse
+import datetime
+import tempfile
+import subprocess
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+GUNICORN_CONF = os.path.join(ROOT, "gunicorn.conf.py")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def seed(errors, logs_per_error):
+    """Migrate the database and insert synthetic error cards with traces, spans and logs"""
+    from app.schema import upgrade_database
+    from app.database import engine
+    from app.models import ErrorMetric, Trace, Span, Log, RCAReport
+
+    upgrade_database()
+    now = datetime.datetime.now()
+    error_ids = []
+    with engine.begin() as conn:
+        for i in range(errors):
+            error_id = str(uuid.uuid4())
+            error_ids.append(error_id)
+            window_start = now - datetime.timedelta(minutes=5 * i)
+            conn.execute(ErrorMetric.__table__.insert(), [{
+                "id": error_id, "env": "bench", "service": f"service-{i % 10}", "span_kind": "server",
+                "http_code": "500", "exception": "BenchException", "root_name": "GET /bench", "count": 1.0,
+                "window_start": window_start, "window_end": window_start + datetime.timedelta(minutes=5),
+                "created_at": now, "trace_count": 5, "span_count": 20, "log_count": logs_per_error, "has_rca": True
+            }])
+            trace_ids = [uuid.uuid4().hex for _ in range(5)]
+            conn.execute(Trace.__table__.insert(), [
+                {"id": str(uuid.uuid4()), "error_metric_id": error_id, "trace_id_hex": t, "trace_id_b64": t, "created_at": now}
+                for t in trace_ids
+            ])
+            conn.execute(Span.__table__.insert(), [
+                {"id": str(uuid.uuid4()), "error_metric_id": error_id, "trace_id_hex": random.choice(trace_ids),
+                 "span_id": uuid.uuid4().hex[:16], "operation_name": "bench-op", "start_time": window_start,
+                 "duration": random.random(), "tags": {"bench": True}, "created_at": now}
+                for _ in range(20)
+            ])
+            conn.execute(Log.__table__.insert(), [
+                {"id": str(uuid.uuid4()), "error_metric_id": error_id, "trace_id_hex": random.choice(trace_ids),
+                 "log_data": {"_msg": f"bench log line {n}", "level": "ERROR"}, "created_at": now}
+                for n in range(logs_per_error)
+            ])
+            conn.execute(RCAReport.__table__.insert(), [{
+                "id": str(uuid.uuid4()), "error_metric_id": error_id, "analysis_summary": "bench",
+                "correlation_data": {}, "created_at": now
+            }])
+    engine.dispose()
+    return error_ids
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, port, timeout=60.0):
+    """Start gunicorn with `workers` workers and wait until it answers"""
+    env = {**os.environ, "API_ACCESS_LOG": ""}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", GUNICORN_CONF, "--bind", f"127.0.0.1:{port}",
+         "--workers", str(workers), "app.main:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError(f"No response from gunicorn within {timeout:.0f}s")
+
+
+def generate_load(port, error_ids, concurrency, duration):
+    """One load-generator process: `concurrency` clients for `duration` seconds, returns latencies"""
+    import httpx
+
+    async def run():
+        latencies = []
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+            deadline = time.perf_counter() + duration
+
+            async def client_loop():
+                while time.perf_counter() < deadline:
+                    if random.random() < 0.5:
+                        path = "/api/errors?limit=50"
+                    else:
+                        path = f"/api/errors/{random.choice(error_ids)}"
+                    started = time.perf_counter()
+                    response = await client.get(path)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+
+            await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        return latencies
+
+    return asyncio.run(run())
+
+
+def measure(workers, error_ids, loaders, concurrency, duration, warmup):
+    port = free_port()
+    server = start_server(workers, port)
+    try:
+        with ProcessPoolExecutor(max_workers=loaders) as pool:
+            # Let every worker open its pool and warm its caches before timing
+            list(pool.map(generate_load, [port] * loaders, [error_ids] * loaders,
+                          [concurrency] * loaders, [warmup] * loaders))
+            started = time.perf_counter()
+            results = list(pool.map(generate_load, [port] * loaders, [error_ids] * loaders,
+                                    [concurrency] * loaders, [duration] * loaders))
+            elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+    latencies = [latency for result in results for latency in result]
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def main():
+    cpus = cpu_count()
+    default_workers = sorted({1, 2, *(2 ** n for n in range(cpus.bit_length()) if 2 ** n <= cpus), cpus})
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Scratch database to seed and benchmark (default: temporary SQLite file)")
+    parser.add_argument("--errors", type=int, default=200, help="Error cards to seed")
+    parser.add_argument("--logs-per-error", type=int, default=50, help="Logs to seed per error card")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers,
+                        help=f"Worker counts to compare (default: {' '.join(map(str, default_workers))})")
+    parser.add_argument("--loaders", type=int, default=max(1, cpus // 2), help="Load-generator processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients per load generator")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of untimed load first")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+    sys.path.insert(0, ROOT)
+
+    print(f"🌱 Seeding {args.errors} error cards x {args.logs_per_error} logs into {os.environ['DATABASE_URL']}")
+    error_ids = seed(args.errors, args.logs_per_error)
+
+    print(f"\n📊 Throughput by worker count ({cpus} CPUs, {args.loaders} load generators x "
+          f"{args.concurrency} clients, {args.duration:.0f}s each)")
+    baseline = None
+    for workers in args.workers:
+        result = measure(workers, error_ids, args.loaders, args.concurrency, args.duration, args.warmup)
+        baseline = baseline or result["rps"]
+        print(f"   {workers:3d} workers: {result['rps']:8.1f} req/s ({result['rps'] / baseline:4.2f}x) | "
+              f"p50 {result['p50'] * 1000:6.1f} ms | p99 {result['p99'] * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
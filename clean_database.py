@@ -4,6 +4,7 @@ Clean Database - Remove any dummy data and ensure only live data
 """
 import os
 import sys
+import glob
 from dotenv import load_dotenv
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
@@ -11,12 +12,17 @@ load_dotenv()
 
 def clean_database():
     """Clean all database records to ensure only live data"""
-    from app.database import SessionLocal, engine
-    from app.models import Base, ErrorMetric, Trace, Span, Log, RCAReport
+    from app.database import SessionLocal
+    from app.schema import upgrade_database
+    from app.models import ErrorMetric, Trace, Span, Log, RCAReport, ArchivedBundle, ArchivedTrace
+    from app.models import ErrorRollup, VolumeRollup
+    from app.archive import ARCHIVE_DIR
+    from app.versions import bump_versions, ERRORS_VERSION, STATS_VERSION, DETAILS_VERSION
+    from app.notify import notify_change
     from sqlalchemy import text
     
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # Create or upgrade the tables
+    upgrade_database()
     
     db = SessionLocal()
     try:
@@ -28,9 +34,24 @@ def clean_database():
         db.query(Span).delete()
         db.query(Trace).delete()
         db.query(ErrorMetric).delete()
+        db.query(ArchivedTrace).delete()
+        db.query(ArchivedBundle).delete()
+        # The dashboard charts read the hourly rollups, not the raw tables
+        db.query(ErrorRollup).delete()
+        db.query(VolumeRollup).delete()
+        # API processes drop their cached lists, details and traces
+        bump_versions(db, ERRORS_VERSION, STATS_VERSION, DETAILS_VERSION)
+        notify_change(db, "deleted")
         
         db.commit()
         
+        # Nothing refers to the archived bundles any more
+        segments = glob.glob(os.path.join(ARCHIVE_DIR, "segment-*"))
+        for segment in segments:
+            os.remove(segment)
+        if segments:
+            print(f"🧹 Removed {len(segments)} archive segments from {ARCHIVE_DIR}")
+        
         print("✅ Database cleaned successfully!")
         print("📊 Database is now ready for live data only")
         
@@ -144,11 +144,12 @@ def demo_database_operations():
     
     try:
         from app.database import engine
-        from app.models import Base, ErrorMetric, Trace, Span, Log, RCAReport
+        from app.models import ErrorMetric, Trace, Span, Log, RCAReport
+        from app.schema import upgrade_database
         from sqlalchemy.orm import sessionmaker
         
-        # Create tables
-        Base.metadata.create_all(bind=engine)
+        # Create or upgrade the tables
+        upgrade_database()
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
         
         print("✅ Database tables created successfully")
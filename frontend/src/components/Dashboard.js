@@ -12,26 +12,177 @@ import {
   ExternalLink
 } from 'lucide-react';
 import axios from 'axios';
+import usePagedResource from './usePagedResource';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, PieChart, Pie, Cell } from 'recharts';
 
+const renderLoadMore = (page) => page.hasMore && (
+  <div className="text-center">
+    <button
+      onClick={page.loadMore}
+      disabled={page.loading}
+      className="px-4 py-2 text-sm font-medium rounded-md bg-gray-100 text-gray-700 hover:bg-gray-200 disabled:opacity-50"
+    >
+      {page.loading ? 'Loading...' : 'Load more'}
+    </button>
+  </div>
+);
+
+const TracesView = ({ errorId }) => {
+  const page = usePagedResource(`/api/errors/${errorId}/traces`, 'traces');
+  const traces = page.items;
+  return (
+    <div className="space-y-4">
+      <h3 className="text-lg font-semibold text-gray-800">Traces</h3>
+      {traces && traces.length > 0 ? (
+        <div className="overflow-x-auto">
+          <table className="min-w-full bg-white border border-gray-200 rounded-lg">
+            <thead className="bg-gray-50">
+              <tr>
+                <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Trace ID (Hex)</th>
+                <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Trace ID (Base64)</th>
+              </tr>
+            </thead>
+            <tbody className="divide-y divide-gray-200">
+              {traces.map((trace, index) => (
+                <tr key={index} className="hover:bg-gray-50">
+                  <td className="px-4 py-2 text-sm font-mono text-gray-900">{trace.trace_id_hex}</td>
+                  <td className="px-4 py-2 text-sm font-mono text-gray-600">{trace.trace_id_b64}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+      ) : (
+        <div className="text-center py-8 text-gray-500">
+          <Database className="mx-auto h-12 w-12 text-gray-400" />
+          <p className="mt-2">No traces found</p>
+        </div>
+      )}
+      {renderLoadMore(page)}
+    </div>
+  );
+};
+
+const SpansView = ({ errorId }) => {
+  const page = usePagedResource(`/api/errors/${errorId}/spans`, 'spans');
+  const spans = page.items;
+  return (
+    <div className="space-y-4">
+      <h3 className="text-lg font-semibold text-gray-800">Spans</h3>
+      {spans && spans.length > 0 ? (
+        <div className="overflow-x-auto">
+          <table className="min-w-full bg-white border border-gray-200 rounded-lg">
+            <thead className="bg-gray-50">
+              <tr>
+                <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Trace ID</th>
+                <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Span ID</th>
+                <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Operation</th>
+                <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Duration (ms)</th>
+                <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Start Time</th>
+                <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Tags</th>
+              </tr>
+            </thead>
+            <tbody className="divide-y divide-gray-200">
+              {spans.map((span, index) => (
+                <tr key={index} className="hover:bg-gray-50">
+                  <td className="px-4 py-2 text-sm font-mono text-gray-900">{span.trace_id_hex}</td>
+                  <td className="px-4 py-2 text-sm font-mono text-gray-900">{span.span_id}</td>
+                  <td className="px-4 py-2 text-sm text-gray-600">{span.operation_name || 'N/A'}</td>
+                  <td className="px-4 py-2 text-sm text-gray-600">{span.duration ? `${(span.duration * 1000).toFixed(2)}` : 'N/A'}</td>
+                  <td className="px-4 py-2 text-sm text-gray-600">
+                    {span.start_time ? new Date(span.start_time).toLocaleString() : 'N/A'}
+                  </td>
+                  <td className="px-4 py-2 text-sm text-gray-600">
+                    {span.tags ? (
+                      <div className="max-w-xs">
+                        {Object.entries(span.tags).map(([key, value]) => (
+                          <div key={key} className="text-xs">
+                            <span className="font-medium">{key}:</span> {String(value)}
+                          </div>
+                        ))}
+                      </div>
+                    ) : (
+                      'N/A'
+                    )}
+                  </td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+      ) : (
+        <div className="text-center py-8 text-gray-500">
+          <Database className="mx-auto h-12 w-12 text-gray-400" />
+          <p className="mt-2">No spans found</p>
+        </div>
+      )}
+      {renderLoadMore(page)}
+    </div>
+  );
+};
+
+const LogsView = ({ errorId }) => {
+  const page = usePagedResource(`/api/errors/${errorId}/logs`, 'logs');
+  const logs = page.items;
+  return (
+    <div className="space-y-4">
+      <h3 className="text-lg font-semibold text-gray-800">Logs</h3>
+      {logs && logs.length > 0 ? (
+        <div className="overflow-x-auto">
+          <table className="min-w-full bg-white border border-gray-200 rounded-lg">
+            <thead className="bg-gray-50">
+              <tr>
+                <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Trace ID</th>
+                <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Log Level</th>
+                <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Message</th>
+                <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Timestamp</th>
+              </tr>
+            </thead>
+            <tbody className="divide-y divide-gray-200">
+              {logs.map((log, index) => (
+                <tr key={index} className="hover:bg-gray-50">
+                  <td className="px-4 py-2 text-sm font-mono text-gray-900">{log.trace_id_hex}</td>
+                  <td className="px-4 py-2 text-sm text-gray-600">{log.log_data?.level || 'N/A'}</td>
+                  <td className="px-4 py-2 text-sm text-gray-600">{log.log_data?.message || 'N/A'}</td>
+                  <td className="px-4 py-2 text-sm text-gray-600">{log.log_data?.timestamp || 'N/A'}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+      ) : (
+        <div className="text-center py-8 text-gray-500">
+          <FileText className="mx-auto h-12 w-12 text-gray-400" />
+          <p className="mt-2">No logs found</p>
+        </div>
+      )}
+      {renderLoadMore(page)}
+    </div>
+  );
+};
+
 const Dashboard = () => {
   const [errors, setErrors] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalErrors, setTotalErrors] = useState({ total: 0, exact: true });
+  const [loadingMore, setLoadingMore] = useState(false);
   const [stats, setStats] = useState({});
+  const [trend, setTrend] = useState({ buckets: [], totals: [] });
   const [loading, setLoading] = useState(true);
   const [expandedError, setExpandedError] = useState(null);
   const [activeView, setActiveView] = useState('overview');
   const [detailedErrorData, setDetailedErrorData] = useState({});
-  const [highlightedError, setHighlightedError] = useState(null);
+  // ?highlight=<id> (or several, comma-separated) from Google Chat deep links
+  const [highlightedErrors] = useState(() => (
+    (new URLSearchParams(window.location.search).get('highlight') || '').split(',').filter(Boolean)
+  ));
 
   // Check for highlight parameter on mount
   useEffect(() => {
-    const urlParams = new URLSearchParams(window.location.search);
-    const highlight = urlParams.get('highlight');
-    if (highlight) {
-      setHighlightedError(highlight);
+    if (highlightedErrors.length > 0) {
       // Auto-expand the highlighted error after data loads
       setTimeout(() => {
-        const errorElement = document.getElementById(`error-${highlight}`);
+        const errorElement = document.getElementById(`error-${highlightedErrors[0]}`);
         if (errorElement) {
           errorElement.scrollIntoView({ behavior: 'smooth', block: 'center' });
           errorElement.classList.add('ring-2', 'ring-blue-500', 'ring-opacity-50');
@@ -40,26 +191,70 @@ const Dashboard = () => {
     }
   }, []);
 
+  // Highlighted cards that are not on the first page, resolved in one request
+  const fetchHighlightedErrors = async (loaded) => {
+    const missing = highlightedErrors.filter((id) => !loaded.some((error) => error.id === id));
+    if (missing.length === 0) return;
+    try {
+      const response = await axios.post('/api/errors/batch', { ids: missing });
+      const cards = response.data.errors.map(({ error, counts }) => ({
+        ...error, trace_count: counts.traces, span_count: counts.spans, log_count: counts.logs
+      }));
+      setErrors((current) => [...cards.filter((card) => !current.some((error) => error.id === card.id)), ...current]);
+    } catch (error) {
+      console.error('Error fetching highlighted errors:', error);
+    }
+  };
+
   const fetchData = async () => {
     try {
-      const [errorsResponse, statsResponse] = await Promise.all([
+      const [errorsResponse, statsResponse, trendResponse] = await Promise.all([
         fetch('/api/errors?env=&service=&hours=24'),
-        fetch('/api/stats')
+        fetch('/api/stats'),
+        fetch('/api/timeseries?hours=24&interval=1h')
       ]);
       
       const errorsData = await errorsResponse.json();
       const statsData = await statsResponse.json();
+      const trendData = await trendResponse.json();
       
-      // Handle the correct API response structure
+      // Handle the correct API response structure (first page only; more load on demand)
       setErrors(errorsData.errors || []);
+      setNextCursor(errorsData.next_cursor || null);
+      setTotalErrors({ total: errorsData.total || 0, exact: errorsData.total_exact !== false });
       setStats(statsData);
+      setTrend(trendData);
       setLoading(false);
+      await fetchHighlightedErrors(errorsData.errors || []);
     } catch (error) {
       console.error('Error fetching data:', error);
       setLoading(false);
     }
   };
 
+  const fetchTrend = async () => {
+    try {
+      const response = await fetch('/api/timeseries?hours=24&interval=1h');
+      setTrend(await response.json());
+    } catch (error) {
+      console.error('Error fetching error trend:', error);
+    }
+  };
+
+  const loadMoreErrors = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await fetch(`/api/errors?hours=24&cursor=${encodeURIComponent(nextCursor)}`);
+      const errorsData = await response.json();
+      setErrors((current) => [...current, ...(errorsData.errors || [])]);
+      setNextCursor(errorsData.next_cursor || null);
+    } catch (error) {
+      console.error('Error fetching more errors:', error);
+    }
+    setLoadingMore(false);
+  };
+
   const toggleErrorDetails = async (errorId) => {
     if (expandedError === errorId) {
       setExpandedError(null);
@@ -79,167 +274,51 @@ const Dashboard = () => {
     }
   };
 
-  // Calculate time until next 5-minute boundary for sync
-  const getTimeUntilNextSync = () => {
-    const now = new Date();
-    const minutes = now.getMinutes();
-    const seconds = now.getSeconds();
-    const nextBoundary = Math.ceil(minutes / 5) * 5;
-    const waitMinutes = nextBoundary - minutes;
-    const waitSeconds = (waitMinutes * 60) - seconds;
-    return Math.max(0, waitSeconds * 1000);
-  };
-
   useEffect(() => {
     fetchData();
-    
-    // Initial sync timing
-    const initialTimeout = setTimeout(() => {
-      fetchData();
-      // Then sync every 5 minutes
-      const interval = setInterval(fetchData, 5 * 60 * 1000);
-      return () => clearInterval(interval);
-    }, getTimeUntilNextSync());
-    
-    return () => clearTimeout(initialTimeout);
+
+    // New cards, RCA reports and stats are pushed as the worker commits them.
+    // EventSource reconnects by itself; refetch on every (re)connect so nothing
+    // committed while disconnected is missed.
+    const events = new EventSource('/api/events');
+    events.addEventListener('open', () => fetchData());
+    events.addEventListener('error_card', (event) => {
+      const card = JSON.parse(event.data);
+      setErrors((current) => (current.some((error) => error.id === card.id) ? current : [card, ...current]));
+      setTotalErrors((current) => ({ ...current, total: current.total + 1 }));
+    });
+    // Cards are pushed as soon as they are inserted, with no traces, spans or logs
+    // yet; the RCA report is saved after those and carries the final counts.
+    events.addEventListener('rca_report', (event) => {
+      const { counts, ...report } = JSON.parse(event.data);
+      const cardCounts = counts
+        ? { trace_count: counts.traces, span_count: counts.spans, log_count: counts.logs }
+        : {};
+      setErrors((current) => current.map((error) => (
+        error.id === report.error_metric_id
+          ? { ...error, ...cardCounts, has_rca: true, rca_severity: report.rca_severity }
+          : error
+      )));
+      setDetailedErrorData((current) => (
+        current.error && current.error.id === report.error_metric_id
+          ? { ...current, counts: counts || current.counts, rca_report: report }
+          : current
+      ));
+    });
+    events.addEventListener('stats', (event) => {
+      setStats(JSON.parse(event.data));
+      fetchTrend();
+    });
+
+    return () => events.close();
   }, []);
 
   // Chart colors
   const COLORS = ['#0088FE', '#00C49F', '#FFBB28', '#FF8042', '#8884D8', '#82CA9D'];
 
-  const renderTracesView = (detailedData) => {
-    const traces = detailedData.traces || [];
-    return (
-      <div className="space-y-4">
-        <h3 className="text-lg font-semibold text-gray-800">Traces</h3>
-        {traces && traces.length > 0 ? (
-          <div className="overflow-x-auto">
-            <table className="min-w-full bg-white border border-gray-200 rounded-lg">
-              <thead className="bg-gray-50">
-                <tr>
-                  <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Trace ID (Hex)</th>
-                  <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Trace ID (Base64)</th>
-                </tr>
-              </thead>
-              <tbody className="divide-y divide-gray-200">
-                {traces.map((trace, index) => (
-                  <tr key={index} className="hover:bg-gray-50">
-                    <td className="px-4 py-2 text-sm font-mono text-gray-900">{trace.trace_id_hex}</td>
-                    <td className="px-4 py-2 text-sm font-mono text-gray-600">{trace.trace_id_b64}</td>
-                  </tr>
-                ))}
-              </tbody>
-            </table>
-          </div>
-        ) : (
-          <div className="text-center py-8 text-gray-500">
-            <Database className="mx-auto h-12 w-12 text-gray-400" />
-            <p className="mt-2">No traces found</p>
-          </div>
-        )}
-      </div>
-    );
-  };
-
-  const renderSpansView = (detailedData) => {
-    const spans = detailedData.spans || [];
-    return (
-      <div className="space-y-4">
-        <h3 className="text-lg font-semibold text-gray-800">Spans</h3>
-        {spans && spans.length > 0 ? (
-          <div className="overflow-x-auto">
-            <table className="min-w-full bg-white border border-gray-200 rounded-lg">
-              <thead className="bg-gray-50">
-                <tr>
-                  <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Trace ID</th>
-                  <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Span ID</th>
-                  <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Operation</th>
-                  <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Duration (ms)</th>
-                  <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Start Time</th>
-                  <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Tags</th>
-                </tr>
-              </thead>
-              <tbody className="divide-y divide-gray-200">
-                {spans.map((span, index) => (
-                  <tr key={index} className="hover:bg-gray-50">
-                    <td className="px-4 py-2 text-sm font-mono text-gray-900">{span.trace_id_hex}</td>
-                    <td className="px-4 py-2 text-sm font-mono text-gray-900">{span.span_id}</td>
-                    <td className="px-4 py-2 text-sm text-gray-600">{span.operation_name || 'N/A'}</td>
-                    <td className="px-4 py-2 text-sm text-gray-600">{span.duration ? `${(span.duration * 1000).toFixed(2)}` : 'N/A'}</td>
-                    <td className="px-4 py-2 text-sm text-gray-600">
-                      {span.start_time ? new Date(span.start_time).toLocaleString() : 'N/A'}
-                    </td>
-                    <td className="px-4 py-2 text-sm text-gray-600">
-                      {span.tags ? (
-                        <div className="max-w-xs">
-                          {Object.entries(span.tags).map(([key, value]) => (
-                            <div key={key} className="text-xs">
-                              <span className="font-medium">{key}:</span> {String(value)}
-                            </div>
-                          ))}
-                        </div>
-                      ) : (
-                        'N/A'
-                      )}
-                    </td>
-                  </tr>
-                ))}
-              </tbody>
-            </table>
-          </div>
-        ) : (
-          <div className="text-center py-8 text-gray-500">
-            <Database className="mx-auto h-12 w-12 text-gray-400" />
-            <p className="mt-2">No spans found</p>
-          </div>
-        )}
-      </div>
-    );
-  };
-
-  const renderLogsView = (detailedData) => {
-    const logs = detailedData.logs || [];
-    return (
-      <div className="space-y-4">
-        <h3 className="text-lg font-semibold text-gray-800">Logs</h3>
-        {logs && logs.length > 0 ? (
-          <div className="overflow-x-auto">
-            <table className="min-w-full bg-white border border-gray-200 rounded-lg">
-              <thead className="bg-gray-50">
-                <tr>
-                  <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Trace ID</th>
-                  <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Log Level</th>
-                  <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Message</th>
-                  <th className="px-4 py-2 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Timestamp</th>
-                </tr>
-              </thead>
-              <tbody className="divide-y divide-gray-200">
-                {logs.map((log, index) => (
-                  <tr key={index} className="hover:bg-gray-50">
-                    <td className="px-4 py-2 text-sm font-mono text-gray-900">{log.trace_id_hex}</td>
-                    <td className="px-4 py-2 text-sm text-gray-600">{log.log_data?.level || 'N/A'}</td>
-                    <td className="px-4 py-2 text-sm text-gray-600">{log.log_data?.message || 'N/A'}</td>
-                    <td className="px-4 py-2 text-sm text-gray-600">{log.log_data?.timestamp || 'N/A'}</td>
-                  </tr>
-                ))}
-              </tbody>
-            </table>
-          </div>
-        ) : (
-          <div className="text-center py-8 text-gray-500">
-            <FileText className="mx-auto h-12 w-12 text-gray-400" />
-            <p className="mt-2">No logs found</p>
-          </div>
-        )}
-      </div>
-    );
-  };
-
   const renderCorrelationView = (detailedData) => {
     const error = detailedData.error || {};
-    const traces = detailedData.traces || [];
-    const spans = detailedData.spans || [];
-    const logs = detailedData.logs || [];
+    const counts = detailedData.counts || {};
     
     return (
       <div className="space-y-4">
@@ -262,9 +341,9 @@ const Dashboard = () => {
             <div>
               <h4 className="font-medium text-gray-700 mb-2">Trace & Log Summary</h4>
               <div className="space-y-2 text-sm">
-                <div><span className="font-medium">Traces Found:</span> {traces.length}</div>
-                <div><span className="font-medium">Spans Found:</span> {spans.length}</div>
-                <div><span className="font-medium">Logs Found:</span> {logs.length}</div>
+                <div><span className="font-medium">Traces Found:</span> {counts.traces || 0}</div>
+                <div><span className="font-medium">Spans Found:</span> {counts.spans || 0}</div>
+                <div><span className="font-medium">Logs Found:</span> {counts.logs || 0}</div>
               </div>
             </div>
           </div>
@@ -357,6 +436,23 @@ const Dashboard = () => {
           </div>
         </div>
 
+        {/* Error Trend: hourly buckets counted server-side, one array per series */}
+        <div className="bg-white rounded-lg shadow p-6 mb-8">
+          <h3 className="text-lg font-semibold text-gray-900 mb-4">Errors per Hour</h3>
+          <ResponsiveContainer width="100%" height={200}>
+            <BarChart data={(trend.buckets || []).map((bucket, index) => ({
+              hour: bucket.slice(11, 16),
+              count: trend.totals[index]
+            }))}>
+              <CartesianGrid strokeDasharray="3 3" />
+              <XAxis dataKey="hour" />
+              <YAxis allowDecimals={false} />
+              <Tooltip />
+              <Bar dataKey="count" fill="#FF8042" />
+            </BarChart>
+          </ResponsiveContainer>
+        </div>
+
         {/* Analytics Charts */}
         <div className="grid grid-cols-1 lg:grid-cols-2 gap-6 mb-8">
           {/* Environment Distribution */}
@@ -400,7 +496,14 @@ const Dashboard = () => {
 
         {/* Refresh Button */}
         <div className="mb-6 flex justify-between items-center">
-          <h2 className="text-xl font-semibold text-gray-900">Error Cards</h2>
+          <h2 className="text-xl font-semibold text-gray-900">
+            Error Cards
+            {totalErrors.total > 0 && (
+              <span className="ml-2 text-sm font-normal text-gray-500">
+                ({errors.length} of {totalErrors.exact ? '' : '~'}{totalErrors.total})
+              </span>
+            )}
+          </h2>
           <button
             onClick={fetchData}
             className="inline-flex items-center px-4 py-2 border border-transparent text-sm font-medium rounded-md text-white bg-blue-600 hover:bg-blue-700 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-blue-500"
@@ -417,7 +520,7 @@ const Dashboard = () => {
               key={error.id}
               id={`error-${error.id}`}
               className={`bg-white rounded-lg shadow border-2 transition-all duration-200 ${
-                highlightedError === error.id ? 'border-blue-500' : 'border-transparent'
+                highlightedErrors.includes(error.id) ? 'border-blue-500' : 'border-transparent'
               }`}
             >
               {/* Error Card Header */}
@@ -455,6 +558,15 @@ const Dashboard = () => {
                         <Clock className="h-4 w-4 mr-1" />
                         {error.count} occurrences
                       </span>
+                      <span className="flex items-center">
+                        <FileText className="h-4 w-4 mr-1" />
+                        {error.trace_count} traces · {error.span_count} spans · {error.log_count} logs
+                      </span>
+                      {error.has_rca && (
+                        <span className="px-2 py-0.5 rounded-full text-xs font-medium bg-blue-100 text-blue-800">
+                          RCA{error.rca_severity ? ` · ${error.rca_severity}` : ''}
+                        </span>
+                      )}
                     </div>
                     <div className="mt-2 text-xs text-gray-500">
                       <span className="font-medium">Time Window:</span> {error.window_start} - {error.window_end}
@@ -574,9 +686,9 @@ const Dashboard = () => {
                         </div>
                       </div>
                     )}
-                    {activeView === 'traces' && renderTracesView(detailedErrorData)}
-                    {activeView === 'spans' && renderSpansView(detailedErrorData)}
-                    {activeView === 'logs' && renderLogsView(detailedErrorData)}
+                    {activeView === 'traces' && <TracesView errorId={error.id} />}
+                    {activeView === 'spans' && <SpansView errorId={error.id} />}
+                    {activeView === 'logs' && <LogsView errorId={error.id} />}
                     {activeView === 'correlation' && renderCorrelationView(detailedErrorData)}
                     {activeView === 'rca' && renderRCAView(detailedErrorData)}
                   </div>
@@ -586,6 +698,18 @@ const Dashboard = () => {
           ))}
         </div>
 
+        {nextCursor && (
+          <div className="mt-6 text-center">
+            <button
+              onClick={loadMoreErrors}
+              disabled={loadingMore}
+              className="inline-flex items-center px-4 py-2 border border-gray-300 text-sm font-medium rounded-md text-gray-700 bg-white hover:bg-gray-50 disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
+
         {(!errors || errors.length === 0) && (
           <div className="text-center py-12">
             <AlertTriangle className="mx-auto h-12 w-12 text-gray-400" />
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import { ArrowLeft, AlertTriangle, Activity, FileText, Download, Clock, Server } from 'lucide-react';
 import axios from 'axios';
+import usePagedResource from './usePagedResource';
 
 const ErrorDetail = () => {
   const { errorId } = useParams();
@@ -9,6 +10,11 @@ const ErrorDetail = () => {
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState('overview');
 
+  // Traces, spans and logs are paged in when their tab is opened
+  const tracePage = usePagedResource(activeTab === 'traces' ? `/api/errors/${errorId}/traces` : null, 'traces');
+  const spanPage = usePagedResource(activeTab === 'spans' ? `/api/errors/${errorId}/spans` : null, 'spans');
+  const logPage = usePagedResource(activeTab === 'logs' ? `/api/errors/${errorId}/logs` : null, 'logs');
+
   useEffect(() => {
     fetchErrorDetails();
   }, [errorId]);
@@ -25,20 +31,12 @@ const ErrorDetail = () => {
     }
   };
 
-  const downloadErrorData = async () => {
-    try {
-      const response = await axios.get(`/api/errors/${errorId}/download`);
-      const dataStr = JSON.stringify(response.data, null, 2);
-      const dataBlob = new Blob([dataStr], { type: 'application/json' });
-      const url = URL.createObjectURL(dataBlob);
-      const link = document.createElement('a');
-      link.href = url;
-      link.download = `error-${errorId}.json`;
-      link.click();
-      URL.revokeObjectURL(url);
-    } catch (error) {
-      console.error('Error downloading data:', error);
-    }
+  const downloadErrorData = () => {
+    // Let the browser stream the export straight to disk instead of buffering it in memory
+    const link = document.createElement('a');
+    link.href = `/api/errors/${errorId}/download`;
+    link.download = `error-${errorId}.json`;
+    link.click();
   };
 
   if (loading) {
@@ -65,13 +63,28 @@ const ErrorDetail = () => {
     );
   }
 
-  const { error, traces, spans, logs, rca_report } = errorData;
+  const { error, counts, rca_report } = errorData;
+  const traces = tracePage.items;
+  const spans = spanPage.items;
+  const logs = logPage.items;
+
+  const renderLoadMore = (page) => page.hasMore && (
+    <div className="text-center mt-4">
+      <button
+        onClick={page.loadMore}
+        disabled={page.loading}
+        className="px-4 py-2 text-sm font-medium rounded-lg bg-gray-100 text-gray-700 hover:bg-gray-200 disabled:opacity-50"
+      >
+        {page.loading ? 'Loading...' : 'Load more'}
+      </button>
+    </div>
+  );
 
   const tabs = [
     { id: 'overview', name: 'Overview', icon: AlertTriangle },
-    { id: 'traces', name: 'Traces', icon: Activity, count: traces.length },
-    { id: 'spans', name: 'Spans', icon: Server, count: spans.length },
-    { id: 'logs', name: 'Logs', icon: FileText, count: logs.length },
+    { id: 'traces', name: 'Traces', icon: Activity, count: counts.traces },
+    { id: 'spans', name: 'Spans', icon: Server, count: counts.spans },
+    { id: 'logs', name: 'Logs', icon: FileText, count: counts.logs },
     { id: 'rca', name: 'RCA Analysis', icon: Clock }
   ];
 
@@ -174,21 +187,21 @@ const ErrorDetail = () => {
                     <Activity className="h-5 w-5 text-blue-600" />
                     <span className="font-medium text-blue-900">Traces</span>
                   </div>
-                  <p className="text-2xl font-bold text-blue-900 mt-2">{traces.length}</p>
+                  <p className="text-2xl font-bold text-blue-900 mt-2">{counts.traces}</p>
                 </div>
                 <div className="bg-green-50 p-4 rounded-lg">
                   <div className="flex items-center space-x-2">
                     <Server className="h-5 w-5 text-green-600" />
                     <span className="font-medium text-green-900">Spans</span>
                   </div>
-                  <p className="text-2xl font-bold text-green-900 mt-2">{spans.length}</p>
+                  <p className="text-2xl font-bold text-green-900 mt-2">{counts.spans}</p>
                 </div>
                 <div className="bg-purple-50 p-4 rounded-lg">
                   <div className="flex items-center space-x-2">
                     <FileText className="h-5 w-5 text-purple-600" />
                     <span className="font-medium text-purple-900">Logs</span>
                   </div>
-                  <p className="text-2xl font-bold text-purple-900 mt-2">{logs.length}</p>
+                  <p className="text-2xl font-bold text-purple-900 mt-2">{counts.logs}</p>
                 </div>
               </div>
 
@@ -230,6 +243,7 @@ const ErrorDetail = () => {
                   ))}
                 </div>
               )}
+              {renderLoadMore(tracePage)}
             </div>
           )}
 
@@ -281,6 +295,7 @@ const ErrorDetail = () => {
                   </table>
                 </div>
               )}
+              {renderLoadMore(spanPage)}
             </div>
           )}
 
@@ -309,6 +324,7 @@ const ErrorDetail = () => {
                   ))}
                 </div>
               )}
+              {renderLoadMore(logPage)}
             </div>
           )}
 
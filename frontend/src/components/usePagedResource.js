@@ -0,0 +1,39 @@
+import { useState, useEffect, useCallback } from 'react';
+import axios from 'axios';
+
+// Pages through a cursor-paginated list endpoint such as /api/errors/{id}/logs.
+// `key` is the array field in the response ("traces", "spans" or "logs").
+const usePagedResource = (url, key, params = {}) => {
+  const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading, setLoading] = useState(false);
+  const paramsKey = JSON.stringify(params);
+
+  const fetchPage = useCallback(async (cursor) => {
+    if (!url) return;
+    setLoading(true);
+    try {
+      const response = await axios.get(url, { params: { ...JSON.parse(paramsKey), ...(cursor ? { cursor } : {}) } });
+      setItems((current) => (cursor ? [...current, ...response.data[key]] : response.data[key]));
+      setNextCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error(`Error fetching ${key}:`, error);
+    } finally {
+      setLoading(false);
+    }
+  }, [url, key, paramsKey]);
+
+  useEffect(() => {
+    setItems([]);
+    setNextCursor(null);
+    fetchPage(null);
+  }, [fetchPage]);
+
+  const loadMore = () => {
+    if (nextCursor && !loading) fetchPage(nextCursor);
+  };
+
+  return { items, loading, hasMore: Boolean(nextCursor), loadMore };
+};
+
+export default usePagedResource;
@@ -0,0 +1,107 @@
+"""
+Gunicorn settings for serving the API in production (used by run_backend.py)
+
+Gunicorn pre-forks API_WORKERS uvicorn workers, one event loop per CPU by
+default, and supervises them: a worker that dies is replaced, and SIGHUP
+starts fresh workers before the old ones finish their in-flight requests and
+exit (graceful restart). The listening socket is opened with SO_REUSEPORT, so
+a new master can bind the same port while the old one drains during a
+deploy. The master never imports the app; each worker imports it after the
+fork and builds its own database pools, sized here so that all workers
+together stay within API_DB_CONNECTIONS. Workers publish their metrics in a
+directory shared with the master (API_METRICS_DIR), so /metrics reports the
+totals of all workers whichever one answers.
+"""
+import os
+import glob
+import shutil
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def cpu_count() -> int:
+    """CPUs this process may run on (honours affinity/cpusets where supported)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# WEB_CONCURRENCY is what Heroku, Render and Railway set for the dyno size
+API_WORKERS = int(os.getenv("API_WORKERS", os.getenv("WEB_CONCURRENCY", str(cpu_count()))))
+# Connections all API workers together may hold to each database
+API_DB_CONNECTIONS = int(os.getenv("API_DB_CONNECTIONS", "40"))
+
+
+def size_worker_pools(workers: int, connections: int):
+    """Split the connection budget into API_DB_POOL_SIZE / API_DB_MAX_OVERFLOW per worker"""
+    if any(os.getenv(name) for name in ("API_DB_POOL_SIZE", "DB_POOL_SIZE", "API_DB_MAX_OVERFLOW", "DB_MAX_OVERFLOW")):
+        return  # sized explicitly
+    # Never more than the single-process default (10 + 10); the budget decides below that
+    per_worker = min(20, connections // max(workers, 1))
+    if per_worker < 2:
+        # A worker needs 1 + 1 to serve at all, so a budget this small cannot be kept
+        print(f"⚠ API_DB_CONNECTIONS={connections} is under 2 per worker for {workers} workers; "
+              f"using 1 + 1 each, up to {2 * workers} connections per database")
+        per_worker = 2
+    os.environ["API_DB_POOL_SIZE"] = str(per_worker // 2)
+    os.environ["API_DB_MAX_OVERFLOW"] = str(per_worker - per_worker // 2)
+
+
+os.environ.setdefault("DB_ROLE", "api")
+size_worker_pools(API_WORKERS, API_DB_CONNECTIONS)
+
+bind = [f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"]
+workers = API_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+reuse_port = True
+# Workers import the app themselves, after the fork, so no pool or connection is shared
+preload_app = False
+
+# Seconds a worker may go silent before it is killed and replaced
+timeout = int(os.getenv("API_WORKER_TIMEOUT", "60"))
+# Seconds in-flight requests get to finish on SIGHUP/SIGTERM
+graceful_timeout = int(os.getenv("API_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("API_KEEPALIVE", "5"))
+# Recycle workers after this many requests (0 = never), staggered by the jitter
+max_requests = int(os.getenv("API_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("API_MAX_REQUESTS_JITTER", "0"))
+
+accesslog = os.getenv("API_ACCESS_LOG", "-") or None
+errorlog = "-"
+proc_name = "rca-api"
+
+
+def on_starting(server):
+    directory = os.getenv("API_METRICS_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        # Leftovers of a previous master would be counted with this one's workers
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            os.remove(path)
+    else:
+        # Private to this master, so a second master during a restart never mixes in
+        directory = tempfile.mkdtemp(prefix="rca-api-metrics-")
+        server.metrics_dir_created = directory
+    os.environ["API_METRICS_DIR"] = directory
+
+
+def child_exit(server, worker):
+    # Only the small metrics module: still nothing that opens a database connection
+    from app.metrics import mark_process_dead
+
+    mark_process_dead(os.environ["API_METRICS_DIR"], worker.pid)
+
+
+def on_exit(server):
+    directory = getattr(server, "metrics_dir_created", None)
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def when_ready(server):
+    print(f"🚀 Serving the API with {server.cfg.workers} workers on {', '.join(server.cfg.bind)} "
+          f"(DB pool {os.environ.get('API_DB_POOL_SIZE', 'default')}"
+          f"+{os.environ.get('API_DB_MAX_OVERFLOW', 'default')} per worker)")
@@ -0,0 +1,65 @@
+"""
+Alembic environment for the RCA Platform schema
+
+Migrations run against DATABASE_URL (the embedded SQLite file without one)
+on their own engine, with the "migrate" pool settings: one connection and no
+statement timeout, since rebuilding an index on a large table can take
+minutes. On PostgreSQL an advisory lock makes concurrent upgrades (API and
+worker starting together) run one after the other; the second finds the
+database already at head and does nothing.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import text
+
+from app.database import DATABASE_URL, build_engine
+from app.models import Base
+from app.search import is_search_object
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# Arbitrary application-wide key for pg_advisory_lock
+MIGRATION_LOCK_ID = 7_241_001
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # The search tables, columns and indexes are created by migration 0002, not the models
+    return not (reflected and compare_to is None and is_search_object(type_, name))
+
+
+def run_migrations_online():
+    engine = build_engine(DATABASE_URL, role="migrate", name="migrations")
+    try:
+        with engine.connect() as connection:
+            postgres = connection.dialect.name == "postgresql"
+            if postgres:
+                # Session-level lock, held across the migration transactions below
+                connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+                connection.commit()
+            try:
+                context.configure(
+                    connection=connection,
+                    target_metadata=target_metadata,
+                    include_object=include_object,
+                    # SQLite can only change most of a table by copying it
+                    render_as_batch=connection.dialect.name == "sqlite",
+                )
+                with context.begin_transaction():
+                    context.run_migrations()
+            finally:
+                if postgres:
+                    connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                    connection.commit()
+    finally:
+        engine.dispose()
+
+
+if context.is_offline_mode():
+    # The baseline inspects the live database to adopt schemas created before migrations
+    raise SystemExit("Offline (--sql) migrations are not supported; run them against the database")
+run_migrations_online()
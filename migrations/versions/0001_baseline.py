@@ -0,0 +1,183 @@
+"""Baseline: the schema as it stood when migrations were introduced
+
+Databases created before then (by `create_all` at API startup) are adopted
+rather than recreated: tables that exist only get the columns and indexes
+later releases added, and the per-error counters are backfilled when they
+were just added.
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-01-15 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _tables():
+    """(table, columns, [(index, columns)]) for every table"""
+    return [
+        ("error_metrics", [
+            sa.Column('id', sa.String(), primary_key=True),
+            sa.Column('env', sa.String(), nullable=True),
+            sa.Column('service', sa.String(), nullable=True),
+            sa.Column('span_kind', sa.String(), nullable=True),
+            sa.Column('http_code', sa.String(), nullable=True),
+            sa.Column('exception', sa.String(), nullable=True),
+            sa.Column('root_name', sa.String(), nullable=True),
+            sa.Column('count', sa.Float(), nullable=False),
+            sa.Column('window_start', sa.DateTime(), nullable=False),
+            sa.Column('window_end', sa.DateTime(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('trace_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('span_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('log_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('has_rca', sa.Boolean(), nullable=False, server_default=sa.false()),
+            sa.Column('rca_severity', sa.String(), nullable=True),
+        ], [
+            ('idx_error_metrics_timestamp', ['window_start', 'window_end']),
+            ('idx_error_metrics_env_service', ['env', 'service']),
+            ('idx_error_metrics_window_start_id', ['window_start', 'id']),
+        ]),
+        ("traces", [
+            sa.Column('id', sa.String(), primary_key=True),
+            sa.Column('error_metric_id', sa.String(), nullable=False),
+            sa.Column('trace_id_b64', sa.String(), nullable=True),
+            sa.Column('trace_id_hex', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        ], [
+            ('idx_traces_error_metric', ['error_metric_id', 'id']),
+            ('idx_traces_trace_id', ['trace_id_hex']),
+        ]),
+        ("spans", [
+            sa.Column('id', sa.String(), primary_key=True),
+            sa.Column('error_metric_id', sa.String(), nullable=False),
+            sa.Column('trace_id_hex', sa.String(), nullable=True),
+            sa.Column('span_id', sa.String(), nullable=True),
+            sa.Column('operation_name', sa.String(), nullable=True),
+            sa.Column('start_time', sa.DateTime(), nullable=True),
+            sa.Column('duration', sa.Float(), nullable=True),
+            sa.Column('tags', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        ], [
+            ('idx_spans_error_metric', ['error_metric_id', 'id']),
+            ('idx_spans_trace_id', ['trace_id_hex']),
+            ('idx_spans_start_time', ['start_time']),
+        ]),
+        ("logs", [
+            sa.Column('id', sa.String(), primary_key=True),
+            sa.Column('error_metric_id', sa.String(), nullable=False),
+            sa.Column('trace_id_hex', sa.String(), nullable=True),
+            sa.Column('log_data', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        ], [
+            ('idx_logs_error_metric', ['error_metric_id', 'id']),
+            ('idx_logs_trace_id', ['trace_id_hex']),
+            ('idx_logs_created_at', ['created_at']),
+        ]),
+        ("rca_reports", [
+            sa.Column('id', sa.String(), primary_key=True),
+            sa.Column('error_metric_id', sa.String(), nullable=False),
+            sa.Column('analysis_summary', sa.Text(), nullable=True),
+            sa.Column('correlation_data', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        ], [
+            ('idx_rca_error_metric', ['error_metric_id']),
+            ('idx_rca_created_at', ['created_at']),
+        ]),
+        ("archived_bundles", [
+            sa.Column('error_metric_id', sa.String(), primary_key=True),
+            sa.Column('segment', sa.String(), nullable=False),
+            sa.Column('offset', sa.BigInteger(), nullable=False),
+            sa.Column('length', sa.BigInteger(), nullable=False),
+            sa.Column('codec', sa.String(), nullable=False),
+            sa.Column('trace_count', sa.Integer(), nullable=False),
+            sa.Column('span_count', sa.Integer(), nullable=False),
+            sa.Column('log_count', sa.Integer(), nullable=False),
+            sa.Column('archived_at', sa.DateTime(), nullable=True),
+        ], [
+            ('idx_archived_bundles_segment', ['segment']),
+        ]),
+        ("error_rollups_hourly", [
+            sa.Column('bucket', sa.DateTime(), primary_key=True),
+            sa.Column('env', sa.String(), primary_key=True),
+            sa.Column('service', sa.String(), primary_key=True),
+            sa.Column('http_code', sa.String(), primary_key=True),
+            sa.Column('error_count', sa.BigInteger(), nullable=False),
+        ], []),
+        ("volume_rollups_hourly", [
+            sa.Column('bucket', sa.DateTime(), primary_key=True),
+            sa.Column('traces', sa.BigInteger(), nullable=False),
+            sa.Column('spans', sa.BigInteger(), nullable=False),
+            sa.Column('logs', sa.BigInteger(), nullable=False),
+            sa.Column('rca_reports', sa.BigInteger(), nullable=False),
+        ], []),
+        ("data_versions", [
+            sa.Column('name', sa.String(), primary_key=True),
+            sa.Column('version', sa.BigInteger(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+        ], []),
+        ("cycle_jobs", [
+            sa.Column('id', sa.String(), primary_key=True),
+            sa.Column('status', sa.String(), nullable=False),
+            sa.Column('window_end', sa.DateTime(), nullable=False),
+            sa.Column('requested_at', sa.DateTime(), nullable=True),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.Column('progress', sa.JSON(), nullable=True),
+            sa.Column('stages', sa.JSON(), nullable=True),
+            sa.Column('error_metric_ids', sa.JSON(), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+        ], [
+            ('idx_cycle_jobs_status_requested', ['status', 'requested_at']),
+        ]),
+    ]
+
+
+def upgrade() -> None:
+    """Create the tables, or bring tables created before migrations up to date."""
+    inspector = sa.inspect(op.get_bind())
+    added = []
+    for table, columns, indexes in _tables():
+        if inspector.has_table(table):
+            present = {column["name"] for column in inspector.get_columns(table)}
+            for column in columns:
+                if column.name not in present:
+                    op.add_column(table, column)
+                    added.append(f"{table}.{column.name}")
+            existing = {index["name"]: index["column_names"] for index in inspector.get_indexes(table)}
+        else:
+            op.create_table(table, *columns)
+            existing = {}
+        for name, index_columns in indexes:
+            if existing.get(name) == index_columns:
+                continue
+            # The error_metric_id indexes gained the id column for keyset paging
+            if name in existing:
+                op.drop_index(name, table_name=table)
+            op.create_index(name, table, index_columns)
+
+    if added:
+        print(f"✓ Added columns: {', '.join(added)}")
+    if {"error_metrics.trace_count", "error_metrics.has_rca"} & set(added):
+        from sqlalchemy.orm import Session
+        from app.counters import backfill_error_counters
+
+        print("📊 Backfilling per-error counters...")
+        with Session(bind=op.get_bind()) as db:
+            print(f"✓ Backfilled counters for {backfill_error_counters(db)} error cards")
+
+
+def downgrade() -> None:
+    """Drop every table."""
+    for table, _, _ in reversed(_tables()):
+        op.drop_table(table)
@@ -0,0 +1,33 @@
+"""Full-text search indexes over log messages and RCA summaries
+
+PostgreSQL: generated tsvector columns with GIN indexes, plus pg_trgm
+indexes when the extension can be created. SQLite: FTS5 trigram tables kept
+in sync by triggers. See app/search.py.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-01-15 10:05:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.search import create_search_indexes, drop_search_indexes
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the search columns, tables, triggers and indexes."""
+    create_search_indexes(op.get_bind())
+
+
+def downgrade() -> None:
+    """Drop them again."""
+    drop_search_indexes(op.get_bind())
@@ -0,0 +1,45 @@
+"""Index of the trace ids inside archived bundles
+
+Lets /api/traces/{trace_id} find spans and logs whose cards were moved to
+the cold archive. Bundles archived earlier are indexed by reading them back.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-01-15 10:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create archived_traces and fill it from the existing segments."""
+    # Databases built with create_all before this revision already have the table
+    if not sa.inspect(op.get_bind()).has_table("archived_traces"):
+        op.create_table(
+            "archived_traces",
+            sa.Column('trace_id_hex', sa.String(), primary_key=True),
+            sa.Column('error_metric_id', sa.String(), primary_key=True),
+        )
+
+    from sqlalchemy.orm import Session
+    from app.archive import index_archived_traces
+
+    with Session(bind=op.get_bind()) as db:
+        indexed = index_archived_traces(db)
+    if indexed:
+        print(f"✓ Indexed trace ids of {indexed} archived bundles")
+
+
+def downgrade() -> None:
+    """Drop archived_traces."""
+    op.drop_table("archived_traces")
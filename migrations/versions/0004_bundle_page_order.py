@@ -0,0 +1,51 @@
+"""Order the per-card trace, span and log indexes by time
+
+The /api/errors/{id}/traces|spans|logs pages are ordered on (created_at, id)
+for traces and logs and (start_time, id) for spans, so the error_metric_id
+indexes gain the time column ahead of id.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-01-15 10:15:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INDEXES = [
+    ("traces", "idx_traces_error_metric", "created_at"),
+    ("spans", "idx_spans_error_metric", "start_time"),
+    ("logs", "idx_logs_error_metric", "created_at"),
+]
+
+
+def _recreate(columns_of) -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, name, time_column in _INDEXES:
+        columns = columns_of(time_column)
+        existing = {index["name"]: index["column_names"] for index in inspector.get_indexes(table)}
+        # Databases built with create_all already have the new definition
+        if existing.get(name) == columns:
+            continue
+        if name in existing:
+            op.drop_index(name, table_name=table)
+        op.create_index(name, table, columns)
+
+
+def upgrade() -> None:
+    """Put the time column between error_metric_id and id."""
+    _recreate(lambda time_column: ["error_metric_id", time_column, "id"])
+
+
+def downgrade() -> None:
+    """Back to (error_metric_id, id)."""
+    _recreate(lambda time_column: ["error_metric_id", "id"])
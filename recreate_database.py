@@ -9,16 +9,19 @@ from dotenv import load_dotenv
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 load_dotenv()
 
-from app.database import engine, Base
-from app.models import ErrorMetric, Trace, Span, Log, RCAReport
+from alembic import command
+from app.schema import alembic_config, upgrade_database
 
 def recreate_database():
-    """Drop and recreate all tables with updated schema"""
+    """Drop and recreate all tables through the migrations"""
+    # A database created before migrations is adopted first, so downgrading drops its tables too
+    upgrade_database()
+    
     print("🗑️  Dropping existing tables...")
-    Base.metadata.drop_all(bind=engine)
+    command.downgrade(alembic_config(), "base")
     
     print("🏗️  Creating new tables with updated schema...")
-    Base.metadata.create_all(bind=engine)
+    upgrade_database()
     
     print("✅ Database recreated successfully!")
     print("📊 New schema includes:")
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+RCA Platform Cold Archiver - moves old correlation bundles into segment files
+"""
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.database import SessionLocal
+from app.schema import upgrade_database
+from app.archive import archive_old_bundles, ARCHIVE_AFTER_DAYS
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive traces, spans and logs of old error cards")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="Archive bundles older than this many days")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of bundles to archive in this run")
+    args = parser.parse_args()
+
+    upgrade_database()
+
+    print(f"🗄️  Archiving bundles older than {args.days} days...")
+    db = SessionLocal()
+    try:
+        archived = archive_old_bundles(db, days=args.days, limit=args.limit)
+        print(f"✅ Archived {archived} bundles")
+    finally:
+        db.close()
@@ -1,17 +1,67 @@
 #!/usr/bin/env python3
 """
 RCA Platform Backend Startup Script
+
+Applies pending schema migrations, then serves the API. In production the API
+runs as pre-forked gunicorn workers, one uvicorn event loop per CPU (see
+gunicorn.conf.py; API_WORKERS / WEB_CONCURRENCY override the count), with
+graceful restarts on SIGHUP. Auto-reload runs the app in a single
+file-watching uvicorn process, so it is only turned on for development: pass
+--reload or set ENVIRONMENT=development.
 """
+import argparse
+import runpy
+import subprocess
+import sys
 import uvicorn
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
+# Use the API's connection pool settings (API_DB_*)
+os.environ.setdefault("DB_ROLE", "api")
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+GUNICORN_CONF = os.path.join(ROOT, "gunicorn.conf.py")
+
+
+def serve_workers(workers=None):
+    """Run gunicorn with gunicorn.conf.py in this process until it is stopped"""
+    if workers:
+        os.environ["API_WORKERS"] = str(workers)
+    try:
+        from gunicorn.app.wsgiapp import WSGIApplication
+    except ImportError:
+        # gunicorn does not run on Windows; uvicorn can still spawn plain workers.
+        # Loading the config sizes their pools the same way.
+        settings = runpy.run_path(GUNICORN_CONF)
+        print("⚠ gunicorn is not installed, serving with uvicorn workers (no graceful restarts)")
+        uvicorn.run("app.main:app", host="0.0.0.0", port=int(os.getenv("PORT", 8000)), workers=settings["workers"])
+        return
+    sys.argv = ["gunicorn", "--config", GUNICORN_CONF, "app.main:app"]
+    WSGIApplication("%(prog)s [OPTIONS] [APP_MODULE]").run()
+
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=int(os.getenv("PORT", 8000)),
-        reload=True
-    ) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Start the RCA Platform API")
+    parser.add_argument("--reload", action="store_true", default=os.getenv("ENVIRONMENT") == "development",
+                        help="Restart on code changes (default with ENVIRONMENT=development)")
+    parser.add_argument("--workers", type=int, help="API worker processes (default: API_WORKERS, WEB_CONCURRENCY or the CPU count)")
+    parser.add_argument("--skip-migrations", action="store_true",
+                        default=os.getenv("RUN_MIGRATIONS", "true").lower() in ("0", "false", "no", "off"),
+                        help="Do not apply pending migrations first (RUN_MIGRATIONS=false)")
+    args = parser.parse_args()
+
+    if not args.skip_migrations:
+        # In a child process, so the server never imports the app before forking its workers
+        subprocess.run([sys.executable, os.path.join(ROOT, "run_migrations.py")], check=True)
+
+    if args.reload:
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=int(os.getenv("PORT", 8000)),
+            reload=True
+        )
+    else:
+        serve_workers(args.workers)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+RCA Platform Schema Migrations - apply pending migrations and exit
+
+Run as a deploy/release step before the API and worker start. Equivalent to
+`alembic upgrade head`; pass a revision to upgrade (or --downgrade) to it.
+"""
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from alembic import command
+from app.schema import alembic_config, upgrade_database
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply the RCA Platform schema migrations")
+    parser.add_argument("revision", nargs="?", default="head", help="Target revision (default: head)")
+    parser.add_argument("--downgrade", action="store_true", help="Downgrade to the revision instead")
+    args = parser.parse_args()
+
+    print(f"🗃️  Migrating the database schema to {args.revision}...")
+    if args.downgrade:
+        command.downgrade(alembic_config(), args.revision)
+    else:
+        upgrade_database(args.revision)
+    print("✅ Schema is up to date")
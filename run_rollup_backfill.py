@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Rebuild the hourly /api/stats rollups and per-error counters from the raw tables
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.database import session_scope
+from app.schema import upgrade_database
+from app.rollups import backfill_rollups
+from app.counters import backfill_error_counters
+
+if __name__ == "__main__":
+    upgrade_database()
+
+    print("📊 Rebuilding /api/stats rollups...")
+    with session_scope() as db:
+        hours = backfill_rollups(db)
+    print(f"✓ Rebuilt rollups for {hours} hours of data")
+
+    print("📊 Rebuilding per-error trace/span/log counters...")
+    with session_scope() as db:
+        cards = backfill_error_counters(db)
+    print(f"✅ Rebuilt counters for {cards} error cards")
\ No newline at end of file
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Compact the embedded SQLite database and rebuild its search tables
+
+VACUUM may renumber the rowids the FTS5 search tables are keyed by, so they
+are rebuilt straight after it. PostgreSQL keeps its search columns current by
+itself and needs neither step.
+"""
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.database import engine
+from app.schema import upgrade_database
+from app.search import rebuild_search_indexes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VACUUM the SQLite database and rebuild its search tables")
+    parser.add_argument("--no-vacuum", action="store_true", help="Only rebuild the search tables")
+    args = parser.parse_args()
+
+    upgrade_database()
+
+    if engine.dialect.name != "sqlite":
+        print(f"✓ Nothing to do: {engine.dialect.name} maintains its search indexes itself")
+    else:
+        if not args.no_vacuum:
+            print("🧹 Compacting the database (VACUUM)...")
+            # VACUUM cannot run inside a transaction
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.exec_driver_sql("VACUUM")
+        print("🔎 Rebuilding search tables...")
+        rebuild_search_indexes(engine)
+        print("✅ Search tables rebuilt")
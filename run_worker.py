@@ -5,11 +5,30 @@ RCA Platform Background Worker Startup Script
 import asyncio
 import os
 from dotenv import load_dotenv
-from app.worker import RCAWorker
 
 load_dotenv()
+# Use the worker's connection pool settings (WORKER_DB_*)
+os.environ.setdefault("DB_ROLE", "worker")
+
+from app.database import session_scope
+from app.schema import upgrade_database
+from app.rollups import rollups_missing, backfill_rollups
+from app.jobs import fail_interrupted_jobs
+from app.worker import RCAWorker
+from app.metrics import start_metrics_server
 
 if __name__ == "__main__":
     print("🚀 Starting RCA Background Worker...")
+    if os.getenv("WORKER_METRICS_PORT"):
+        start_metrics_server(int(os.getenv("WORKER_METRICS_PORT")))
+    # Create tables (needed when the worker starts first on a fresh SQLite file)
+    upgrade_database()
+    with session_scope() as db:
+        if rollups_missing(db):
+            print("📊 Building /api/stats rollups from existing data...")
+            print(f"✓ Built rollups for {backfill_rollups(db)} hours")
+    interrupted = fail_interrupted_jobs()
+    if interrupted:
+        print(f"⚠ Marked {interrupted} cycle jobs interrupted by the last shutdown as failed")
     worker = RCAWorker()
     asyncio.run(worker.run_continuous()) 
\ No newline at end of file
@@ -51,7 +51,7 @@ def check_system_status():
     print("\n🗄️ Checking Database...")
     try:
         from app.database import engine
-        from app.models import Base
+        from app.schema import upgrade_database
         from sqlalchemy.orm import sessionmaker
         from sqlalchemy import text
         
@@ -59,8 +59,8 @@ def check_system_status():
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
         db = SessionLocal()
         
-        # Create tables if they don't exist
-        Base.metadata.create_all(bind=engine)
+        # Create or upgrade the tables
+        upgrade_database()
         
         # Test query
         result = db.execute(text("SELECT 1")).fetchone()
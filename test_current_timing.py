@@ -25,9 +25,10 @@ def test_current_timing():
     # Trigger a cycle
     try:
         response = requests.post('http://localhost:8000/api/trigger-cycle', timeout=30)
-        if response.status_code == 200:
-            print("✅ Cycle triggered successfully")
+        if response.status_code == 202:
+            print("✅ Cycle queued successfully")
             print(f"Response: {response.json()}")
+            print(f"Progress: http://localhost:8000{response.json()['status_url']}")
         else:
             print(f"❌ Failed to trigger cycle: {response.status_code}")
     except Exception as e:
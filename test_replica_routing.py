@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test Read-Replica Routing with two local SQLite databases
+"""
+import os
+import sys
+import shutil
+import asyncio
+import datetime
+import tempfile
+
+# Point the app at a throwaway primary and replica before anything imports it
+WORK_DIR = tempfile.mkdtemp(prefix="rca-replica-")
+PRIMARY_PATH = os.path.join(WORK_DIR, "primary.db")
+REPLICA_PATH = os.path.join(WORK_DIR, "replica.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{PRIMARY_PATH}"
+os.environ["DATABASE_REPLICA_URLS"] = f"sqlite:///{REPLICA_PATH}"
+os.environ["REPLICA_MAX_LAG_SECONDS"] = "60"
+os.environ["REPLICA_LAG_CHECK_INTERVAL"] = "0"
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def insert_error(service, created_at):
+    from app.database import SessionLocal
+    from app.models import ErrorMetric
+
+    db = SessionLocal()
+    try:
+        error = ErrorMetric(
+            env="replica-test", service=service, span_kind="server", http_code="500",
+            exception="ReplicaTest", root_name="GET /replica", count=1.0,
+            window_start=created_at, window_end=created_at + datetime.timedelta(minutes=5),
+            created_at=created_at
+        )
+        db.add(error)
+        db.commit()
+        return error.id
+    finally:
+        db.close()
+
+async def fetch(client, path, **kwargs):
+    response = await client.get(path, **kwargs)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+async def run_checks():
+    from app.database import engine
+    from app.models import Base
+    from app.main import app, close_database_pools
+
+    Base.metadata.create_all(bind=engine)
+    now = datetime.datetime.now()
+
+    # Replica is a snapshot of the primary holding one error card
+    insert_error("replicated-service", now - datetime.timedelta(minutes=30))
+    engine.dispose()
+    shutil.copyfile(PRIMARY_PATH, REPLICA_PATH)
+
+    try:
+        await check_routing(app, now)
+    finally:
+        # Pooled aiosqlite connections keep their threads (and the process) alive otherwise
+        await close_database_pools()
+
+async def check_routing(app, now):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        print("🔍 Replica in sync: reads are served by the replica...")
+        # 30s behind the primary is within the 60s lag budget
+        primary_only_id = insert_error("primary-only-service", now - datetime.timedelta(minutes=29, seconds=30))
+        data = await fetch(client, "/api/errors")
+        services = {error["service"] for error in data["errors"]}
+        assert services == {"replicated-service"}, services
+        print("✓ /api/errors came from the replica")
+
+        print("🔍 Client asks for read-your-writes: reads go to the primary...")
+        data = await fetch(client, "/api/errors", headers={"X-Read-Primary": "1"})
+        assert {error["service"] for error in data["errors"]} == {"replicated-service", "primary-only-service"}
+        print("✓ X-Read-Primary reads came from the primary")
+
+        print("🔍 Download of a card the replica has not received yet...")
+        data = await fetch(client, f"/api/errors/{primary_only_id}/download")
+        assert data["error_card"]["service"] == "primary-only-service"
+        print("✓ Download fell back to the primary")
+
+        print("🔍 Primary moves ahead beyond the lag budget: reads fall back to the primary...")
+        insert_error("fresh-service", now)
+        data = await fetch(client, "/api/errors")
+        assert "fresh-service" in {error["service"] for error in data["errors"]}
+        print("✓ Lagging replica was skipped")
+
+def test_replica_routing():
+    asyncio.run(run_checks())
+
+if __name__ == "__main__":
+    try:
+        test_replica_routing()
+        print("✅ Replica routing works!")
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
@@ -137,11 +137,10 @@ def test_database_connection():
     print("\n🔍 Testing database connection...")
     
     try:
-        from app.database import engine
-        from app.models import Base
+        from app.schema import upgrade_database
         
-        # Try to create tables
-        Base.metadata.create_all(bind=engine)
+        # Try to create or upgrade the tables
+        upgrade_database()
         print("✓ Database connection successful")
         print("✓ Tables created successfully")
         return True